@@ -1,12 +1,154 @@
 #!/usr/bin/env python3
-import urwid, time
+import time
+STARTUP_MARKS = [("start", time.perf_counter())]
+import urwid
 import os
-import pygame.mixer
-import mutagen
 import sys
+import importlib.util
 from datetime import datetime, timedelta
 import subprocess
 import signal
+import json
+import sqlite3
+import threading
+import struct
+import math
+import io
+import re
+import wave
+import select
+import selectors
+import socket
+import shutil
+import bisect
+import marshal
+import hashlib
+import argparse
+import urllib.parse
+import ctypes
+import ctypes.util
+from array import array
+from collections import OrderedDict, deque
+from itertools import accumulate, islice
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+import multiprocessing
+
+def lazy_import(name):
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    spec.loader = importlib.util.LazyLoader(spec.loader)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+pygame = lazy_import('pygame')
+mutagen = lazy_import('mutagen')
+STARTUP_MARKS.append(("imports", time.perf_counter()))
+
+def startup_mark(label):
+    STARTUP_MARKS.append((label, time.perf_counter()))
+
+def startup_report(out=sys.stderr):
+    started = previous = STARTUP_MARKS[0][1]
+    for label, at in STARTUP_MARKS[1:]:
+        out.write(f"{(at - started) * 1000:9.1f} ms {(at - previous) * 1000:+9.1f} ms  {label}\n")
+        previous = at
+
+class Metrics:
+    def __init__(self, window=2048):
+        self.window = window
+        self.samples = {}
+        self.totals = {}
+        self.counters = {}
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+
+    def record(self, name, seconds):
+        with self.lock:
+            samples = self.samples.get(name)
+            if samples is None:
+                samples = self.samples[name] = deque(maxlen=self.window)
+            samples.append(seconds)
+            self.totals[name] = self.totals.get(name, 0) + 1
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def timed(self, name, callback):
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return callback(*args, **kwargs)
+            finally:
+                self.record(name, time.perf_counter() - started)
+        return wrapper
+
+    def latencies(self):
+        with self.lock:
+            samples = [(name, sorted(values), self.totals[name]) for name, values in self.samples.items()]
+        return {name: {'count': total, 'p50': ordered[len(ordered) // 2] * 1000,
+                       'p99': ordered[min(len(ordered) - 1, len(ordered) * 99 // 100)] * 1000, 'max': ordered[-1] * 1000}
+                for name, ordered, total in samples}
+
+    def hit_rates(self):
+        with self.lock:
+            counters = dict(self.counters)
+        rates = {}
+        for name, hits in counters.items():
+            if name.endswith(' hit'):
+                cache = name[:-4]
+                lookups = hits + counters.get(cache + ' miss', 0)
+                rates[cache] = hits / lookups if lookups else None
+        return rates
+
+    def snapshot(self):
+        with self.lock:
+            counters = dict(self.counters)
+        return {'time': time.time(), 'uptime': time.monotonic() - self.started, 'latency_ms': self.latencies(),
+                'counters': counters, 'hit_rates': self.hit_rates()}
+
+    def overlay_markup(self, rows=12):
+        latencies = sorted(self.latencies().items(), key=lambda item: item[1]['p99'], reverse=True)
+        markup = [('path_value', f" {'':<26}{'count':>7}{'p50 ms':>9}{'p99 ms':>9}\n")]
+        for name, latency in latencies[:rows]:
+            markup += [('normal,bold', f" {name[:26]:<26}"),
+                       ('normal', f"{latency['count']:>7}{latency['p50']:>9.2f}{latency['p99']:>9.2f}\n")]
+        with self.lock:
+            spawned = sorted((name, count) for name, count in self.counters.items() if name.startswith('subprocess '))
+        for name, count in spawned:
+            markup += [('path_value', f" {name}: "), ('normal', f"{count}\n")]
+        for cache, rate in sorted(self.hit_rates().items()):
+            markup += [('path_value', f" {cache} hit rate: "), ('normal', "--\n" if rate is None else f"{rate:.1%}\n")]
+        markup[-1] = (markup[-1][0], markup[-1][1].rstrip('\n'))
+        return markup
+
+METRICS = Metrics()
+METRICS_INTERVAL = 10
+
+def run_command(args):
+    METRICS.count('subprocess ' + args[0])
+    return METRICS.timed('subprocess ' + args[0], subprocess.run)(args, capture_output=True, text=True, check=True)
+
+def start_profile():
+    import cProfile
+    import tracemalloc
+    tracemalloc.start(10)
+    profile = cProfile.Profile()
+    profile.enable()
+    return profile
+
+def save_profile(profile, prefix, out=sys.stderr):
+    import tracemalloc
+    profile.disable()
+    profile.dump_stats(prefix + '.prof')
+    tracemalloc.take_snapshot().dump(prefix + '.tracemalloc')
+    tracemalloc.stop()
+    out.write(f"profile written to {prefix}.prof and {prefix}.tracemalloc\n")
 
 palette = [
     ('header', 'light blue', 'default'),
@@ -44,21 +186,17 @@ empty_char = ["   ", "   ", "   "]
 def get_pseudographic_char(c):
     return font.get(c, empty_char)
 
+CLOCK_SEGMENTS = {
+    c: tuple(('time_separator' if c == ':' else 'normal', row.rstrip().ljust(4)) for row in glyph)
+    for c, glyph in font.items()
+}
+
 def print_pseudographic_time(hours, mins, secs):
     if not (0 <= hours <= 23 and 0 <= mins <= 59 and 0 <= secs <= 59):
         return [('error', f"Invalid time: {hours:02d}:{mins:02d}:{secs:02d}")]
 
-    time_str = f"{hours:02d}:{mins:02d}:{secs:02d}"
-    chars = [get_pseudographic_char(c) for c in time_str]
-
-    result = []
-    for row in range(3):
-        line = []
-        for i, char in enumerate(chars):
-            style = 'time_separator' if i in [2, 5] else 'normal'
-            line.append((style, char[row].rstrip().ljust(4)))
-        result.append(line)
-    return result
+    segments = [CLOCK_SEGMENTS[c] for c in f"{hours:02d}:{mins:02d}:{secs:02d}"]
+    return [[segment[row] for segment in segments] for row in range(3)]
 
 def get_month_name(month):
     months = ["January", "February", "March", "April", "May", "June",
@@ -79,604 +217,3194 @@ def get_date_string():
         t.tm_mday,
         weekday_name
     )
-class PlaybackMode(urwid.ListBox):
-    def __init__(self, main_loop, root_dir, input_path=None):
-        pygame.mixer.init()
-        self.main_loop = main_loop
-        self.root_dir = root_dir
-        self.current_dir = os.getcwd()
-        self.dir_history = []
-        self.file_list = urwid.SimpleFocusListWalker([])
-        self.playlist = []
-        self.playlist_index = 0
 
-        self.progress_bar = urwid.Text([('normal', "  0"), ('time_separator', '%'), (None, " | " + " " * 83)], align='left') #self.progress_bar = urwid.Text([('path_value', "  0"), ('percent', '%'), (None, " | " + " " * 83)], align='left')
-        term_size = os.get_terminal_size()
-        term_width = term_size.columns
-        total_width = term_width - 1
-        left_width = int(total_width * 0.62)
+AUDIO_EXTENSIONS = {'mp3', 'wav', 'ogg', 'flac', 'aac', 'm4a', 'wma', 'opus'}
+PLAYLIST_EXTENSIONS = {'m3u', 'm3u8', 'pls'}
+ENTRY_ATTRS = {'d': 'directory', 'f': 'audio_file', 'p': 'audio_file', 'o': 'normal', 'x': 'perm_denied'}
+
+SCAN_PREVIEW_ROWS = 256
+
+def scan_directory(path, cancelled, first_chunk=256, max_chunk=8192):
+    chunk = []
+    chunk_size = first_chunk
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if cancelled():
+                return
+            name = entry.name
+            if name.startswith('.'):
+                continue
+            try:
+                if entry.is_dir():
+                    kind = 'd'
+                elif name.lower().split('.')[-1] in AUDIO_EXTENSIONS:
+                    kind = 'f' if entry.is_file() else 'o'
+                elif name.lower().split('.')[-1] in PLAYLIST_EXTENSIONS and entry.is_file():
+                    kind = 'p'
+                else:
+                    continue
+            except OSError:
+                continue
+            chunk.append((name, kind))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+                chunk_size = min(max_chunk, chunk_size * 2)
+    if chunk:
+        yield chunk
+
+def scan_directory_sorted(path):
+    mtime = os.stat(path).st_mtime_ns
+    entries = sorted(entry for chunk in scan_directory(path, lambda: False) for entry in chunk)
+    return mtime, [name for name, kind in entries], ''.join(kind for name, kind in entries).encode()
 
-        title = "PLAYBACK PROGRESS"
-        title_with_symbols = f"┤ {title} ├"
-        title_len = len(title_with_symbols)
-        adjusted_width = left_width - 2
-        side_len = max(0, (adjusted_width - title_len) // 2)
+def walk_audio_files(root, cancelled):
+    stack = [root]
+    while stack and not cancelled():
+        path = stack.pop()
+        try:
+            with os.scandir(path) as it:
+                entries = sorted((entry.name, entry.is_dir(follow_symlinks=False), entry.path)
+                                 for entry in it if not entry.name.startswith('.'))
+        except OSError:
+            continue
+        subdirs = []
+        for name, is_dir, full_path in entries:
+            if is_dir:
+                subdirs.append(full_path)
+            elif name.lower().split('.')[-1] in AUDIO_EXTENSIONS:
+                yield full_path
+        stack.extend(reversed(subdirs))
 
-        top_line = f'┌{"─" * side_len}{title_with_symbols}{"─" * (adjusted_width - title_len - side_len)}┐'
-        if len(top_line) > left_width:
-            top_line = top_line[:left_width - 1] + '┐'
-        elif len(top_line) < left_width:
-            top_line = top_line[:-1] + '─' * (left_width - len(top_line)) + '┐'
+def chunked(items, first_chunk=1, max_chunk=1024):
+    chunk = []
+    chunk_size = first_chunk
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+            chunk_size = min(max_chunk, chunk_size * 2)
+    if chunk:
+        yield chunk
 
-        top_text = urwid.Filler(urwid.Text(('pink_frame', top_line), align='left'), valign='top')
+class Playlist:
+    def __init__(self, paths=()):
+        self.dirs = []
+        self.dir_ids = {}
+        self.unresolved_dirs = set()
+        self.entry_dirs = array('I')
+        self.names = bytearray()
+        self.offsets = array('Q', [0])
+        self.extend(paths)
 
-        side_borders = urwid.LineBox(self.progress_bar, lline='│', rline='│',
-                                     tline='', bline='',
-                                     tlcorner='', trcorner='',
-                                     blcorner='', brcorner='')
+    def dir_id(self, directory):
+        dir_id = self.dir_ids.get(directory)
+        if dir_id is None:
+            dir_id = self.dir_ids[directory] = len(self.dirs)
+            self.dirs.append(directory)
+        return dir_id
 
-        footer_line = f'└{"─" * (left_width - 2)}┘'
-        footer_text = urwid.Filler(urwid.Text(('pink_frame', footer_line), align='left'), valign='top')
+    def append(self, path):
+        directory, name = os.path.split(path)
+        self.entry_dirs.append(self.dir_id(directory))
+        self.names += os.fsencode(name)
+        self.offsets.append(len(self.names))
 
-        framed_widget = urwid.Pile([(1, top_text), ('weight', 1, side_borders), (1, footer_text)])
-        self.file_frame = urwid.AttrMap(framed_widget, 'pink_frame')
-
-        self.volume_bar = urwid.Text([('normal', " 50"), ('time_separator', '%'), (None, " | " + '░' * 25 + ' ' * 25)]) #self.volume_bar = urwid.Text(f" 50% | {'░' * 25 + ' ' * 25}")
-        term_size = os.get_terminal_size()
-        term_width = term_size.columns
-        total_border_chars = 6
-        available_width = term_width - total_border_chars
-        num_upper_boxes = 3
-        base_status_width = (available_width // 3 + available_width // 4) // 2
-        status_width = max(15, base_status_width + 3)
-        remaining_width = available_width - status_width - 7
-        files_width = remaining_width // 2
-        metadata_width = available_width - files_width - status_width + 2
-        total_width_so_far = files_width + status_width + metadata_width + 8
-        if total_width_so_far < available_width:
-            metadata_width += available_width - total_width_so_far
-        title = "PYGAME.MIXER VOLUME LEVEL"
-        title_with_symbols = f"┤ {title} ├"
-        title_len = len(title_with_symbols)
-        adjusted_width = metadata_width - 2
-        side_len = max(0, (adjusted_width - title_len) // 2)
-        top_line = f'┌{"─" * side_len}{title_with_symbols}{"─" * (adjusted_width - title_len - side_len)}┐'
-        if len(top_line) > metadata_width:
-            top_line = top_line[:metadata_width - 1] + '┐'
-        elif len(top_line) < metadata_width:
-            top_line = top_line[:-1] + '─' * (metadata_width - len(top_line)) + '┐'
-        top_text = urwid.Filler(urwid.Text(('pink_frame', top_line), align='left'), valign='top')
-        side_borders = urwid.LineBox(self.volume_bar, lline='│', rline='│', tline='', bline='─', tlcorner='', trcorner='', blcorner='└', brcorner='┘')
-        new_right_frame = urwid.Pile([(1, top_text), ('weight', 1, side_borders)])
-        self.metadata_frame = urwid.AttrMap(new_right_frame, 'pink_frame')
+    def extend(self, paths):
+        for path in paths:
+            self.append(path)
 
-        self.path_text_inner = urwid.Text([('path_value', self.current_dir)], align='left')
-        self.path_text = urwid.Padding(self.path_text_inner, left=1)
-        self.path_filler = urwid.Filler(self.path_text, valign='top')
-        term_width = os.get_terminal_size().columns
-        title = "Path"
-        title_len = len("┤ Path ├")
-        adjusted_width = term_width - 4
-        side_len = max(0, (adjusted_width - title_len) // 2)
-        top_line = f'┌{"─" * side_len}┤ PATH ├{"─" * side_len}'
-        if len(top_line) < term_width - 2:
-            top_line += "─" * (term_width - len(top_line) - 3) + "┐"
-        elif len(top_line) >= term_width - 1:
-            top_line = top_line[:term_width - 3] + "┐"
+    def extend_unresolved(self, base_dir, entries):
+        dir_id = self.dir_id(base_dir)
+        self.unresolved_dirs.add(dir_id)
+        encoded = [entry.encode('utf-8', 'surrogateescape') for entry in entries]
+        self.entry_dirs.extend(array('I', [dir_id]) * len(encoded))
+        self.offsets.extend(islice(accumulate(map(len, encoded), initial=len(self.names)), 1, None))
+        self.names += b''.join(encoded)
+
+    def __len__(self):
+        return len(self.entry_dirs)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        dir_id = self.entry_dirs[index]
+        name = os.fsdecode(bytes(self.names[self.offsets[index]:self.offsets[index + 1]]))
+        if dir_id in self.unresolved_dirs:
+            return resolve_playlist_entry(self.dirs[dir_id], name)
+        return os.path.join(self.dirs[dir_id], name)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+def is_playlist_file(path):
+    return path.lower().rsplit('.', 1)[-1] in PLAYLIST_EXTENSIONS
+
+def resolve_playlist_entry(base_dir, entry):
+    if entry.lower().startswith('file://'):
+        entry = urllib.parse.unquote(urllib.parse.urlparse(entry).path)
+    elif '://' in entry:
+        return None
+    return os.path.normpath(os.path.join(base_dir, os.path.expanduser(entry)))
+
+def read_playlist_entries(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data.startswith(b'\xef\xbb\xbf'):
+        data = data[3:]
+    try:
+        text = data.decode('utf-8')
+    except UnicodeDecodeError:
+        text = data.decode('latin-1')
+    lines = [line.strip() for line in text.splitlines()]
+    if not path.lower().endswith('.pls'):
+        return [line for line in lines if line and line[0] != '#']
+    numbered = []
+    for line in lines:
+        match = re.match(r'file(\d+)\s*=\s*(.*)', line, re.IGNORECASE)
+        if match:
+            numbered.append((int(match.group(1)), match.group(2)))
+    return [entry for number, entry in sorted(numbered)]
+
+def write_playlist(path, paths):
+    base_prefix = os.path.join(os.path.dirname(os.path.abspath(path)), '')
+    entries = [p[len(base_prefix):] if p.startswith(base_prefix) else p for p in paths if p]
+    if path.lower().endswith('.pls'):
+        lines = ['[playlist]'] + [f'File{number}={entry}' for number, entry in enumerate(entries, 1)]
+        lines += [f'NumberOfEntries={len(entries)}', 'Version=2']
+    else:
+        lines = ['#EXTM3U'] + entries
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'w', encoding='utf-8', errors='surrogateescape') as f:
+        f.write('\n'.join(lines) + '\n')
+    os.replace(temp_path, path)
+
+class Inotify:
+    IN_MODIFY = 0x002
+    IN_ATTRIB = 0x004
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_DELETE_SELF = 0x400
+    IN_MOVE_SELF = 0x800
+    IN_Q_OVERFLOW = 0x4000
+    IN_IGNORED = 0x8000
+    MASK = IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+    HEADER = struct.Struct('iIII')
+
+    def __init__(self):
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.paths = {}
+        self.watches = {}
+
+    def add(self, path):
+        if path in self.watches:
+            return True
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), self.MASK)
+        if wd < 0:
+            return False
+        self.watches[path] = wd
+        self.paths[wd] = path
+        return True
+
+    def remove(self, path):
+        wd = self.watches.pop(path, None)
+        if wd is not None:
+            self.paths.pop(wd, None)
+            self.libc.inotify_rm_watch(self.fd, wd)
+
+    def read_changed(self):
+        changed = set()
+        overflow = False
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                return changed, overflow
+            offset = 0
+            while offset + self.HEADER.size <= len(data):
+                wd, mask, cookie, length = self.HEADER.unpack_from(data, offset)
+                offset += self.HEADER.size + length
+                if mask & self.IN_Q_OVERFLOW:
+                    overflow = True
+                    continue
+                path = self.paths.get(wd)
+                if path is None:
+                    continue
+                changed.add(path)
+                if mask & self.IN_IGNORED:
+                    self.watches.pop(path, None)
+                    self.paths.pop(wd, None)
+
+class ListingCache:
+    def __init__(self, max_dirs=64, max_names=500000):
+        self.entries = OrderedDict()
+        self.max_dirs = max_dirs
+        self.max_names = max_names
+        self.names = 0
+        self.lock = threading.Lock()
+        try:
+            self.inotify = Inotify()
+        except (OSError, AttributeError):
+            self.inotify = None
+
+    def get(self, path):
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is None:
+                return None
+            mtime, names, kinds, watched = entry
+        if not watched:
+            try:
+                if os.stat(path).st_mtime_ns != mtime:
+                    self.invalidate(path)
+                    return None
+            except OSError:
+                self.invalidate(path)
+                return None
+        with self.lock:
+            if path in self.entries:
+                self.entries.move_to_end(path)
+        return names, kinds
+
+    def put(self, path, mtime, names, kinds):
+        with self.lock:
+            watched = self.inotify is not None and self.inotify.add(path)
+            self.discard(path)
+            try:
+                moved = os.stat(path).st_mtime_ns != mtime
+            except OSError:
+                moved = True
+            if moved:
+                self.unwatch(path)
+                return False
+            self.entries[path] = (mtime, names, kinds, watched)
+            self.names += len(names)
+            while len(self.entries) > 1 and (len(self.entries) > self.max_dirs or self.names > self.max_names):
+                oldest = next(iter(self.entries))
+                self.discard(oldest)
+                self.unwatch(oldest)
+            return True
+
+    def discard(self, path):
+        entry = self.entries.pop(path, None)
+        if entry is not None:
+            self.names -= len(entry[1])
+
+    def unwatch(self, path):
+        if self.inotify is not None:
+            self.inotify.remove(path)
+
+    def invalidate(self, path):
+        with self.lock:
+            self.discard(path)
+            self.unwatch(path)
+
+    def read_changed(self):
+        with self.lock:
+            changed, overflow = self.inotify.read_changed()
+            if overflow:
+                changed.update(self.entries)
+            for path in changed:
+                self.discard(path)
+                self.unwatch(path)
+            return changed, overflow
+
+    def __contains__(self, path):
+        with self.lock:
+            return path in self.entries
+
+class FileListWalker(urwid.ListWalker):
+    def __init__(self, cache_size=256):
+        self.names = []
+        self.kinds = bytearray()
+        self.focus = 0
+        self.widgets = OrderedDict()
+        self.cache_size = cache_size
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, position):
+        if not 0 <= position < len(self.names):
+            raise IndexError(position)
+        key = (self.names[position], self.kinds[position])
+        widget = self.widgets.get(key)
+        if widget is None:
+            name, kind = key[0], chr(key[1])
+            display_name = name + "/" if kind == 'd' else name
+            padded_text = urwid.Padding(urwid.Text(display_name), left=1, right=1)
+            widget = urwid.AttrMap(padded_text, ENTRY_ATTRS[kind], 'selected')
+            self.widgets[key] = widget
+            if len(self.widgets) > self.cache_size:
+                self.widgets.popitem(last=False)
         else:
-            top_line += "┐"
-        top_text = urwid.Filler(urwid.Text(('pink_frame', top_line), align='left'), valign='top')
-        side_borders = urwid.LineBox(self.path_filler, lline='│', rline='│', tline='', bline='', tlcorner='', trcorner='', blcorner='', brcorner='')
-        footer_line = f'└{"─" * (len(top_line) - 2)}┘'
-        if len(footer_line) > term_width - 1:
-            footer_line = footer_line[:term_width - 2]
-        footer_text = urwid.Filler(urwid.Text(('pink_frame', footer_line), align='left'), valign='top')
-        framed_widget = urwid.Pile([(1, top_text), ('weight', 1, side_borders), (1, footer_text)])
-        self.path_widget = urwid.AttrMap(framed_widget, 'pink_frame')
+            self.widgets.move_to_end(key)
+        return widget
 
-        self.status_output = urwid.Text("", align='left')
-        self.status_filler = urwid.Filler(self.status_output, valign='top')
+    def next_position(self, position):
+        if position + 1 >= len(self.names):
+            raise IndexError(position)
+        return position + 1
 
-        self.playing = False
-        self.paused = False
-        self.volume = 0.5
-        self.current_audio_duration = 0
+    def prev_position(self, position):
+        if position <= 0:
+            raise IndexError(position)
+        return position - 1
+
+    def positions(self, reverse=False):
+        if reverse:
+            return range(len(self.names) - 1, -1, -1)
+        return range(len(self.names))
+
+    def set_focus(self, position):
+        self.focus = max(0, min(position, len(self.names) - 1))
+        self._modified()
+
+    def set_entries(self, names, kinds):
+        self.names = list(names)
+        self.kinds = bytearray(kinds)
+        self.focus = max(0, min(self.focus, len(names) - 1))
+        self._modified()
+
+    def append(self, name, kind):
+        self.names.append(name)
+        self.kinds.append(ord(kind))
+        self._modified()
 
+    def extend(self, names, kinds):
+        self.names.extend(names)
+        self.kinds.extend(kinds)
+        self._modified()
+
+    def set_view(self, names, kinds):
+        self.names = names
+        self.kinds = kinds
+        self.focus = max(0, min(self.focus, len(names) - 1))
+        self._modified()
+
+    def clear(self):
+        self.set_entries([], b'')
+
+    def name_at(self, position):
+        return self.names[position]
+
+class IndexedView:
+    def __init__(self, items, indices):
+        self.items = items
+        self.indices = indices
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, position):
+        return self.items[self.indices[position]]
+
+class SearchIndex:
+    def __init__(self, names):
+        self.names = names
+        self.lowered = None
+        self.grams = None
+
+    def build(self):
+        lowered = [name.lower() for name in self.names]
+        grams = {}
+        for i, name in enumerate(lowered):
+            found = set(name)
+            found.update(name[j:j + 2] for j in range(len(name) - 1))
+            found.update(name[j:j + 3] for j in range(len(name) - 2))
+            for gram in found:
+                postings = grams.get(gram)
+                if postings is None:
+                    postings = grams[gram] = array('I')
+                postings.append(i)
+        self.grams = grams
+        self.lowered = lowered
+
+    @property
+    def ready(self):
+        return self.lowered is not None
+
+    def search(self, query, previous=None):
+        query = query.lower()
+        if not query:
+            return range(len(self.names))
+        if not self.ready:
+            return [i for i, name in enumerate(self.names) if query in name.lower()]
+        if len(query) <= 3:
+            return self.grams.get(query, array('I'))
+        candidates = min((self.grams.get(query[j:j + 3], ()) for j in range(len(query) - 2)), key=len)
+        if previous is not None and len(previous) < len(candidates):
+            candidates = previous
+        lowered = self.lowered
+        return [i for i in candidates if query in lowered[i]]
+
+CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'audioPlayerTermPy')
+
+def read_metadata(filepath):
+    audio = mutagen.File(filepath)
+    if audio is None:
+        return None
+    info = getattr(audio, 'info', None)
+    tags = []
+    if audio.tags:
+        tags = [[str(key), str(value)] for key, value in audio.tags.items()]
+    return {
+        'duration': getattr(info, 'length', None),
+        'bitrate': getattr(info, 'bitrate', None),
+        'channels': getattr(info, 'channels', None),
+        'sample_rate': getattr(info, 'sample_rate', None),
+        'tags': tags,
+    }
+
+class MetadataCache:
+    def __init__(self, db_path=None, memory_size=256):
+        self.db_path = db_path or os.path.join(CACHE_DIR, 'metadata.sqlite')
+        self.memory = OrderedDict()
+        self.memory_size = memory_size
+        self.lock = threading.Lock()
         try:
-            result = subprocess.check_output("amixer get Master | grep -o '[0-9]*%' | uniq", shell=True, text=True).strip()
-            percent = int(result.rstrip('%'))
-            filled = min(50, int(percent / 2))
-            initial_volume_text = [('normal', f" {percent}"), ('time_separator', '%'), (None, f" | {'░' * filled + ' ' * (50 - filled)}")] #initial_volume_text = f" {percent}% | {'░' * filled + ' ' * (50 - filled)}"
-        except subprocess.CalledProcessError:
-            initial_volume_text = " --% " + " " * 50
-        self.system_volume_bar = urwid.Text(initial_volume_text)
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            self.db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self.db.execute("CREATE TABLE IF NOT EXISTS metadata ("
+                            "path TEXT PRIMARY KEY, size INTEGER, mtime INTEGER, recognized INTEGER, "
+                            "duration REAL, bitrate INTEGER, channels INTEGER, sample_rate INTEGER, tags TEXT)")
+            self.db.execute("CREATE TABLE IF NOT EXISTS durations ("
+                            "path TEXT PRIMARY KEY, size INTEGER, mtime INTEGER, duration REAL, confidence TEXT)")
+            self.db.execute("CREATE TABLE IF NOT EXISTS seek_tables ("
+                            "path TEXT PRIMARY KEY, size INTEGER, mtime INTEGER, step REAL, offsets BLOB)")
+            self.db.execute("CREATE TABLE IF NOT EXISTS waveforms ("
+                            "path TEXT PRIMARY KEY, size INTEGER, mtime INTEGER, peaks BLOB, rms BLOB)")
+            self.db.execute("CREATE TABLE IF NOT EXISTS loudness ("
+                            "path TEXT PRIMARY KEY, size INTEGER, mtime INTEGER, loudness REAL, power REAL, blocks INTEGER)")
+            self.db.commit()
+        except (OSError, sqlite3.Error):
+            self.db = None
+
+    def file_key(self, filepath):
+        path = os.path.abspath(filepath)
+        st = os.stat(path)
+        return (path, st.st_size, st.st_mtime_ns)
+
+    def get(self, filepath, commit=True):
+        key = self.file_key(filepath)
+        with self.lock:
+            cached = self.memory.get(key[0])
+            if cached is not None and cached[0] == key:
+                self.memory.move_to_end(key[0])
+                METRICS.count('metadata cache hit')
+                return cached[1]
+            found, info = self.load(key)
+        METRICS.count('metadata cache hit' if found else 'metadata cache miss')
+        if not found:
+            info = read_metadata(key[0])
+            with self.lock:
+                self.store(key, info, commit)
+        with self.lock:
+            self.remember(key, info)
+        return info
 
+    def remember(self, key, info):
+        self.memory[key[0]] = (key, info)
+        self.memory.move_to_end(key[0])
+        while len(self.memory) > self.memory_size:
+            self.memory.popitem(last=False)
+
+    def load(self, key):
+        if self.db is None:
+            return False, None
         try:
-            result = subprocess.check_output("amixer sget 'Headphone' | grep 'Front Left' | grep -o '[0-9]\+%' | head -1", shell=True, text=True).strip()
-            percent = int(result.rstrip('%'))
-            filled = min(50, int(percent / 2))
-            initial_headphone_left_text = [('normal', f" {percent}"), ('time_separator', '%'), (None, f" | {'░' * filled + ' ' * (50 - filled)}")] #initial_headphone_left_text = f" {percent}% | {'░' * filled + ' ' * (50 - filled)}"
-        except (subprocess.CalledProcessError, ValueError):
-            initial_headphone_left_text = " --% | " + " " * 50
-        self.headphone_left_bar = urwid.Text(initial_headphone_left_text, align='left')
+            row = self.db.execute("SELECT recognized, duration, bitrate, channels, sample_rate, tags FROM metadata "
+                                  "WHERE path = ? AND size = ? AND mtime = ?", key).fetchone()
+        except sqlite3.Error:
+            return False, None
+        if row is None:
+            return False, None
+        if not row[0]:
+            return True, None
+        return True, {'duration': row[1], 'bitrate': row[2], 'channels': row[3],
+                      'sample_rate': row[4], 'tags': json.loads(row[5])}
 
+    def store(self, key, info, commit=True):
+        if self.db is None:
+            return
+        if info is None:
+            values = key + (0, None, None, None, None, '[]')
+        else:
+            values = key + (1, info['duration'], info['bitrate'], info['channels'],
+                            info['sample_rate'], json.dumps(info['tags']))
         try:
-            result = subprocess.check_output("amixer sget 'Headphone' | grep 'Front Right' | grep -o '[0-9]\+%' | head -1", shell=True, text=True).strip()
-            percent = int(result.rstrip('%'))
-            filled = min(50, int(percent / 2))
-            initial_headphone_right_text = [('normal', f" {percent}"), ('time_separator', '%'), (None, f" | {'░' * filled + ' ' * (50 - filled)}")] #initial_headphone_right_text = f" {percent}% | {'░' * filled + ' ' * (50 - filled)}"
-        except (subprocess.CalledProcessError, ValueError):
-            initial_headphone_right_text = " --% | " + " " * 50
-        self.headphone_right_bar = urwid.Text(initial_headphone_right_text, align='left')
-        super().__init__(self.file_list)
-        self.input_path = input_path
-        if not input_path:
-            self.refresh_list()
-        self.widget = None
-        self.initialize_widget()
+            self.db.execute("INSERT OR REPLACE INTO metadata VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", values)
+            if commit:
+                self.db.commit()
+        except sqlite3.Error:
+            pass
 
-    def start(self):
-        if self.input_path:
-            if os.path.isdir(self.input_path):
-                self.load_and_play_directory(self.input_path)
-            elif os.path.isfile(self.input_path):
-                self.load_and_play_audio(self.input_path)
+    def commit(self):
+        if self.db is None:
+            return
+        with self.lock:
+            try:
+                self.db.commit()
+            except sqlite3.Error:
+                pass
 
-    def format_time(self, seconds):
-        return str(timedelta(seconds=int(seconds))).zfill(8)
+    def get_duration(self, filepath):
+        key = self.file_key(filepath)
+        if self.db is None:
+            return None, None
+        with self.lock:
+            try:
+                row = self.db.execute("SELECT duration, confidence FROM durations "
+                                      "WHERE path = ? AND size = ? AND mtime = ?", key).fetchone()
+            except sqlite3.Error:
+                row = None
+        return row if row else (None, None)
 
-    def format_time(self, seconds):
-        return str(timedelta(seconds=int(seconds))).zfill(8)
+    def store_duration(self, filepath, duration, confidence):
+        key = self.file_key(filepath)
+        if self.db is None:
+            return
+        with self.lock:
+            try:
+                self.db.execute("INSERT OR REPLACE INTO durations VALUES (?, ?, ?, ?, ?)",
+                                key + (duration, confidence))
+                self.db.commit()
+            except sqlite3.Error:
+                pass
 
-    def format_active_time(self, elapsed_str, duration_str):
-        result = [('normal', " ")]
-        for i, char in enumerate(elapsed_str):
-            if char.isdigit():
-                result.append(('normal', char))
-            else:
-                result.append(('time_separator,bold', char))
-        result.append(('time_separator,bold', " / "))
-        for i, char in enumerate(duration_str):
-            if char.isdigit():
-                result.append(('normal', char))
+    def get_seek_table(self, filepath):
+        key = self.file_key(filepath)
+        if self.db is None:
+            return None
+        with self.lock:
+            try:
+                row = self.db.execute("SELECT step, offsets FROM seek_tables "
+                                      "WHERE path = ? AND size = ? AND mtime = ?", key).fetchone()
+            except sqlite3.Error:
+                row = None
+        if row is None:
+            return None
+        offsets = array('Q')
+        offsets.frombytes(row[1])
+        return row[0], offsets
+
+    def store_seek_table(self, filepath, table):
+        key = self.file_key(filepath)
+        if self.db is None:
+            return
+        with self.lock:
+            try:
+                self.db.execute("INSERT OR REPLACE INTO seek_tables VALUES (?, ?, ?, ?, ?)",
+                                key + (table[0], table[1].tobytes()))
+                self.db.commit()
+            except sqlite3.Error:
+                pass
+
+    def get_waveform(self, filepath):
+        key = self.file_key(filepath)
+        if self.db is None:
+            return None
+        with self.lock:
+            try:
+                row = self.db.execute("SELECT peaks, rms FROM waveforms "
+                                      "WHERE path = ? AND size = ? AND mtime = ?", key).fetchone()
+            except sqlite3.Error:
+                row = None
+        return tuple(row) if row else None
+
+    def store_waveform(self, filepath, waveform):
+        key = self.file_key(filepath)
+        if self.db is None:
+            return
+        with self.lock:
+            try:
+                self.db.execute("INSERT OR REPLACE INTO waveforms VALUES (?, ?, ?, ?, ?)", key + waveform)
+                self.db.commit()
+            except sqlite3.Error:
+                pass
+
+    def get_loudness(self, filepath):
+        key = self.file_key(filepath)
+        if self.db is None:
+            return None
+        with self.lock:
+            try:
+                row = self.db.execute("SELECT loudness, power, blocks FROM loudness "
+                                      "WHERE path = ? AND size = ? AND mtime = ?", key).fetchone()
+            except sqlite3.Error:
+                row = None
+        return tuple(row) if row else None
+
+    def store_loudness(self, filepath, measurement):
+        key = self.file_key(filepath)
+        if self.db is None:
+            return
+        with self.lock:
+            try:
+                self.db.execute("INSERT OR REPLACE INTO loudness VALUES (?, ?, ?, ?, ?, ?)", key + measurement)
+                self.db.commit()
+            except sqlite3.Error:
+                pass
+
+MP3_BITRATES = {
+    (1, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (1, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (1, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (2, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (2, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (2, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+MP3_SAMPLE_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+def parse_mp3_header(data, pos):
+    if pos + 4 > len(data) or data[pos] != 0xFF or data[pos + 1] & 0xE0 != 0xE0:
+        return None
+    version_bits = (data[pos + 1] >> 3) & 3
+    layer = 4 - ((data[pos + 1] >> 1) & 3)
+    bitrate_index = data[pos + 2] >> 4
+    rate_index = (data[pos + 2] >> 2) & 3
+    if version_bits == 1 or layer == 4 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    version = 1 if version_bits == 3 else 2
+    bitrate = MP3_BITRATES[(version, layer)][bitrate_index] * 1000
+    sample_rate = MP3_SAMPLE_RATES[version_bits][rate_index]
+    padding = (data[pos + 2] >> 1) & 1
+    if layer == 1:
+        samples = 384
+        length = (12 * bitrate // sample_rate + padding) * 4
+    else:
+        samples = 576 if layer == 3 and version == 2 else 1152
+        length = samples // 8 * bitrate // sample_rate + padding
+    mono = (data[pos + 3] >> 6) == 3
+    return {'version': version, 'layer': layer, 'bitrate': bitrate, 'sample_rate': sample_rate,
+            'samples': samples, 'length': length, 'mono': mono}
+
+def find_mp3_frame(data, start=0):
+    pos = data.find(b'\xff', start)
+    while pos != -1:
+        header = parse_mp3_header(data, pos)
+        if header and header['length'] > 0:
+            following = pos + header['length']
+            if following + 4 > len(data) or parse_mp3_header(data, following):
+                return pos, header
+        pos = data.find(b'\xff', pos + 1)
+    return None, None
+
+def id3v2_size(data):
+    if data[:3] != b'ID3' or len(data) < 10:
+        return 0
+    size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+    return size + (20 if data[5] & 0x10 else 10)
+
+def xing_position(header, pos):
+    side_info = (17 if header['mono'] else 32) if header['version'] == 1 else (9 if header['mono'] else 17)
+    return pos + 4 + side_info
+
+def probe_mp3(f, file_size):
+    head = f.read(10)
+    audio_start = id3v2_size(head)
+    f.seek(audio_start)
+    data = f.read(65536)
+    pos, header = find_mp3_frame(data)
+    if header is None:
+        return None, None
+    xing = xing_position(header, pos)
+    if data[xing:xing + 4] in (b'Xing', b'Info'):
+        flags = struct.unpack('>I', data[xing + 4:xing + 8])[0]
+        if flags & 1:
+            frames = struct.unpack('>I', data[xing + 8:xing + 12])[0]
+            return frames * header['samples'] / header['sample_rate'], 'exact'
+    vbri = pos + 4 + 32
+    if data[vbri:vbri + 4] == b'VBRI':
+        frames = struct.unpack('>I', data[vbri + 14:vbri + 18])[0]
+        return frames * header['samples'] / header['sample_rate'], 'exact'
+    f.seek(max(0, file_size - 128))
+    tail = 128 if f.read(3) == b'TAG' else 0
+    audio_bytes = file_size - audio_start - pos - tail
+    return audio_bytes * 8 / header['bitrate'], 'estimate'
+
+def probe_wav(f, file_size):
+    header = f.read(12)
+    if header[:4] != b'RIFF' or header[8:12] != b'WAVE':
+        return None, None
+    byte_rate = None
+    while True:
+        chunk = f.read(8)
+        if len(chunk) < 8:
+            return None, None
+        chunk_id, chunk_size = chunk[:4], struct.unpack('<I', chunk[4:])[0]
+        if chunk_id == b'fmt ':
+            fmt = f.read(chunk_size + (chunk_size & 1))
+            byte_rate = struct.unpack('<I', fmt[8:12])[0]
+        elif chunk_id == b'data':
+            if not byte_rate:
+                return None, None
+            remaining = file_size - f.tell()
+            if chunk_size == 0 or chunk_size == 0xFFFFFFFF or chunk_size > remaining:
+                return remaining / byte_rate, 'estimate'
+            return chunk_size / byte_rate, 'exact'
+        else:
+            f.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)
+
+def probe_flac(f, file_size):
+    header = f.read(42)
+    if header[:4] != b'fLaC' or header[4] & 0x7F != 0:
+        return None, None
+    info = int.from_bytes(header[18:26], 'big')
+    sample_rate = info >> 44
+    total_samples = info & 0xFFFFFFFFF
+    if not sample_rate or not total_samples:
+        return None, None
+    return total_samples / sample_rate, 'exact'
+
+def probe_ogg(f, file_size):
+    head = f.read(4096)
+    if head[:4] != b'OggS':
+        return None, None
+    serial = head[14:18]
+    vorbis = head.find(b'\x01vorbis')
+    opus = head.find(b'OpusHead')
+    if vorbis != -1:
+        sample_rate = struct.unpack('<I', head[vorbis + 12:vorbis + 16])[0]
+        pre_skip = 0
+    elif opus != -1:
+        sample_rate = 48000
+        pre_skip = struct.unpack('<H', head[opus + 10:opus + 12])[0]
+    else:
+        return None, None
+    window = 65536
+    while True:
+        start = max(0, file_size - window)
+        f.seek(start)
+        tail = f.read(window)
+        pos = tail.rfind(b'OggS')
+        while pos != -1:
+            if pos + 18 <= len(tail) and tail[pos + 14:pos + 18] == serial:
+                granule = struct.unpack('<q', tail[pos + 6:pos + 14])[0]
+                if granule >= 0 and sample_rate:
+                    return max(0, granule - pre_skip) / sample_rate, 'exact'
+            pos = tail.rfind(b'OggS', 0, pos)
+        if start == 0 or window >= 4 * 1024 * 1024:
+            return None, None
+        window *= 4
+
+def probe_mp4(f, file_size):
+    def atoms(start, end):
+        pos = start
+        while pos + 8 <= end:
+            f.seek(pos)
+            header = f.read(16)
+            size, kind = struct.unpack('>I4s', header[:8])
+            offset = 8
+            if size == 1:
+                size = struct.unpack('>Q', header[8:16])[0]
+                offset = 16
+            elif size == 0:
+                size = end - pos
+            if size < offset:
+                return
+            yield kind, pos + offset, pos + size
+            pos += size
+    for kind, start, end in atoms(0, file_size):
+        if kind != b'moov':
+            continue
+        for child, child_start, child_end in atoms(start, end):
+            if child != b'mvhd':
+                continue
+            f.seek(child_start)
+            data = f.read(32)
+            if data[0] == 1:
+                timescale, duration = struct.unpack('>IQ', data[20:32])
             else:
-                result.append(('time_separator,bold', char))
-        return result
+                timescale, duration = struct.unpack('>II', data[12:20])
+            if timescale:
+                return duration / timescale, 'exact'
+    return None, None
 
-    def update_progress_bar(self, loop=None, data=None):
-        if self.playing and not self.paused and pygame.mixer.music.get_busy():
-            elapsed = pygame.mixer.music.get_pos() / 1000
-            duration = self.current_audio_duration
-            if duration > 0:
-                progress_percent = min(100, int((elapsed / duration) * 100))
-                filled = min(83, int(progress_percent / 1.2048))
-                unfilled = 83 - filled
-                progress_str = [('normal', f"{progress_percent:3d}"), ('time_separator', '%'), (None, f" | {'░' * filled}{' ' * unfilled}")] #progress_str = [('path_value', f"{progress_percent:3d}"), ('percent', '%'), (None, f" | {'░' * filled}{' ' * unfilled}")]
-                self.progress_bar.set_text(progress_str)
-                elapsed_str = self.format_time(elapsed)
-                duration_str = self.format_time(duration)
-                self.grannik_text.set_text(self.format_active_time(elapsed_str, duration_str))
+DURATION_PROBES = {
+    'mp3': probe_mp3, 'wav': probe_wav, 'flac': probe_flac, 'ogg': probe_ogg, 'opus': probe_ogg,
+    'm4a': probe_mp4, 'aac': probe_mp4,
+}
+
+def probe_duration(filepath):
+    probe = DURATION_PROBES.get(filepath.lower().rsplit('.', 1)[-1])
+    if probe is None:
+        return None, None
+    try:
+        with open(filepath, 'rb') as f:
+            return probe(f, os.fstat(f.fileno()).st_size)
+    except (OSError, struct.error, IndexError, KeyError, ZeroDivisionError):
+        return None, None
+
+def readahead(filepath, head_bytes=262144):
+    with open(filepath, 'rb') as f:
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+        f.read(head_bytes)
+
+def decode_duration(filepath):
+    return pygame.mixer.Sound(filepath).get_length()
+
+WAVEFORM_BINS = 512
+WAVEFORM_MAX_SECONDS = 1800
+WAVEFORM_WAV_CHUNK_SECONDS = 10
+WAVEFORM_MP3_CHUNK_BYTES = 262144
+WAVEFORM_GLYPHS = "▁▂▃▄▅▆▇█"
+
+def wav_source(filepath, seconds=WAVEFORM_WAV_CHUNK_SECONDS):
+    import numpy
+    w = wave.open(filepath, 'rb')
+    dtype = {2: numpy.int16, 4: numpy.int32}.get(w.getsampwidth())
+    if dtype is None:
+        w.close()
+        return None
+    rate, channels = w.getframerate(), w.getnchannels()
+    def chunks():
+        with w:
+            while True:
+                data = w.readframes(int(seconds * rate))
+                if not data:
+                    return
+                yield numpy.frombuffer(data, dtype).reshape(-1, channels)
+    return rate, w.getnframes() / rate, chunks()
+
+def mp3_source(filepath, duration, size=WAVEFORM_MP3_CHUNK_BYTES):
+    import pygame.sndarray
+    def chunks():
+        with open(filepath, 'rb') as f:
+            f.seek(id3v2_size(f.read(10)))
+            data = b''
+            while True:
+                block = f.read(size)
+                data += block
+                pos, header = find_mp3_frame(data)
+                if header is None:
+                    return
+                end = pos
+                while header is not None and end + header['length'] <= len(data):
+                    end += header['length']
+                    header = parse_mp3_header(data, end)
+                    if header is None:
+                        following, header = find_mp3_frame(data, end)
+                        end = len(data) if header is None else following
+                if not block:
+                    end = len(data)
+                if end > pos:
+                    yield pygame.sndarray.samples(pygame.mixer.Sound(file=io.BytesIO(data[pos:end])))
+                if not block:
+                    return
+                data = data[end:]
+    return pygame.mixer.get_init()[0], duration, chunks()
+
+def decoded_source(filepath):
+    import pygame.sndarray
+    samples = pygame.sndarray.samples(pygame.mixer.Sound(filepath))
+    rate = pygame.mixer.get_init()[0]
+    return rate, len(samples) / rate, [samples]
+
+def compute_waveform(filepath, duration=None, bins=WAVEFORM_BINS):
+    import numpy
+    extension = filepath.lower().rsplit('.', 1)[-1]
+    if not duration:
+        duration = probe_duration(filepath)[0]
+    source = None
+    if extension == 'wav':
+        try:
+            source = wav_source(filepath)
+        except (wave.Error, EOFError):
+            pass
+    elif extension == 'mp3' and duration:
+        source = mp3_source(filepath, duration)
+    if source is None:
+        if duration and duration > WAVEFORM_MAX_SECONDS:
+            return None
+        source = decoded_source(filepath)
+    rate, duration, chunks = source
+    hop = max(1, int(duration * rate) // (bins * 8))
+    peaks = numpy.zeros(bins * 8 + 1, numpy.float32)
+    power = numpy.zeros(len(peaks))
+    counts = numpy.zeros(len(peaks))
+    position = 0
+    for samples in chunks:
+        if not len(samples):
+            continue
+        if samples.ndim == 1:
+            samples = samples[:, None]
+        scale = float(numpy.iinfo(samples.dtype).max) if samples.dtype.kind == 'i' else 1.0
+        frames = samples.astype(numpy.float32) / scale
+        ids = (position + numpy.arange(len(frames))) // hop
+        if ids[-1] >= len(peaks):
+            grow = numpy.zeros(ids[-1] + 1 - len(peaks))
+            peaks, power, counts = (numpy.concatenate((values, grow)).astype(values.dtype) for values in (peaks, power, counts))
+        starts = numpy.concatenate(([0], numpy.flatnonzero(numpy.diff(ids)) + 1))
+        targets = ids[starts]
+        peaks[targets] = numpy.maximum(peaks[targets], numpy.maximum.reduceat(numpy.abs(frames).max(axis=1), starts))
+        power[targets] += numpy.add.reduceat(numpy.square(frames).sum(axis=1), starts)
+        counts[targets] += numpy.diff(numpy.append(starts, len(frames))) * frames.shape[1]
+        position += len(frames)
+    used = (position + hop - 1) // hop
+    if used < bins:
+        return None
+    edges = numpy.arange(bins) * used // bins
+    rms = numpy.sqrt(numpy.add.reduceat(power[:used], edges) / numpy.maximum(numpy.add.reduceat(counts[:used], edges), 1))
+    peaks = numpy.maximum.reduceat(peaks[:used], edges)
+    quantize = lambda values: (numpy.clip(values, 0.0, 1.0) * 255).astype(numpy.uint8).tobytes()
+    return quantize(peaks), quantize(rms)
+
+def waveform_glyphs(waveform, cells):
+    rms = waveform[1]
+    loudest = max(rms) + 1
+    glyphs = []
+    for cell in range(cells):
+        start = cell * len(rms) // cells
+        stop = max(start + 1, (cell + 1) * len(rms) // cells)
+        glyphs.append(WAVEFORM_GLYPHS[max(rms[start:stop]) * len(WAVEFORM_GLYPHS) // loudest])
+    return ''.join(glyphs)
+
+NORMALIZATION_MODES = ('off', 'track', 'album')
+ALBUM_TAGS = ('talb', 'album', '\xa9alb', 'wm/albumtitle')
+ALBUM_MAX_TRACKS = 64
+REPLAYGAIN_REFERENCE = -18.0
+REPLAYGAIN_RE = re.compile(r'([-+]?\d+(?:\.\d+)?)')
+K_WEIGHTING = (((1.53512485958697, -2.69169618940638, 1.19839281085285), (1.0, -1.69065929318241, 0.73248077421585)),
+               ((1.0, -2.0, 1.0), (1.0, -1.99004745483398, 0.99007225036621)))
+
+def replaygain_from_tags(tags):
+    gains = {}
+    for key, value in tags:
+        name = key.lower().rsplit(':', 1)[-1]
+        match = REPLAYGAIN_RE.search(value)
+        if match is None:
+            continue
+        if name in ('replaygain_track_gain', 'replaygain_album_gain'):
+            gains[name.split('_')[1]] = float(match.group(1))
+        elif name in ('r128_track_gain', 'r128_album_gain'):
+            gains[name.split('_')[1]] = float(match.group(1)) / 256 + 5.0
+    return gains
+
+def album_from_tags(tags):
+    for key, value in tags:
+        if key.lower() in ALBUM_TAGS:
+            return value
+    return None
+
+def measure_loudness(samples, rate, batch=128):
+    import numpy
+    if samples.ndim == 1:
+        samples = samples[:, None]
+    hop = int(rate * 0.1)
+    segments = len(samples) // hop
+    if segments < 4:
+        return None
+    scale = float(numpy.iinfo(samples.dtype).max) if samples.dtype.kind == 'i' else 1.0
+    z = numpy.exp(-2j * numpy.pi * numpy.fft.rfftfreq(hop, 1.0 / rate) / 48000)
+    response = numpy.ones_like(z)
+    for b, a in K_WEIGHTING:
+        response *= numpy.polyval(b[::-1], z) / numpy.polyval(a[::-1], z)
+    weights = (numpy.abs(response) ** 2 * 2 / (hop * hop * scale * scale))[None, :, None]
+    powers = numpy.empty(segments)
+    for start in range(0, segments, batch):
+        stop = min(segments, start + batch)
+        frames = samples[start * hop:stop * hop].astype(numpy.float32).reshape(stop - start, hop, -1)
+        spectrum = numpy.fft.rfft(frames, axis=1)
+        powers[start:stop] = (numpy.square(numpy.abs(spectrum)) * weights).sum(axis=(1, 2))
+    blocks = numpy.convolve(powers, numpy.full(4, 0.25), 'valid')
+    gated = blocks[blocks > 10 ** ((-70 + 0.691) / 10)]
+    if not len(gated):
+        return None
+    gated = gated[gated > gated.mean() / 10]
+    return -0.691 + 10 * math.log10(gated.mean()), float(gated.sum()), len(gated)
+
+def init_decoder():
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    pygame.mixer.init(frequency=44100)
+
+def analyze_loudness(filepath):
+    import pygame.sndarray
+    try:
+        samples = pygame.sndarray.samples(pygame.mixer.Sound(filepath))
+    except (pygame.error, OSError):
+        return None
+    return measure_loudness(samples, pygame.mixer.get_init()[0])
+
+def gain_from_measurements(measurements):
+    power = sum(measurement[1] for measurement in measurements)
+    blocks = sum(measurement[2] for measurement in measurements)
+    if not blocks:
+        return 0.0
+    return REPLAYGAIN_REFERENCE - (-0.691 + 10 * math.log10(power / blocks))
+
+METER_GLYPHS = " ▁▂▃▄▅▆▇█"
+METER_FLOOR_DB = -60.0
+METER_WINDOW_SECONDS = 4.0
+METER_MP3_WINDOW_BYTES = 163840
+METER_MAX_DECODE_SECONDS = 300
+
+def meter_markup(levels, bands, cells, rows):
+    markup = []
+    for name, level in zip("LR", levels):
+        filled = int(level * cells)
+        markup += [('path_value', f" {name} "), ('audio_file', '█' * filled), ('time_separator', '░' * (cells - filled) + '\n')]
+    heights = [int(bands[cell * len(bands) // cells] * rows * 8) for cell in range(cells)] if len(bands) else [0] * cells
+    for row in range(rows - 1, -1, -1):
+        line = ''.join(METER_GLYPHS[min(8, max(0, height - row * 8))] for height in heights)
+        markup.append(('normal', f"\n   {line}"))
+    return markup
+
+def wav_window(filepath, position, seconds):
+    import numpy
+    with wave.open(filepath, 'rb') as w:
+        dtype = {2: numpy.int16, 4: numpy.int32}.get(w.getsampwidth())
+        if dtype is None:
+            return None
+        rate = w.getframerate()
+        w.setpos(min(int(position * rate), w.getnframes()))
+        wanted = int(seconds * rate)
+        samples = numpy.frombuffer(w.readframes(wanted), dtype).reshape(-1, w.getnchannels())
+    return position, rate, samples, len(samples) < wanted
+
+def mp3_window(filepath, position, duration, seek_table):
+    import pygame.sndarray
+    table = seek_table or xing_seek_table(filepath)
+    with open(filepath, 'rb') as f:
+        if table is not None:
+            offset, start = seek_table_offset(table, position)
         else:
-            self.progress_bar.set_text([('normal', "  0"), ('time_separator', '%'), (None, " | " + " " * 83)])
-            self.grannik_text.set_text([('pink_frame', " 00:00:00 / 00:00:00")])
-        if self.main_loop:
-            self.main_loop.set_alarm_in(1, self.update_progress_bar)
+            audio_start = id3v2_size(f.read(10))
+            size = os.fstat(f.fileno()).st_size
+            offset = audio_start + int((size - audio_start) * position / duration) if duration else audio_start
+            start = position if duration else 0.0
+        f.seek(offset)
+        data = f.read(METER_MP3_WINDOW_BYTES)
+    pos, header = find_mp3_frame(data)
+    if header is None:
+        return None
+    samples = pygame.sndarray.samples(pygame.mixer.Sound(file=io.BytesIO(data[pos:])))
+    return start, pygame.mixer.get_init()[0], samples, len(data) < METER_MP3_WINDOW_BYTES
 
-    def update_clock(self, loop=None, data=None):
-        current_time = time.localtime()
-        self.clock_text.set_text(print_pseudographic_time(current_time.tm_hour, current_time.tm_min, current_time.tm_sec))
-        if self.main_loop:
-            self.main_loop.set_alarm_in(1, self.update_clock)
-    def initialize_widget(self):
+def meter_window(filepath, position, duration, seek_table=None, seconds=METER_WINDOW_SECONDS):
+    import pygame.sndarray
+    extension = filepath.lower().rsplit('.', 1)[-1]
+    try:
+        if extension == 'wav':
+            try:
+                return wav_window(filepath, position, seconds)
+            except (wave.Error, EOFError):
+                pass
+        elif extension == 'mp3':
+            return mp3_window(filepath, position, duration, seek_table)
+        if not duration or duration > METER_MAX_DECODE_SECONDS:
+            return None
+        return 0.0, pygame.mixer.get_init()[0], pygame.sndarray.samples(pygame.mixer.Sound(filepath)), True
+    except (pygame.error, OSError, ValueError, TypeError):
+        return None
 
-        self.widget = self.wrap_in_three_frames()
+class LevelMeter:
+    def __init__(self, bridge, callback, source, fps=15, window=2048, budget=0.005):
+        self.bridge = bridge
+        self.callback = callback
+        self.source = source
+        self.interval = 1.0 / fps
+        self.window = window
+        self.budget = budget
+        self.cells = 40
+        self.rows = 8
+        self.stop_event = None
+        self.delivered = threading.Event()
+        self.skipped = 0
 
-    def wrap_in_three_frames(self):
-        term_size = os.get_terminal_size()
-        term_width = term_size.columns
-        term_height = term_size.lines
-        total_border_chars = 6
-
-        available_width = term_width - total_border_chars
-        num_upper_boxes = 3
-        base_status_width = (available_width // 3 + available_width // 4) // 2
-        status_width = max(15, base_status_width + 3)
-        remaining_width = available_width - status_width - 7
-        files_width = remaining_width // 2
-        metadata_width = available_width - files_width - status_width + 2
-
-        total_width_so_far = files_width + status_width + metadata_width + 8
-        if total_width_so_far < available_width:
-            metadata_width += available_width - total_width_so_far
-
-        total_width = term_width - 1
-        left_width = int(total_width * 0.62)
+    @property
+    def visible(self):
+        return self.stop_event is not None
 
-        combined_widget = urwid.Columns([
-            (left_width, self.file_frame),
-            ('weight', 1, self.metadata_frame),
-        ], dividechars=1, box_columns=[0, 1])
-        height_limited_widget = urwid.Filler(combined_widget, height=3, valign='top')
+    def show(self):
+        if self.stop_event is None:
+            self.stop_event = threading.Event()
+            self.delivered.set()
+            threading.Thread(target=self.run, args=(self.stop_event,), daemon=True).start()
 
-        term_size = os.get_terminal_size()
-        term_width = term_size.columns
-        total_border_chars = 6
-        available_width = term_width - total_border_chars
-        num_upper_boxes = 3
-        base_status_width = (available_width // 3 + available_width // 4) // 2
-        status_width = max(15, base_status_width + 3)
-        remaining_width = available_width - status_width - 7
-        files_width = remaining_width // 2
-        metadata_width = available_width - files_width - status_width + 2
-        total_width_so_far = files_width + status_width + metadata_width + 8
-        if total_width_so_far < available_width:
-            metadata_width += available_width - total_width_so_far
-        title = "AMIXER MASTER VOLUME LEVEL"
-        title_with_symbols = f"┤ {title} ├"
-        title_len = len(title_with_symbols)
-        adjusted_width = metadata_width - 2
-        side_len = max(0, (adjusted_width - title_len) // 2)
-        top_line = f'┌{"─" * side_len}{title_with_symbols}{"─" * (adjusted_width - title_len - side_len)}┐'
-        if len(top_line) > metadata_width:
-            top_line = top_line[:metadata_width - 1] + '┐'
-        elif len(top_line) < metadata_width:
-            top_line = top_line[:-1] + '─' * (metadata_width - len(top_line)) + '┐'
-        top_text = urwid.Filler(urwid.Text(('pink_frame', top_line), align='left'), valign='top')
-        side_borders = urwid.LineBox(self.system_volume_bar, lline='│', rline='│', tline='', bline='─', tlcorner='', trcorner='', blcorner='└', brcorner='┘')
-        new_right_frame = urwid.Pile([(1, top_text), ('weight', 1, side_borders)])
-        box02_clone = urwid.AttrMap(new_right_frame, 'pink_frame')
-
-        term_size = os.get_terminal_size()
-        term_width = term_size.columns
-        total_border_chars = 6
-        available_width = term_width - total_border_chars
-        num_upper_boxes = 3
-        base_status_width = (available_width // 3 + available_width // 4) // 2
-        status_width = max(15, base_status_width + 3)
-        remaining_width = available_width - status_width - 7
-        files_width = remaining_width // 2
-        metadata_width = available_width - files_width - status_width + 2
-        total_width_so_far = files_width + status_width + metadata_width + 8
-        if total_width_so_far < available_width:
-            metadata_width += available_width - total_width_so_far
-
-        title = "AMIXER HEADPHONE LEFT VOLUME LEVEL"
-        title_with_symbols = f"┤ {title} ├"
-        title_len = len(title_with_symbols)
-        adjusted_width = metadata_width - 2
-        side_len = max(0, (adjusted_width - title_len) // 2)
-        top_line = f'┌{"─" * side_len}{title_with_symbols}{"─" * (adjusted_width - title_len - side_len)}┐'
-        if len(top_line) > metadata_width:
-            top_line = top_line[:metadata_width - 1] + '┐'
-        elif len(top_line) < metadata_width:
-            top_line = top_line[:-1] + '─' * (metadata_width - len(top_line)) + '┐'
-        top_text = urwid.Filler(urwid.Text(('pink_frame', top_line), align='left'), valign='top')
-        side_borders = urwid.LineBox(self.headphone_left_bar, lline='│', rline='│', tline='', bline='─', tlcorner='', trcorner='', blcorner='└', brcorner='┘')
-        new_right_frame = urwid.Pile([(1, top_text), ('weight', 1, side_borders)])
-        box02_clone2 = urwid.AttrMap(new_right_frame, 'pink_frame')
-
-        term_size = os.get_terminal_size()
-        term_width = term_size.columns
-        total_border_chars = 6
-        available_width = term_width - total_border_chars
-        num_upper_boxes = 3
-        base_status_width = (available_width // 3 + available_width // 4) // 2
-        status_width = max(15, base_status_width + 3)
-        remaining_width = available_width - status_width - 7
-        files_width = remaining_width // 2
-        metadata_width = available_width - files_width - status_width + 2
-        total_width_so_far = files_width + status_width + metadata_width + 8
-        if total_width_so_far < available_width:
-            metadata_width += available_width - total_width_so_far
-
-        title = "AMIXER HEADPHONE RIGHT VOLUME LEVEL"
-        title_with_symbols = f"┤ {title} ├"
-        title_len = len(title_with_symbols)
-        adjusted_width = metadata_width - 2
-        side_len = max(0, (adjusted_width - title_len) // 2)
-        top_line = f'┌{"─" * side_len}{title_with_symbols}{"─" * (adjusted_width - title_len - side_len)}┐'
-        if len(top_line) > metadata_width:
-            top_line = top_line[:metadata_width - 1] + '┐'
-        elif len(top_line) < metadata_width:
-            top_line = top_line[:-1] + '─' * (metadata_width - len(top_line)) + '┐'
-        top_text = urwid.Filler(urwid.Text(('pink_frame', top_line), align='left'), valign='top')
-        side_borders = urwid.LineBox(self.headphone_right_bar, lline='│', rline='│', tline='', bline='─', tlcorner='', trcorner='', blcorner='└', brcorner='┘')
-        new_right_frame = urwid.Pile([(1, top_text), ('weight', 1, side_borders)])
-        box02_clone3 = urwid.AttrMap(new_right_frame, 'pink_frame')
-
-        header_height = 3
-        frame_border_height = 2
-        available_height = term_height - header_height - frame_border_height
+    def hide(self):
+        if self.stop_event is not None:
+            self.stop_event.set()
+            self.stop_event = None
 
-        upper_boxes_height = 3
-        min_footer_height = 8
-
-        columns_height = max(21, available_height - upper_boxes_height - min_footer_height - 1) # 21 -1
-
-        title = "FILES AND DIRECTORIES OF THE LINUX OS"
-        title_with_symbols = f"┤ {title} ├"
-        title_len = len(title_with_symbols)
-        adjusted_width = left_width - 2
-        side_len = max(0, (adjusted_width - title_len) // 2)
-        top_line = f'┌{"─" * side_len}{title_with_symbols}{"─" * (adjusted_width - title_len - side_len)}┐'
-        if len(top_line) > left_width:
-            top_line = top_line[:left_width - 1] + '┐'
-        elif len(top_line) < left_width:
-            top_line = top_line[:-1] + '─' * (left_width - len(top_line)) + '┐'
-        top_text = urwid.Filler(urwid.Text(('pink_frame', top_line), align='left'), valign='top')
-        side_borders = urwid.LineBox(self, lline='│', rline='│', tline='', bline='─', tlcorner='', trcorner='', blcorner='└', brcorner='┘')
-        new_left_frame = urwid.Pile([(1, top_text), ('weight', 1, side_borders)])
-        new_left_frame = urwid.AttrMap(new_left_frame, 'pink_frame')
-        new_left_frame_filler = urwid.Filler(new_left_frame, height=columns_height, valign='top')
-        self.metadata_output = urwid.Text("", align='left')
-        self.metadata_filler = urwid.Filler(self.metadata_output, valign='top')
+    def deliver(self, stop_event, markup):
+        self.delivered.set()
+        if not stop_event.is_set():
+            self.callback(markup)
 
-        self.metadata_output = urwid.Text("", align='left')
-        self.metadata_filler = urwid.Filler(self.metadata_output, valign='top')
-        title = "INFO"
-        title_with_symbols = f"┤ {title} ├"
-        title_len = len(title_with_symbols)
-        adjusted_width = metadata_width - 2
-        side_len = max(0, (adjusted_width - title_len) // 2)
-        top_line = f'┌{"─" * side_len}┤ {title} ├{"─" * (adjusted_width - title_len - side_len)}┐'
-        if len(top_line) > metadata_width:
-            top_line = top_line[:metadata_width - 1] + '┐'
-        elif len(top_line) < metadata_width:
-            top_line = top_line[:-1] + '─' * (metadata_width - len(top_line)) + '┐'
-        top_text = urwid.Filler(urwid.Text(('pink_frame', top_line), align='left'), valign='top')
-        side_borders = urwid.LineBox(self.metadata_filler, lline='│', rline='│', tline='', bline='─', tlcorner='', trcorner='', blcorner='└', brcorner='┘')
-        new_right_frame = urwid.Pile([(1, top_text), ('weight', 1, side_borders)])
-        new_right_frame = urwid.AttrMap(new_right_frame, 'pink_frame')
-        new_right_frame_filler = urwid.Filler(new_right_frame, height=columns_height, valign='top')
-        new_frames_widget = urwid.Columns([
-            (left_width, new_left_frame_filler),
-            ('weight', 1, new_right_frame_filler)
-        ], dividechars=1)
+    def post(self, stop_event, markup):
+        self.delivered.clear()
+        self.bridge.call(self.deliver, stop_event, markup)
 
-        new_frames_widget = urwid.Columns([
-            (left_width, new_left_frame_filler),
-            ('weight', 1, new_right_frame_filler)
-        ], dividechars=1)
+    def run(self, stop_event):
+        import numpy
+        loaded = samples = None
+        start = end = 0.0
+        last_frame = None
+        rate = None
+        complete = True
+        taper = numpy.hanning(self.window).astype(numpy.float32)
+        while not stop_event.wait(self.interval):
+            current = self.source()
+            filepath, position, duration, seek_table = current if current else (None, 0.0, 0, None)
+            if filepath != loaded or position < start or (position > end and not complete):
+                loaded, samples, start, complete = filepath, None, position, True
+                window = meter_window(filepath, position, duration, seek_table) if filepath is not None else None
+                if window is not None:
+                    start, rate, samples, complete = window
+                    if samples.ndim == 1:
+                        samples = samples[:, None]
+                    end = start + (len(samples) - self.window) / rate
+            offset = int((position - start) * rate) if samples is not None else None
+            frame = (loaded, offset, self.cells, self.rows)
+            if frame == last_frame or not self.delivered.is_set():
+                continue
+            last_frame = frame
+            started = time.perf_counter()
+            levels, bands = (0.0, 0.0), ()
+            if samples is not None and 0 <= offset < len(samples):
+                chunk = samples[offset:offset + self.window].astype(numpy.float32)
+                if samples.dtype.kind == 'i':
+                    chunk /= numpy.iinfo(samples.dtype).max
+                rms = numpy.sqrt(numpy.square(chunk).mean(axis=0))
+                decibels = 20 * numpy.log10(numpy.maximum(rms, 1e-6))
+                levels = tuple(numpy.clip(1 - decibels / METER_FLOOR_DB, 0, 1)[[0, -1]])
+                spectrum = numpy.abs(numpy.fft.rfft(chunk.mean(axis=1) * taper[:len(chunk)], self.window))
+                edges = numpy.unique(numpy.geomspace(2, len(spectrum) - 1, self.cells + 1).astype(numpy.int64))
+                peaks = numpy.maximum.reduceat(spectrum, edges[:-1]) / (self.window / 4)
+                bands = numpy.clip(1 - 20 * numpy.log10(numpy.maximum(peaks, 1e-6)) / METER_FLOOR_DB, 0, 1).tolist()
+            self.post(stop_event, meter_markup(levels, bands, self.cells, self.rows))
+            elapsed = time.perf_counter() - started
+            if elapsed > self.budget:
+                skip = int(elapsed / self.budget)
+                self.skipped += skip
+                if stop_event.wait(self.interval * skip):
+                    break
 
-        footer_width = left_width
-        footer_height = available_height - columns_height - upper_boxes_height
-        box_height = max(min_footer_height + 1, footer_height)
+SEEK_TABLE_STEP = 1.0
 
-        divider_width = 2
-        available_footer_width = footer_width - divider_width
-        box1_width = 23
-        box2_width = 33
-        box4_width = available_footer_width - box1_width - box2_width - divider_width + 2
+def xing_seek_table(filepath):
+    with open(filepath, 'rb') as f:
+        audio_start = id3v2_size(f.read(10))
+        f.seek(audio_start)
+        data = f.read(65536)
+    pos, header = find_mp3_frame(data)
+    if header is None:
+        return None
+    xing = xing_position(header, pos)
+    if data[xing:xing + 4] != b'Xing' or len(data) < xing + 116:
+        return None
+    flags, frames, stream_bytes = struct.unpack('>III', data[xing + 4:xing + 16])
+    if flags & 7 != 7 or not frames:
+        return None
+    start = audio_start + pos
+    duration = frames * header['samples'] / header['sample_rate']
+    return duration / 100, array('Q', (start + toc * stream_bytes // 256 for toc in data[xing + 16:xing + 116]))
 
-        self.grannik_text = urwid.Text(" 00:00:00 / 00:00:00", align='left')
-        title = "PLAYBACK TIME"
-        title_with_symbols = f"┤ {title} ├"
-        title_len = len(title_with_symbols)
-        adjusted_width = box1_width - 2
-        side_len = max(0, (adjusted_width - title_len) // 2)
-        top_line = f'┌{"─" * side_len}{title_with_symbols}{"─" * (adjusted_width - title_len - side_len)}┐'
-        top_text = urwid.Filler(urwid.Text(('pink_frame', top_line), align='left'), valign='top')
-
-        side_borders = urwid.LineBox(self.grannik_text, lline='│', rline='│',
-                                     tline='', bline='',
-                                     tlcorner='', trcorner='',
-                                     blcorner='', brcorner='')
-
-        footer_line = f'└{"─" * (len(top_line) - 2)}┘'
-        footer_text = urwid.Filler(urwid.Text(('pink_frame', footer_line), align='left'), valign='top')
+def scan_mp3_seek_table(filepath, step=SEEK_TABLE_STEP, cancelled=lambda: False):
+    offsets = array('Q')
+    with open(filepath, 'rb') as f:
+        base = id3v2_size(f.read(10))
+        f.seek(base)
+        data = f.read(1 << 20)
+        pos, header = find_mp3_frame(data)
+        if header is None:
+            return None
+        elapsed = 0.0
+        mark = 0.0
+        while not cancelled():
+            if pos + 4 > len(data):
+                if pos > len(data):
+                    f.seek(pos - len(data), os.SEEK_CUR)
+                chunk = f.read(1 << 20)
+                if not chunk:
+                    break
+                base += pos
+                data = data[pos:] + chunk
+                pos = 0
+                continue
+            header = parse_mp3_header(data, pos)
+            if header is None or header['length'] <= 0:
+                found, _ = find_mp3_frame(data, pos + 1)
+                pos = len(data) - 3 if found is None else found
+                continue
+            if elapsed >= mark:
+                offsets.append(base + pos)
+                mark += step
+            elapsed += header['samples'] / header['sample_rate']
+            pos += header['length']
+        else:
+            return None
+    return (step, offsets) if offsets else None
 
-        framed_widget = urwid.Pile([(1, top_text), ('weight', 1, side_borders), (1, footer_text)])
-        box1 = urwid.AttrMap(framed_widget, 'pink_frame')
-        box1_filler = urwid.Filler(box1, height=box_height, valign='middle')
+def seek_table_offset(table, seconds):
+    step, offsets = table
+    position = seconds / step
+    index = min(int(position), len(offsets) - 1)
+    if index + 1 < len(offsets):
+        return offsets[index] + int((offsets[index + 1] - offsets[index]) * (position - index)), seconds
+    return offsets[index], index * step
 
-        title = "CURRENT DATE"
-        title_with_symbols = f"┤ {title} ├"
-        title_len = len(title_with_symbols)
-        adjusted_width = box2_width - 2
-        side_len = max(0, (adjusted_width - title_len) // 2)
-        top_line = f'┌{"─" * side_len}{title_with_symbols}{"─" * (adjusted_width - title_len - side_len)}┐'
-        top_text = urwid.Filler(urwid.Text(('pink_frame', top_line), align='left'), valign='top')
+class FileWindow(io.RawIOBase):
+    def __init__(self, filepath, offset):
+        self.file = open(filepath, 'rb')
+        self.offset = offset
+        self.namehint = filepath.rsplit('.', 1)[-1].lower()
+        self.file.seek(offset)
 
-        side_borders = urwid.LineBox(urwid.Text([
-            ('normal', get_date_string().split('|')[0].split('/')[0]),
-            ('path_value', '/'),
-            ('normal', get_date_string().split('|')[0].split('/')[1]),
-            ('path_value', '|'),
-            ('normal', get_date_string().split('|')[1].split('/')[0]),
-            ('path_value', '/'),
-            ('normal', get_date_string().split('|')[1].split('/')[1]),
-        ], align='center'), lline='│', rline='│', tline='', bline='', tlcorner='', trcorner='', blcorner='', brcorner='')
+    def readable(self):
+        return True
 
-        footer_line = f'└{"─" * (len(top_line) - 2)}┘'
-        footer_text = urwid.Filler(urwid.Text(('pink_frame', footer_line), align='left'), valign='top')
+    def seekable(self):
+        return True
 
-        framed_widget = urwid.Pile([(1, top_text), ('weight', 1, side_borders), (1, footer_text)])
-        box2 = urwid.AttrMap(framed_widget, 'pink_frame')
-        box2_filler = urwid.Filler(box2, height=3, valign='middle')
+    def readinto(self, buffer):
+        return self.file.readinto(buffer)
 
-        current_time = time.localtime()
-        test_text = urwid.Text(print_pseudographic_time(current_time.tm_hour, current_time.tm_min, current_time.tm_sec), align='center')
-        self.clock_text = test_text
-        title = "CURRENT TIME"
-        title_with_symbols = f"┤ {title} ├"
-        title_len = len(title_with_symbols)
-        adjusted_width = box2_width - 2
-        side_len = max(0, (adjusted_width - title_len) // 2)
-        top_line = f'┌{"─" * side_len}{title_with_symbols}{"─" * (adjusted_width - title_len - side_len)}┐'
-        top_text = urwid.Filler(urwid.Text(('pink_frame', top_line), align='left'), valign='top')
-
-        side_borders = urwid.LineBox(test_text, lline='│', rline='│',
-                                     tline='', bline='',
-                                     tlcorner='', trcorner='',
-                                     blcorner='', brcorner='')
-
-        footer_line = f'└{"─" * (len(top_line) - 2)}┘'
-        footer_text = urwid.Filler(urwid.Text(('pink_frame', footer_line), align='left'), valign='top')
+    def seek(self, pos, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            pos += self.offset
+        return max(0, self.file.seek(pos, whence) - self.offset)
 
-        framed_widget = urwid.Pile([(1, top_text), ('weight', 1, side_borders), (1, footer_text)])
-        test_box_attr = urwid.AttrMap(framed_widget, 'pink_frame')
-        test_box_filler = urwid.Filler(test_box_attr, height=6, valign='top')
+    def tell(self):
+        return self.file.tell() - self.offset
 
-        box2_with_test = urwid.Pile([
-            (3, box2_filler),
-            (6, test_box_filler)
-        ])
+    def close(self):
+        self.file.close()
+        super().close()
+
+def open_mp3_at(filepath, offset):
+    with open(filepath, 'rb') as f:
+        f.seek(offset)
+        data = f.read(16384)
+    pos, header = find_mp3_frame(data)
+    if header is None:
+        return None
+    return FileWindow(filepath, offset + pos)
+
+class PositionClock:
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.offset = 0.0
+        self.started = None
+
+    def start(self, offset=0.0):
+        self.offset = offset
+        self.started = self.clock()
+
+    def pause(self):
+        if self.started is not None:
+            self.offset = self.position()
+            self.started = None
+
+    def resume(self):
+        if self.started is None:
+            self.started = self.clock()
+
+    def reset(self):
+        self.offset = 0.0
+        self.started = None
+
+    def position(self):
+        if self.started is None:
+            return self.offset
+        return self.offset + self.clock() - self.started
+
+MUSIC_ROOT = os.environ.get('AUDIOPLAYERTERMPY_MUSIC_ROOT') or os.path.expanduser('~/Music')
+
+class LibraryIndex:
+    VERSION = 2
+
+    def __init__(self, root, index_path=None, metadata_cache=None):
+        self.root = os.path.abspath(os.path.expanduser(root))
+        digest = hashlib.sha1(os.fsencode(self.root)).hexdigest()[:16]
+        self.index_path = index_path or os.path.join(CACHE_DIR, f'library-{digest}.marshal')
+        self.metadata_cache = metadata_cache
+        self.dirs = {}
+        self.paths = None
+        self.loaded = False
+        self.lock = threading.Lock()
+
+    def load(self):
+        try:
+            with open(self.index_path, 'rb') as f:
+                version, root, dirs = marshal.loads(f.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            return
+        if version == self.VERSION and root == self.root:
+            with self.lock:
+                self.dirs = dirs
+                self.paths = None
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        temp_path = f'{self.index_path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(marshal.dumps((self.VERSION, self.root, self.dirs)))
+        os.replace(temp_path, self.index_path)
+
+    def rescan(self, cancelled=lambda: False):
+        if not self.loaded:
+            self.load()
+            self.loaded = True
+        old = self.dirs
+        new = {}
+        changed = False
+        stack = ['']
+        while stack and not cancelled():
+            rel = stack.pop()
+            path = os.path.join(self.root, rel)
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            entry = old.get(rel)
+            if entry is None or entry[0] != mtime:
+                try:
+                    entry = self.scan_dir(path, mtime, entry)
+                except OSError:
+                    continue
+                changed = True
+            new[rel] = entry
+            stack.extend(os.path.join(rel, name) for name in reversed(entry[1]))
+        if cancelled() or not changed and len(new) == len(old):
+            return False
+        with self.lock:
+            self.dirs = new
+            self.paths = None
+        self.save()
+        return True
+
+    def scan_dir(self, path, mtime, previous):
+        known = {}
+        if previous is not None:
+            known = dict(zip(previous[2], zip(*previous[3:])))
+        subdirs, files = [], []
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.name.startswith('.'):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.name)
+                    elif entry.name.lower().rsplit('.', 1)[-1] in AUDIO_EXTENSIONS and entry.is_file():
+                        st = entry.stat()
+                        info = known.get(entry.name)
+                        if info is None or info[0] != st.st_size or info[1] != st.st_mtime_ns:
+                            info = (st.st_size, st.st_mtime_ns) + self.stream_info(entry.path)
+                        files.append((entry.name,) + info)
+                except OSError:
+                    continue
+        if self.metadata_cache is not None:
+            self.metadata_cache.commit()
+        subdirs.sort()
+        files.sort()
+        return (mtime, tuple(subdirs)) + (tuple(zip(*files)) if files else ((),) * 7)
+
+    def stream_info(self, path):
+        try:
+            info = self.metadata_cache.get(path, commit=False) if self.metadata_cache is not None else read_metadata(path)
+        except Exception:
+            info = None
+        duration = probe_duration(path)[0]
+        if info is None:
+            return duration, None, None, None
+        return duration or info['duration'], info['bitrate'], info['sample_rate'], info['channels']
+
+    def relative_paths(self):
+        with self.lock:
+            if self.paths is None:
+                paths = []
+                for rel, entry in self.dirs.items():
+                    paths.extend(os.path.join(rel, name) for name in entry[2])
+                paths.sort()
+                self.paths = paths
+            return self.paths
+
+    def __len__(self):
+        with self.lock:
+            return sum(len(entry[2]) for entry in self.dirs.values())
+
+END_RECHECK = 0.25
+UNKNOWN_END_RECHECK = 1.0
+
+def end_delay(duration, position):
+    if not duration:
+        return UNKNOWN_END_RECHECK
+    return max(END_RECHECK, duration - position)
+
+# SDL only delivers the music end event through its event queue, and SDL_WaitEvent polls that
+# queue every millisecond even with no timeout, so the watcher sleeps until the predicted end instead.
+class MusicEndWatcher:
+    def __init__(self, bridge, callback):
+        self.bridge = bridge
+        self.callback = callback
+        self.condition = threading.Condition()
+        self.deadline = None
+        self.generation = None
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def arm(self, generation, remaining):
+        with self.condition:
+            self.generation = generation
+            self.deadline = time.monotonic() + max(0.0, remaining)
+            self.condition.notify()
+
+    def disarm(self):
+        with self.condition:
+            self.deadline = None
+            self.condition.notify()
+
+    def run(self):
+        with self.condition:
+            while True:
+                if self.deadline is None:
+                    self.condition.wait()
+                    continue
+                remaining = self.deadline - time.monotonic()
+                if remaining > 0:
+                    self.condition.wait(remaining)
+                    continue
+                self.deadline = None
+                self.bridge.call(self.callback, self.generation)
+
+MIXER_CHANNEL_RE = re.compile(r'^\s*([A-Za-z][A-Za-z ]*?): Playback .*?\[(\d+)%\]')
+MIXER_CHANNEL_ARGS = {'left': 'frontleft', 'right': 'frontright'}
+MIXER_ERRORS = (OSError, subprocess.SubprocessError, EOFError)
+
+def parse_amixer_levels(lines):
+    levels = {}
+    for line in lines:
+        match = MIXER_CHANNEL_RE.match(line)
+        if match:
+            levels[match.group(1)] = int(match.group(2))
+    return levels
+
+def amixer_change_args(control, delta, channel=None):
+    args = [control]
+    if channel:
+        args.append(MIXER_CHANNEL_ARGS[channel])
+    args.append(f"{abs(delta)}%{'+' if delta >= 0 else '-'}")
+    return args
+
+class AlsaaudioMixerBackend:
+    def __init__(self):
+        import alsaaudio
+        self.alsaaudio = alsaaudio
+        self.errors = MIXER_ERRORS + (alsaaudio.ALSAAudioError,)
+        self.controls = set(alsaaudio.mixers())
+        self.mixers = {}
+
+    def mixer(self, control):
+        if control not in self.mixers:
+            self.mixers[control] = self.alsaaudio.Mixer(control)
+        return self.mixers[control]
+
+    def get(self, control):
+        if control not in self.controls:
+            return {}
+        volumes = self.mixer(control).getvolume()
+        if len(volumes) == 1:
+            return {'Mono': volumes[0]}
+        return dict(zip(['Front Left', 'Front Right'], volumes))
+
+    def change(self, control, delta, channel=None):
+        if control not in self.controls:
+            return {}
+        mixer = self.mixer(control)
+        volumes = mixer.getvolume()
+        for index, volume in enumerate(volumes):
+            if channel is None or index == ('left', 'right').index(channel):
+                mixer.setvolume(max(0, min(100, volume + delta)), index)
+        return self.get(control)
+
+class AmixerCommandBackend:
+    errors = MIXER_ERRORS
+
+    def __init__(self):
+        output = run_command(['amixer', 'scontrols']).stdout
+        self.controls = set(re.findall(r"Simple mixer control '([^']+)',0", output))
+
+    def run(self, args):
+        return parse_amixer_levels(run_command(['amixer'] + args).stdout.splitlines())
+
+    def get(self, control):
+        if control not in self.controls:
+            return {}
+        return self.run(['sget', control])
+
+    def change(self, control, delta, channel=None):
+        if control not in self.controls:
+            return {}
+        return self.run(['sset'] + amixer_change_args(control, delta, channel))
+
+class AmixerCoprocessBackend(AmixerCommandBackend):
+    timeout = 0.5
+
+    def __init__(self):
+        super().__init__()
+        command = ['amixer', '-s']
+        if shutil.which('stdbuf'):
+            command = ['stdbuf', '-oL'] + command
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        METRICS.count('subprocess amixer -s')
+        self.buffer = b''
+
+    def run(self, args):
+        started = time.perf_counter()
+        try:
+            self.process.stdin.write((' '.join(args) + '\n').encode())
+            self.process.stdin.flush()
+            return self.read_block()
+        finally:
+            METRICS.record('amixer -s request', time.perf_counter() - started)
+
+    def readline(self, deadline):
+        fd = self.process.stdout.fileno()
+        while b'\n' not in self.buffer:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                raise TimeoutError("amixer did not answer")
+            chunk = os.read(fd, 4096)
+            if not chunk:
+                raise EOFError("amixer exited")
+            self.buffer += chunk
+        line, self.buffer = self.buffer.split(b'\n', 1)
+        return line.decode(errors='replace')
+
+    def read_block(self):
+        deadline = time.monotonic() + self.timeout
+        expected = None
+        lines = []
+        while expected is None or not expected <= parse_amixer_levels(lines).keys():
+            line = self.readline(deadline)
+            lines.append(line)
+            if line.strip().startswith('Playback channels:'):
+                expected = {channel.strip() for channel in line.split(':', 1)[1].split(' - ')}
+        return parse_amixer_levels(lines)
+
+    def close(self):
+        self.process.kill()
+
+class MixerControl:
+    BACKENDS = (AlsaaudioMixerBackend, AmixerCoprocessBackend, AmixerCommandBackend)
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.backends = list(self.BACKENDS)
+        self.backend = None
+        self.started = False
+
+    def next_backend(self):
+        if self.backend is not None and hasattr(self.backend, 'close'):
+            self.backend.close()
+        self.backend = None
+        while self.backends and self.backend is None:
+            try:
+                self.backend = self.backends.pop(0)()
+            except Exception:
+                self.backend = None
+
+    def call(self, method, *args):
+        with self.lock:
+            if not self.started:
+                self.started = True
+                self.next_backend()
+            while self.backend is not None:
+                try:
+                    return getattr(self.backend, method)(*args)
+                except self.backend.errors:
+                    self.next_backend()
+                if method == 'change':
+                    method, args = 'get', args[:1]
+            return {}
+
+    def master(self, delta=0):
+        levels = self.call('change', 'Master', delta) if delta else self.call('get', 'Master')
+        return next(iter(levels.values()), None)
+
+    def headphone(self, delta=0, channel=None):
+        levels = self.call('change', 'Headphone', delta, channel) if delta else self.call('get', 'Headphone')
+        if 'Mono' in levels:
+            return levels['Mono'], levels['Mono']
+        return levels.get('Front Left'), levels.get('Front Right')
+
+class VolumeController:
+    def __init__(self, core, bridge, callback):
+        self.core = core
+        self.bridge = bridge
+        self.callback = callback
+        self.main_loop = None
+        self.pending = {}
+        self.batch_started = None
+        self.flush_scheduled = False
+        self.busy = False
+        self.worker = ThreadPoolExecutor(max_workers=1)
+
+    def add(self, target, delta):
+        self.start_batch()
+        self.pending[target] = self.pending.get(target, 0) + delta
+        self.schedule_flush()
+
+    def set(self, target, value):
+        self.start_batch()
+        self.pending[target] = value
+        self.schedule_flush()
+
+    def start_batch(self):
+        if self.batch_started is None:
+            self.batch_started = time.monotonic()
+
+    def schedule_flush(self):
+        if self.busy or self.flush_scheduled:
+            return
+        self.flush_scheduled = True
+        if self.main_loop is not None:
+            self.main_loop.set_alarm_in(0, self.flush)
+        else:
+            self.flush()
+
+    def flush(self, loop=None, data=None):
+        self.flush_scheduled = False
+        if self.busy or not self.pending:
+            return
+        batch, self.pending = self.pending, {}
+        started, self.batch_started = self.batch_started, None
+        self.busy = True
+        self.worker.submit(self.apply, batch, started)
+
+    def apply(self, batch, started):
+        results = {}
+        try:
+            if 'pygame' in batch:
+                self.apply_target(results, 'player', self.core.set_volume)
+            if batch.get('master'):
+                self.apply_target(results, 'system', self.core.change_mixer, master=batch['master'])
+            left, right = batch.get('left', 0), batch.get('right', 0)
+            if left and left == right:
+                self.apply_target(results, 'headphone', self.core.change_mixer, left=left, right=right)
+            else:
+                if left:
+                    self.apply_target(results, 'left headphone', self.core.change_mixer, left=left)
+                if right:
+                    self.apply_target(results, 'right headphone', self.core.change_mixer, right=right)
+        finally:
+            self.bridge.call(self.applied, results, started)
+
+    def apply_target(self, results, label, change, **kwargs):
+        try:
+            results.update(change(**kwargs) or {})
+        except Exception as e:
+            results.setdefault('errors', []).append(f"{label}: {e}")
+
+    def applied(self, results, started):
+        self.busy = False
+        METRICS.record('volume applied', time.monotonic() - started)
+        self.callback(results)
+        if self.pending:
+            self.schedule_flush()
+
+TIME_CHAR_MARKUP = {c: ('normal' if c.isdigit() else 'time_separator,bold', c) for c in "0123456789:, day"}
+IDLE_TIME_MARKUP = [('pink_frame', " 00:00:00 / 00:00:00")]
+
+def progress_markup(percent, cells):
+    filled = min(cells, percent * cells // 100)
+    return [('normal', f"{percent:3d}"), ('time_separator', '%'), (None, f" | {'░' * filled}{' ' * (cells - filled)}")]
+
+def waveform_markup(percent, glyphs):
+    filled = min(len(glyphs), percent * len(glyphs) // 100)
+    return [('normal', f"{percent:3d}"), ('time_separator', '%'), (None, " | "),
+            ('audio_file', glyphs[:filled]), ('time_separator', glyphs[filled:])]
+
+class RenderCache:
+    def __init__(self, max_widths=4):
+        self.bars = OrderedDict()
+        self.max_widths = max_widths
+        self.durations = {}
+
+    def bar(self, builder, percent, cells):
+        key = (builder, cells)
+        markups = self.bars.get(key)
+        if markups is None:
+            METRICS.count('render cache miss')
+            markups = self.bars[key] = [builder(p, cells) for p in range(101)]
+            if len(self.bars) > self.max_widths * 2:
+                self.bars.popitem(last=False)
+        else:
+            METRICS.count('render cache hit')
+        return markups[max(0, min(100, percent))]
+
+    def progress(self, percent, cells):
+        return self.bar(progress_markup, percent, cells)
+
+    def waveform(self, percent, glyphs):
+        return self.bar(waveform_markup, percent, glyphs)
+
+    def volume(self, percent, cells):
+        if percent is None:
+            return volume_markup(None, cells)
+        return self.bar(volume_markup, percent, cells)
+
+    def duration(self, duration_str):
+        markup = self.durations.get(duration_str)
+        if markup is None:
+            if len(self.durations) > 64:
+                self.durations.clear()
+            markup = self.durations[duration_str] = [('time_separator,bold', " / ")] + [TIME_CHAR_MARKUP.get(c, ('normal', c)) for c in duration_str]
+        return markup
+
+def volume_markup(percent, cells=50):
+    if percent is None:
+        return " --% | " + " " * cells
+    filled = min(cells, percent * cells // 100)
+    return [('normal', f" {percent}"), ('time_separator', '%'), (None, f" | {'░' * filled + ' ' * (cells - filled)}")]
+
+class LayoutEngine:
+    def __init__(self, size=None):
+        self.size = tuple(size or shutil.get_terminal_size())
+        self.geometries = {}
+        self.borders = {}
+        self.bindings = []
+
+    def geometry(self, size=None):
+        size = size or self.size
+        geometry = self.geometries.get(size)
+        if geometry is None:
+            geometry = self.geometries[size] = self.compute_geometry(*size)
+        return geometry
+
+    @staticmethod
+    def compute_geometry(columns, lines):
+        left_width = int((columns - 1) * 0.62)
+        metadata_width = columns - 3 - left_width
+        available_height = lines - 3 - 2
+        columns_height = max(21, available_height - 3 - 8 - 1)
+        return {
+            'columns': columns,
+            'left_width': left_width,
+            'metadata_width': metadata_width,
+            'columns_height': columns_height,
+            'box_height': max(9, available_height - columns_height - 3),
+            'box1_width': 23,
+            'box2_width': 33,
+            'box4_width': max(4, left_width - 2 - 23 - 33),
+            'progress_cells': max(0, left_width - 15),
+            'volume_cells': max(0, metadata_width - 10),
+            'meter_cells': max(1, metadata_width - 6),
+            'meter_rows': max(1, min(16, columns_height - 6)),
+        }
+
+    def border(self, kind, title, width):
+        key = (kind, title, width)
+        line = self.borders.get(key)
+        if line is None:
+            line = self.borders[key] = self.build_border(kind, title, width)
+        return line
+
+    def build_border(self, kind, title, width):
+        if kind == 'top':
+            title_with_symbols = f"┤ {title} ├"
+            title_len = len(title_with_symbols)
+            adjusted_width = width - 2
+            side_len = max(0, (adjusted_width - title_len) // 2)
+            line = f'┌{"─" * side_len}{title_with_symbols}{"─" * (adjusted_width - title_len - side_len)}┐'
+            if len(line) > width:
+                line = line[:width - 1] + '┐'
+            elif len(line) < width:
+                line = line[:-1] + '─' * (width - len(line)) + '┐'
+            return line
+        if kind == 'bottom':
+            return f'└{"─" * (width - 2)}┘'
+        if kind == 'path':
+            side_len = max(0, (width - 4 - len(f"┤ {title} ├")) // 2)
+            line = f'┌{"─" * side_len}┤ {title} ├{"─" * side_len}'
+            if len(line) < width - 2:
+                return line + "─" * (width - len(line) - 3) + "┐"
+            if len(line) >= width - 1:
+                return line[:width - 3] + "┐"
+            return line + "┐"
+        if kind == 'path_bottom':
+            line = f'└{"─" * (len(self.border("path", title, width)) - 2)}┘'
+            return line[:width - 2] if len(line) > width - 1 else line
+        if kind == 'header':
+            side_len = max(1, (width - len(title) - 2) // 2)
+            return f'╔{"═" * side_len}{title}{"═" * (side_len + width % 2)}╗'
+        if kind == 'header_bottom':
+            return '╚' + '═' * (len(self.border('header', title, width)) - 2) + '╝'
+        raise ValueError(kind)
+
+    def bind(self, key, apply):
+        value = key(self.geometry())
+        apply(value)
+        self.bindings.append([key, apply, value])
+
+    def resize(self, size):
+        size = tuple(size)
+        if size == self.size:
+            return 0
+        self.size = size
+        geometry = self.geometry()
+        changed = 0
+        for binding in self.bindings:
+            value = binding[0](geometry)
+            if value != binding[2]:
+                binding[2] = value
+                binding[1](value)
+                changed += 1
+        return changed
+
+    def border_text(self, kind, title, width_key, attr='pink_frame', align='left'):
+        text = urwid.Text('', align=align)
+        self.bind(lambda geometry: self.border(kind, title, geometry[width_key]), lambda line: text.set_text((attr, line)))
+        return text
+
+    def bind_column(self, columns, index, width_key):
+        def apply(width):
+            widget, options = columns.contents[index]
+            columns.contents[index] = (widget, columns.options(options[0], width, options[2]))
+        self.bind(lambda geometry: geometry[width_key], apply)
+
+    def bind_pile(self, pile, index, height_key):
+        def apply(height):
+            widget, options = pile.contents[index]
+            pile.contents[index] = (widget, pile.options(options[0], height))
+        self.bind(lambda geometry: geometry[height_key], apply)
+
+    def bind_filler(self, filler, height_key):
+        def apply(height):
+            filler.height_amount = height
+            filler._invalidate()
+        self.bind(lambda geometry: geometry[height_key], apply)
+
+def set_text_if_changed(widget, markup):
+    last_markup = getattr(widget, 'last_markup', None)
+    if last_markup is markup or last_markup == markup:
+        return False
+    widget.last_markup = markup
+    widget.set_text(markup)
+    return True
+
+def terminal_visible():
+    try:
+        return os.tcgetpgrp(sys.stdout.fileno()) == os.getpgrp()
+    except OSError:
+        return True
+
+class TickScheduler:
+    def __init__(self):
+        self.main_loop = None
+        self.tasks = []
+        self.handle = None
+        self.suspended = False
+        self.wakeups = deque()
+        self.updates = 0
+        self.skipped = 0
+
+    def add(self, callback, interval):
+        self.tasks.append((callback, interval))
+
+    def start(self, main_loop):
+        self.main_loop = main_loop
+        self.tick()
+
+    def interval(self):
+        intervals = [interval() for callback, interval in self.tasks]
+        intervals = [interval for interval in intervals if interval]
+        return min(intervals) if intervals else None
+
+    def tick(self, loop=None, data=None):
+        self.handle = None
+        if not terminal_visible():
+            self.suspended = True
+            return
+        self.suspended = False
+        now = time.monotonic()
+        self.wakeups.append(now)
+        while self.wakeups and self.wakeups[0] < now - 60:
+            self.wakeups.popleft()
+        for callback, interval in self.tasks:
+            for changed in callback() or ():
+                if changed:
+                    self.updates += 1
+                else:
+                    self.skipped += 1
+        self.schedule()
+
+    def schedule(self):
+        interval = self.interval()
+        if interval is None or self.main_loop is None:
+            return
+        delay = interval - time.time() % interval + 0.005
+        self.handle = self.main_loop.set_alarm_in(delay, self.tick)
+
+    def reschedule(self):
+        if self.main_loop is None or self.suspended:
+            return
+        if self.handle is not None:
+            self.main_loop.remove_alarm(self.handle)
+            self.handle = None
+        self.schedule()
+
+    def resume(self):
+        if self.suspended and self.main_loop is not None:
+            self.tick()
+
+    def wakeups_per_minute(self):
+        now = time.monotonic()
+        return sum(1 for wakeup in self.wakeups if wakeup >= now - 60)
+
+def callback_name(callback):
+    return getattr(callback, '__name__', type(callback).__name__)
+
+class InstrumentedMainLoop(urwid.MainLoop):
+    def set_alarm_in(self, sec, callback, user_data=None):
+        return super().set_alarm_in(sec, METRICS.timed('alarm ' + callback_name(callback), callback), user_data)
+
+    def watch_file(self, fd, callback):
+        return super().watch_file(fd, METRICS.timed('io ' + callback_name(callback), callback))
+
+    def process_input(self, keys):
+        handled = False
+        for key in keys:
+            started = time.perf_counter()
+            handled = super().process_input([key]) or handled
+            METRICS.record('key ' + key if isinstance(key, str) else 'mouse', time.perf_counter() - started)
+        return handled
+
+    def draw_screen(self):
+        started = time.perf_counter()
+        super().draw_screen()
+        METRICS.record('draw_screen', time.perf_counter() - started)
+
+class MetricsOverlay(urwid.Overlay):
+    def keypress(self, size, key):
+        return self.bottom_w.keypress(size, key)
+
+class LoopBridge:
+    def __init__(self):
+        self.read_fd, self.write_fd = os.pipe()
+        os.set_blocking(self.read_fd, False)
+        os.set_blocking(self.write_fd, False)
+        self.pending = deque()
+
+    def attach(self, main_loop):
+        main_loop.watch_file(self.read_fd, self.drain)
+
+    def call(self, callback, *args):
+        self.pending.append((callback, args))
+        try:
+            os.write(self.write_fd, b'.')
+        except BlockingIOError:
+            pass
+
+    def drain(self):
+        try:
+            while os.read(self.read_fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+        while self.pending:
+            callback, args = self.pending.popleft()
+            callback(*args)
+
+SEEK_KEYS = {',': -5, '.': 5, '<': -60, '>': 60}
+REMOTE_POLL_INTERVAL = 0.5
+REMOTE_KEYS = {'enter', ' ', 'p', 's', 'r', 'n', '+', '-', 'i', 'd', 'a', 'b', 'c', 'g', 'e', 'f', 'R', 'L', 'w', 'G', 'N'}
+
+class PlayerCore:
+    def __init__(self, bridge, on_end=None, on_advance=None):
+        self.bridge = bridge
+        self.on_end = on_end or self.next
+        self.on_advance = on_advance
+        self.metadata_cache = MetadataCache()
+        self.playlist = Playlist()
+        self.playlist_index = 0
+        self.current_file = None
+        self.duration = 0
+        self.duration_confidence = None
+        self.duration_worker = ThreadPoolExecutor(max_workers=1)
+        self.duration_job = None
+        self.prefetch_worker = ThreadPoolExecutor(max_workers=1)
+        self.playing = False
+        self.paused = False
+        self.volume = 0.5
+        self.position_clock = PositionClock()
+        self.play_start = 0.0
+        self.music_source = None
+        self.gapless = False
+        self.queued_index = None
+        self.normalization = 'off'
+        self.gain_factor = 1.0
+        self.loudness_worker = ThreadPoolExecutor(max_workers=1)
+        self.analysis_pool = None
+        self.analysis_lock = threading.Lock()
+        self.analyzed_gains = {}
+        self.gain_jobs = set()
+        self.mixer = MixerControl()
+        self.mixer_levels = {'master': None, 'left': None, 'right': None}
+        self.end_generation = 0
+        self.end_watcher = MusicEndWatcher(bridge, self.on_music_end)
+
+    def load(self, path):
+        full_path = os.path.abspath(path)
+        if not os.path.exists(full_path):
+            raise ValueError(f"not found: {full_path}")
+        if os.path.isdir(full_path):
+            _, names, kinds = scan_directory_sorted(full_path)
+            self.playlist = Playlist(os.path.join(full_path, name) for name, kind in zip(names, kinds.decode()) if kind == 'f')
+        elif is_playlist_file(full_path):
+            self.playlist = Playlist()
+            self.playlist.extend_unresolved(os.path.dirname(full_path), read_playlist_entries(full_path))
+        else:
+            self.playlist = Playlist([full_path])
+        if not self.play_available(0):
+            self.stop()
+            raise ValueError(f"no playable files in {full_path}")
+
+    def play_available(self, start):
+        for index in range(start, len(self.playlist)):
+            filepath = self.playlist[index]
+            if filepath and os.path.isfile(filepath) and os.access(filepath, os.R_OK):
+                self.playlist_index = index
+                try:
+                    self.start(filepath)
+                except pygame.error:
+                    continue
+                self.preload_next()
+                return True
+        return False
+
+    def ensure_mixer(self):
+        if pygame.mixer.get_init():
+            return False
+        pygame.mixer.init()
+        startup_mark("mixer opened")
+        return True
+
+    def start(self, filepath, position=0.0, source=None):
+        first = self.ensure_mixer()
+        pygame.mixer.music.stop()
+        self.end_generation += 1
+        self.queued_index = None
+        if filepath != self.current_file:
+            self.current_file = filepath
+            self.update_gain(filepath)
+            self.update_duration(filepath)
+        self.release_source()
+        self.music_source = source
+        try:
+            if source is not None:
+                pygame.mixer.music.load(source, source.namehint)
+            else:
+                pygame.mixer.music.load(filepath)
+            pygame.mixer.music.set_volume(self.effective_volume())
+            pygame.mixer.music.play(start=position if source is None else 0.0)
+        except BaseException:
+            self.release_source()
+            raise
+        self.position_clock.start(position)
+        self.play_start = position
+        self.playing = True
+        self.paused = False
+        if first:
+            startup_mark("first playback")
+        self.arm_end_watcher()
+
+    def arm_end_watcher(self):
+        self.end_watcher.arm(self.end_generation, end_delay(self.duration, self.position_clock.position()))
+
+    def on_music_end(self, generation):
+        if generation != self.end_generation or not self.playing or self.paused:
+            return
+        if not pygame.mixer.music.get_busy():
+            self.on_end()
+            return
+        played = (self.position_clock.position() - self.play_start) * 1000
+        if self.queued_index is not None and pygame.mixer.music.get_pos() < max(played - 1000, played / 2):
+            self.advance_to_queued()
+        else:
+            self.arm_end_watcher()
+
+    def preload_next(self):
+        self.queued_index = None
+        if not self.playing or self.playlist_index >= len(self.playlist) - 1:
+            return
+        next_path = self.playlist[self.playlist_index + 1]
+        if not next_path or not os.access(next_path, os.R_OK):
+            return
+        if self.normalization != 'off':
+            self.request_analysis(next_path, self.normalization)
+        if not self.gapless:
+            return
+        try:
+            pygame.mixer.music.queue(next_path)
+        except Exception:
+            return
+        self.queued_index = self.playlist_index + 1
+        self.prefetch_worker.submit(self.prepare_track, next_path)
+
+    def prepare_track(self, filepath):
+        try:
+            readahead(filepath)
+            info = self.metadata_cache.get(filepath)
+            if not info or info['duration'] is None:
+                duration, confidence = self.metadata_cache.get_duration(filepath)
+                if duration is None:
+                    duration, confidence = probe_duration(filepath)
+                    if duration is not None:
+                        self.metadata_cache.store_duration(filepath, duration, confidence)
+        except Exception:
+            pass
+
+    def advance_to_queued(self):
+        self.position_clock.start()
+        self.play_start = 0.0
+        self.playlist_index = self.queued_index
+        self.current_file = self.playlist[self.playlist_index]
+        self.update_duration(self.current_file)
+        self.update_gain(self.current_file)
+        self.apply_gain()
+        self.preload_next()
+        if self.on_advance is not None:
+            self.on_advance(self.current_file)
+
+    def update_duration(self, filepath):
+        if self.duration_job is not None:
+            self.duration_job.cancel()
+            self.duration_job = None
+        try:
+            info = self.metadata_cache.get(filepath)
+        except Exception:
+            info = None
+        if info and info['duration'] is not None:
+            self.duration = info['duration']
+            self.duration_confidence = 'exact'
+        else:
+            duration, confidence = self.metadata_cache.get_duration(filepath)
+            if duration is None:
+                duration, confidence = probe_duration(filepath)
+                if duration is not None:
+                    self.metadata_cache.store_duration(filepath, duration, confidence)
+            self.duration = duration or 0
+            self.duration_confidence = confidence
+            if confidence != 'exact':
+                self.duration_job = self.duration_worker.submit(self.decode_duration_in_background, filepath)
+        if self.playing and not self.paused:
+            self.arm_end_watcher()
+
+    def decode_duration_in_background(self, filepath):
+        try:
+            duration = decode_duration(filepath)
+        except Exception:
+            return
+        self.metadata_cache.store_duration(filepath, duration, 'exact')
+        self.bridge.call(self.set_decoded_duration, filepath, duration)
+
+    def set_decoded_duration(self, filepath, duration):
+        if filepath == self.current_file:
+            self.duration = duration
+            self.duration_confidence = 'exact'
+            if self.playing and not self.paused:
+                self.arm_end_watcher()
+
+    def next(self):
+        if not self.play_available(self.playlist_index + 1):
+            self.stop()
+
+    def pause(self):
+        if self.playing and not self.paused:
+            pygame.mixer.music.pause()
+            self.position_clock.pause()
+            self.paused = True
+            self.end_watcher.disarm()
+
+    def resume(self):
+        if self.playing and self.paused:
+            pygame.mixer.music.unpause()
+            self.position_clock.resume()
+            self.paused = False
+            self.arm_end_watcher()
+
+    def toggle(self):
+        if self.paused:
+            self.resume()
+        else:
+            self.pause()
+
+    def stop(self):
+        if pygame.mixer.get_init():
+            pygame.mixer.music.stop()
+        self.position_clock.reset()
+        self.playing = False
+        self.paused = False
+        self.queued_index = None
+        self.current_file = None
+        self.duration = 0
+        self.end_watcher.disarm()
+        self.release_source()
+
+    def release_source(self):
+        if self.music_source is not None:
+            if pygame.mixer.get_init():
+                pygame.mixer.music.unload()
+            self.music_source.close()
+            self.music_source = None
+
+    def seek(self, delta=0.0, position=None):
+        if not self.playing:
+            raise ValueError("nothing is playing")
+        target = max(0.0, position if position is not None else self.position_clock.position() + delta)
+        if self.duration and target >= self.duration:
+            self.next()
+            return
+        paused = self.paused
+        self.start(self.current_file, target)
+        self.preload_next()
+        if paused:
+            self.pause()
+
+    def effective_volume(self):
+        return min(1.0, self.volume * self.gain_factor)
+
+    def set_volume(self, delta=0.0, value=None):
+        self.volume = min(1.0, max(0.0, value if value is not None else self.volume + delta))
+        if pygame.mixer.get_init():
+            pygame.mixer.music.set_volume(self.effective_volume())
+
+    def set_gapless(self, enabled=None):
+        self.gapless = not self.gapless if enabled is None else bool(enabled)
+        if self.gapless and self.playing and self.queued_index is None:
+            self.preload_next()
+
+    def album_paths(self, filepath):
+        info = self.metadata_cache.get(filepath)
+        album = album_from_tags(info['tags']) if info else None
+        if album is None:
+            return [filepath]
+        directory = os.path.dirname(filepath)
+        paths = [filepath]
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            if path == filepath or name.lower().rsplit('.', 1)[-1] not in AUDIO_EXTENSIONS:
+                continue
+            info = self.metadata_cache.get(path)
+            if info and album_from_tags(info['tags']) == album:
+                paths.append(path)
+                if len(paths) == ALBUM_MAX_TRACKS:
+                    break
+        return paths
+
+    def track_gain(self, filepath):
+        info = self.metadata_cache.get(filepath)
+        gains = replaygain_from_tags(info['tags']) if info else {}
+        if self.normalization in gains:
+            return gains[self.normalization]
+        if (filepath, self.normalization) in self.analyzed_gains:
+            return self.analyzed_gains[(filepath, self.normalization)]
+        if self.normalization == 'track':
+            measurement = self.metadata_cache.get_loudness(filepath)
+            if measurement is not None:
+                return gain_from_measurements([measurement])
+        return None
+
+    def update_gain(self, filepath):
+        self.gain_factor = 1.0
+        if self.normalization == 'off':
+            return
+        try:
+            gain = self.track_gain(filepath)
+        except Exception:
+            return
+        if gain is None:
+            self.request_analysis(filepath, self.normalization)
+        else:
+            self.gain_factor = 10 ** (gain / 20)
+
+    def apply_gain(self):
+        if self.playing:
+            pygame.mixer.music.set_volume(self.effective_volume())
+
+    def request_analysis(self, filepath, mode):
+        if (filepath, mode) not in self.gain_jobs and (filepath, mode) not in self.analyzed_gains:
+            self.gain_jobs.add((filepath, mode))
+            self.loudness_worker.submit(self.analyze_in_background, filepath, mode)
+
+    def analyze_in_background(self, filepath, mode):
+        try:
+            info = self.metadata_cache.get(filepath)
+            gains = replaygain_from_tags(info['tags']) if info else {}
+            if mode in gains:
+                gain = gains[mode]
+            else:
+                paths = self.album_paths(filepath) if mode == 'album' else [filepath]
+                missing = [path for path in paths if self.metadata_cache.get_loudness(path) is None]
+                if missing:
+                    for path, measurement in zip(missing, self.analysis_executor().map(analyze_loudness, missing)):
+                        self.metadata_cache.store_loudness(path, measurement or (None, 0.0, 0))
+                gain = gain_from_measurements([self.metadata_cache.get_loudness(path) for path in paths])
+        except Exception:
+            gain = None
+        self.bridge.call(self.gain_analyzed, filepath, mode, gain)
+
+    def analysis_executor(self):
+        with self.analysis_lock:
+            if self.analysis_pool is None:
+                self.analysis_pool = ProcessPoolExecutor(mp_context=multiprocessing.get_context('spawn'),
+                                                         initializer=init_decoder)
+            return self.analysis_pool
+
+    def gain_analyzed(self, filepath, mode, gain):
+        self.gain_jobs.discard((filepath, mode))
+        if gain is not None:
+            self.analyzed_gains[(filepath, mode)] = gain
+
+    def set_normalization(self, mode=None):
+        if mode is None:
+            mode = NORMALIZATION_MODES[(NORMALIZATION_MODES.index(self.normalization) + 1) % len(NORMALIZATION_MODES)]
+        elif mode not in NORMALIZATION_MODES:
+            raise ValueError(f"unknown normalization mode: {mode}")
+        self.normalization = mode
+        if self.current_file and self.playing:
+            self.update_gain(self.current_file)
+            self.apply_gain()
+
+    def read_mixer_levels(self):
+        self.mixer_levels['master'] = self.mixer.master()
+        self.mixer_levels['left'], self.mixer_levels['right'] = self.mixer.headphone()
+        return dict(self.mixer_levels)
+
+    def change_mixer(self, master=0, left=0, right=0):
+        results = {}
+        if master:
+            results['master'] = self.mixer_levels['master'] = self.mixer.master(master)
+        if left and left == right:
+            results['headphone'] = self.mixer.headphone(left)
+        else:
+            if left:
+                results['headphone'] = self.mixer.headphone(left, 'left')
+            if right:
+                results['headphone'] = self.mixer.headphone(right, 'right')
+        if 'headphone' in results:
+            self.mixer_levels['left'], self.mixer_levels['right'] = results['headphone']
+        return results
+
+    def close(self):
+        if self.analysis_pool is not None:
+            self.analysis_pool.shutdown(wait=False, cancel_futures=True)
+
+    def status(self):
+        position = self.position_clock.position()
+        return {'state': 'paused' if self.paused else 'playing' if self.playing else 'stopped',
+                'file': self.current_file, 'position': min(position, self.duration or position),
+                'duration': self.duration, 'volume': self.volume,
+                'index': self.playlist_index, 'length': len(self.playlist),
+                'gapless': self.gapless, 'normalization': self.normalization, 'mixer': dict(self.mixer_levels)}
+
+def core_attribute(name):
+    return property(lambda self: getattr(self.core, name), lambda self, value: setattr(self.core, name, value))
+
+class PlaybackMode(urwid.ListBox):
+    playing = core_attribute('playing')
+    paused = core_attribute('paused')
+    volume = core_attribute('volume')
+    playlist = core_attribute('playlist')
+    playlist_index = core_attribute('playlist_index')
+    current_file = core_attribute('current_file')
+    current_audio_duration = core_attribute('duration')
+    current_duration_confidence = core_attribute('duration_confidence')
+    position_clock = core_attribute('position_clock')
+    queued_index = core_attribute('queued_index')
+    gapless = core_attribute('gapless')
+    normalization = core_attribute('normalization')
+    gain_factor = core_attribute('gain_factor')
+    metadata_cache = core_attribute('metadata_cache')
+    mixer = core_attribute('mixer')
+
+    def __init__(self, main_loop, root_dir, input_path=None, music_root=MUSIC_ROOT, remote=None):
+        self.main_loop = main_loop
+        self.bridge = LoopBridge()
+        self.core = PlayerCore(self.bridge, self.next_track, self.track_advanced)
+        self.remote = remote
+        self.root_dir = root_dir
+        self.current_dir = os.getcwd()
+        self.dir_history = []
+        self.file_list = FileListWalker()
+        self.listing_cache = ListingCache()
+        self.listing_worker = ThreadPoolExecutor(max_workers=1)
+        self.prefetch_requests = set()
+        self.showing_listing = False
+        self.live_refresh_pending = False
+        self.scan_generation = 0
+        self.tree_generation = None
+        self.tree_playlist = None
+        self.awaiting_tree = False
+        self.search = None
+        self.search_indexes = {}
+        self.scan_focus_target = None
+        self.library = LibraryIndex(music_root, metadata_cache=self.metadata_cache)
+        self.seek_table = None
+        self.seek_worker = ThreadPoolExecutor(max_workers=1)
+        self.waveform = None
+        self.waveform_glyphs = None
+        self.waveform_worker = ThreadPoolExecutor(max_workers=1)
+        self.meter = LevelMeter(self.bridge, self.show_meter, self.meter_source)
+        self.scheduler = None
+
+        self.layout = LayoutEngine()
+        self.render_cache = RenderCache()
+        self.last_time_key = None
+        self.progress_cells = 83
+        self.progress_bar = urwid.Text("", align='left')
+        self.layout.bind(lambda geometry: geometry['progress_cells'], self.set_progress_cells)
+        self.file_frame = self.framed("PLAYBACK PROGRESS", self.progress_bar, 'left_width', closed=True)
+
+        self.volume_bar = urwid.Text("") #self.volume_bar = urwid.Text(f" 50% | {'░' * 25 + ' ' * 25}")
+        self.metadata_frame = self.framed("PYGAME.MIXER VOLUME LEVEL", self.volume_bar, 'metadata_width')
+
+        self.path_text_inner = urwid.Text([('path_value', self.current_dir)], align='left')
+        self.path_text = urwid.Padding(self.path_text_inner, left=1)
+        self.path_filler = urwid.Filler(self.path_text, valign='top')
+        top_text = urwid.Filler(self.layout.border_text('path', "PATH", 'columns'), valign='top')
+        side_borders = urwid.LineBox(self.path_filler, lline='│', rline='│', tline='', bline='', tlcorner='', trcorner='', blcorner='', brcorner='')
+        footer_text = urwid.Filler(self.layout.border_text('path_bottom', "PATH", 'columns'), valign='top')
+        framed_widget = urwid.Pile([(1, top_text), ('weight', 1, side_borders), (1, footer_text)])
+        self.path_widget = urwid.AttrMap(framed_widget, 'pink_frame')
+
+        self.status_output = urwid.Text("", align='left')
+        self.active_message = None
+        self.status_before_message = ""
+        self.status_filler = urwid.Filler(self.status_output, valign='top')
+
+        self.volume_controller = VolumeController(self.core, self.bridge, self.volume_applied)
+        self.system_volume_bar = urwid.Text("")
+        self.headphone_left_bar = urwid.Text("", align='left')
+        self.headphone_right_bar = urwid.Text("", align='left')
+        self.volume_levels = {self.volume_bar: 50, self.system_volume_bar: None,
+                              self.headphone_left_bar: None, self.headphone_right_bar: None}
+        self.volume_cells = 50
+        self.layout.bind(lambda geometry: geometry['volume_cells'], self.set_volume_cells)
+        super().__init__(self.file_list)
+        self.input_path = input_path
+        if not input_path:
+            self.refresh_list()
+        self.widget = None
+        self.initialize_widget()
+        startup_mark("playback mode built")
+
+    def start(self):
+        if self.remote is None:
+            self.volume_controller.worker.submit(self.read_mixer_levels)
+        threading.Thread(target=self.index_library, daemon=True).start()
+        if self.remote is not None:
+            if self.input_path:
+                self.remote_request('play', path=os.path.abspath(self.input_path))
+            else:
+                self.remote_request('status')
+            threading.Thread(target=self.poll_remote, args=(self.remote,), daemon=True).start()
+        elif self.input_path:
+            if os.path.isdir(self.input_path):
+                self.load_and_play_directory(self.input_path)
+            elif os.path.isfile(self.input_path) and is_playlist_file(self.input_path):
+                self.load_and_play_playlist(self.input_path)
+            elif os.path.isfile(self.input_path):
+                self.load_and_play_audio(self.input_path)
+
+    def format_time(self, seconds):
+        return str(timedelta(seconds=int(seconds))).zfill(8)
+
+    def format_time(self, seconds):
+        return str(timedelta(seconds=int(seconds))).zfill(8)
+
+    def format_active_time(self, elapsed_str, duration_str):
+        result = [('normal', "~" if self.current_duration_confidence == 'estimate' else " ")]
+        result += [TIME_CHAR_MARKUP.get(c, ('normal', c)) for c in elapsed_str]
+        return result + self.render_cache.duration(duration_str)
+
+    def update_progress_bar(self):
+        if self.remote is not None and self.paused:
+            return ()
+        if self.playing and not self.paused and (self.remote is not None or pygame.mixer.music.get_busy()):
+            duration = self.current_audio_duration
+            elapsed = min(self.position_clock.position(), duration)
+            if duration > 0:
+                progress_percent = min(100, int((elapsed / duration) * 100))
+                if self.waveform_glyphs:
+                    progress_str = self.render_cache.waveform(progress_percent, self.waveform_glyphs)
+                else:
+                    progress_str = self.render_cache.progress(progress_percent, self.progress_cells) #progress_str = [('path_value', f"{progress_percent:3d}"), ('percent', '%'), (None, f" | {'░' * filled}{' ' * unfilled}")]
+                time_key = (int(elapsed), int(duration), self.current_duration_confidence)
+                if time_key == self.last_time_key:
+                    return (set_text_if_changed(self.progress_bar, progress_str), False)
+                self.last_time_key = time_key
+                elapsed_str = self.format_time(elapsed)
+                duration_str = self.format_time(duration)
+                return (set_text_if_changed(self.progress_bar, progress_str),
+                        set_text_if_changed(self.grannik_text, self.format_active_time(elapsed_str, duration_str)))
+            return ()
+        self.last_time_key = None
+        return (set_text_if_changed(self.progress_bar, self.render_cache.progress(0, self.progress_cells)),
+                set_text_if_changed(self.grannik_text, IDLE_TIME_MARKUP))
+
+    def update_clock(self):
+        current_time = time.localtime()
+        return (set_text_if_changed(self.clock_text, print_pseudographic_time(current_time.tm_hour, current_time.tm_min, current_time.tm_sec)),)
+
+    def progress_interval(self):
+        return 0.5 if self.remote is not None or (self.playing and not self.paused) else None
+
+    def clock_interval(self):
+        return 1.0
+
+    def reschedule_ticks(self):
+        if self.scheduler is not None:
+            self.scheduler.reschedule()
+
+    def initialize_widget(self):
+
+        self.widget = self.wrap_in_three_frames()
+
+    def framed(self, title, body, width_key, closed=False):
+        top_text = urwid.Filler(self.layout.border_text('top', title, width_key), valign='top')
+        if not closed:
+            side_borders = urwid.LineBox(body, lline='│', rline='│', tline='', bline='─', tlcorner='', trcorner='', blcorner='└', brcorner='┘')
+            return urwid.AttrMap(urwid.Pile([(1, top_text), ('weight', 1, side_borders)]), 'pink_frame')
+        side_borders = urwid.LineBox(body, lline='│', rline='│', tline='', bline='', tlcorner='', trcorner='', blcorner='', brcorner='')
+        footer_text = urwid.Filler(self.layout.border_text('bottom', title, width_key), valign='top')
+        return urwid.AttrMap(urwid.Pile([(1, top_text), ('weight', 1, side_borders), (1, footer_text)]), 'pink_frame')
+
+    def set_progress_cells(self, cells):
+        self.progress_cells = cells
+        if self.waveform is not None:
+            self.waveform_glyphs = waveform_glyphs(self.waveform, cells)
+        self.progress_bar.last_markup = None
+        self.progress_bar.set_text(self.render_cache.progress(0, cells))
+
+    def set_meter_size(self, size):
+        self.meter.cells, self.meter.rows = size
+
+    def set_volume_level(self, widget, percent):
+        self.volume_levels[widget] = percent
+        set_text_if_changed(widget, self.render_cache.volume(percent, self.volume_cells))
+
+    def set_volume_cells(self, cells):
+        self.volume_cells = cells
+        for widget, percent in self.volume_levels.items():
+            set_text_if_changed(widget, self.render_cache.volume(percent, cells))
+
+    def relayout(self, size):
+        if self.layout.resize(size):
+            self.update_progress_bar()
+
+    def wrap_in_three_frames(self):
+        layout = self.layout
+        geometry = layout.geometry()
+        left_width = geometry['left_width']
+
+        combined_widget = urwid.Columns([
+            (left_width, self.file_frame),
+            ('weight', 1, self.metadata_frame),
+        ], dividechars=1, box_columns=[0, 1])
+        layout.bind_column(combined_widget, 0, 'left_width')
+        height_limited_widget = urwid.Filler(combined_widget, height=3, valign='top')
+
+        box02_clone = self.framed("AMIXER MASTER VOLUME LEVEL", self.system_volume_bar, 'metadata_width')
+        box02_clone2 = self.framed("AMIXER HEADPHONE LEFT VOLUME LEVEL", self.headphone_left_bar, 'metadata_width')
+        box02_clone3 = self.framed("AMIXER HEADPHONE RIGHT VOLUME LEVEL", self.headphone_right_bar, 'metadata_width')
+
+        upper_boxes_height = 3
+        columns_height = geometry['columns_height']
+        box_height = geometry['box_height']
+
+        new_left_frame = self.framed("FILES AND DIRECTORIES OF THE LINUX OS", self, 'left_width')
+        new_left_frame_filler = urwid.Filler(new_left_frame, height=columns_height, valign='top')
+        layout.bind_filler(new_left_frame_filler, 'columns_height')
+
+        self.metadata_output = urwid.Text("", align='left')
+        self.meter_text = urwid.Text("", align='left', wrap='clip')
+        self.metadata_filler = urwid.Filler(self.metadata_output, valign='top')
+        layout.bind(lambda geometry: (geometry['meter_cells'], geometry['meter_rows']), self.set_meter_size)
+        new_right_frame = self.framed("INFO", self.metadata_filler, 'metadata_width')
+        new_right_frame_filler = urwid.Filler(new_right_frame, height=columns_height, valign='top')
+        layout.bind_filler(new_right_frame_filler, 'columns_height')
+
+        new_frames_widget = urwid.Columns([
+            (left_width, new_left_frame_filler),
+            ('weight', 1, new_right_frame_filler)
+        ], dividechars=1)
+        layout.bind_column(new_frames_widget, 0, 'left_width')
+
+        self.grannik_text = urwid.Text(" 00:00:00 / 00:00:00", align='left')
+        box1 = self.framed("PLAYBACK TIME", self.grannik_text, 'box1_width', closed=True)
+        box1_filler = urwid.Filler(box1, height=box_height, valign='middle')
+        layout.bind_filler(box1_filler, 'box_height')
+
+        box2 = self.framed("CURRENT DATE", urwid.Text([
+            ('normal', get_date_string().split('|')[0].split('/')[0]),
+            ('path_value', '/'),
+            ('normal', get_date_string().split('|')[0].split('/')[1]),
+            ('path_value', '|'),
+            ('normal', get_date_string().split('|')[1].split('/')[0]),
+            ('path_value', '/'),
+            ('normal', get_date_string().split('|')[1].split('/')[1]),
+        ], align='center'), 'box2_width', closed=True)
+        box2_filler = urwid.Filler(box2, height=3, valign='middle')
+
+        current_time = time.localtime()
+        self.clock_text = urwid.Text(print_pseudographic_time(current_time.tm_hour, current_time.tm_min, current_time.tm_sec), align='center')
+        test_box_attr = self.framed("CURRENT TIME", self.clock_text, 'box2_width', closed=True)
+        test_box_filler = urwid.Filler(test_box_attr, height=6, valign='top')
+
+        box2_with_test = urwid.Pile([
+            (3, box2_filler),
+            (6, test_box_filler)
+        ])
+
+        box4 = self.framed("STATUS", self.status_filler, 'box4_width', closed=True)
+        box4_filler = urwid.Filler(box4, height=box_height, valign='middle')
+        layout.bind_filler(box4_filler, 'box_height')
+
+        footer_columns = urwid.Columns([
+            (geometry['box1_width'], box1_filler),
+            (geometry['box2_width'], box2_with_test),
+            (geometry['box4_width'], box4_filler),
+        ], dividechars=1, box_columns=[0, 1, 2])
+        layout.bind_column(footer_columns, 2, 'box4_width')
+
+        clones_pile = urwid.Pile([
+            (3, box02_clone),
+            (3, box02_clone2),
+            (3, box02_clone3),
+        ])
+        clones_filler = urwid.Filler(clones_pile, height=9, valign='middle')
+        footer_with_clones = urwid.Columns([
+            (left_width, footer_columns),
+            (geometry['metadata_width'], clones_filler),
+        ], dividechars=1, box_columns=[0, 1])
+        layout.bind_column(footer_with_clones, 0, 'left_width')
+        layout.bind_column(footer_with_clones, 1, 'metadata_width')
+        footer_widget = urwid.Filler(footer_with_clones, height=box_height, valign='middle')
+        layout.bind_filler(footer_widget, 'box_height')
+        body_widget = urwid.Pile([
+            (columns_height, new_frames_widget),
+            (upper_boxes_height, height_limited_widget),
+            (box_height, footer_widget),
+        ])
+        layout.bind_pile(body_widget, 0, 'columns_height')
+        layout.bind_pile(body_widget, 2, 'box_height')
+        frame_with_path = urwid.Frame(
+            body=body_widget,
+            header=self.path_widget,
+        )
+        return frame_with_path
+
+    def load_and_play_audio(self, audio_file):
+        full_path = os.path.abspath(audio_file)
+        self.current_dir = os.path.dirname(full_path)
+        file_name = os.path.basename(full_path)
+        self.cancel_scan()
+        self.showing_listing = False
+        self.file_list.set_entries([file_name], b'o')
+        self.set_focus(0)
+        self.path_text_inner.set_text([('path_value', self.current_dir)])
+        self.play_media(full_path)
+
+    def load_and_play_directory(self, directory):
+        full_path = os.path.abspath(directory)
+        self.current_dir = full_path
+        self.path_text_inner.set_text([('path_value', self.current_dir)])
+        self.cancel_scan()
+        self.showing_listing = False
+        try:
+            all_files = sorted(os.listdir(self.current_dir))
+            audio_files = [f for f in all_files 
+                          if not f.startswith('.') and 
+                          f.lower().split('.')[-1] in AUDIO_EXTENSIONS]
+            if not audio_files:
+                self.file_list.set_entries(["(empty)"], b'o')
+                return
+
+            self.playlist = Playlist(os.path.join(self.current_dir, f) for f in audio_files)
+            self.playlist_index = 0
+            self.file_list.set_entries(audio_files, b'f' * len(audio_files))
+            self.set_focus(0)
+            self.play_media(self.playlist[self.playlist_index])
+        except PermissionError:
+            self.file_list.set_entries(["(access denied)"], b'x')
+
+    def load_and_play_playlist(self, path):
+        full_path = os.path.abspath(path)
+        self.current_dir = os.path.dirname(full_path)
+        self.path_text_inner.set_text([('path_value', full_path)])
+        self.cancel_scan()
+        self.showing_listing = False
+        try:
+            names = read_playlist_entries(full_path)
+        except OSError as e:
+            self.file_list.set_entries(["(access denied)"], b'x')
+            self.show_message(f"Error: {e.strerror}")
+            return
+        self.playlist = Playlist()
+        self.playlist.extend_unresolved(self.current_dir, names)
+        self.playlist_index = 0
+        if not names:
+            self.file_list.set_entries(["(empty)"], b'o')
+            return
+        self.file_list.set_entries(names, b'f' * len(names))
+        self.set_focus(0)
+        if not self.play_available(0):
+            self.show_message("Error: no playable files in playlist")
+
+    def save_playlist(self):
+        if not self.playlist:
+            self.show_message("Playlist is empty")
+            return
+        path = os.path.join(self.current_dir, 'playlist.m3u8')
+        number = 1
+        while os.path.exists(path):
+            number += 1
+            path = os.path.join(self.current_dir, f'playlist-{number}.m3u8')
+        try:
+            write_playlist(path, self.playlist)
+        except OSError as e:
+            self.show_message(f"Error saving playlist: {e.strerror}")
+            return
+        self.show_message(f"Saved {os.path.basename(path)}", 2)
+
+    def load_and_play_tree(self, directory):
+        full_path = os.path.abspath(directory)
+        self.current_dir = full_path
+        self.path_text_inner.set_text([('path_value', self.current_dir)])
+        self.cancel_scan()
+        self.showing_listing = False
+        self.tree_generation = self.scan_generation
+        self.awaiting_tree = False
+        self.playlist = self.tree_playlist = Playlist()
+        self.playlist_index = 0
+        self.file_list.clear()
+        self.status_output.set_text([('time_separator,bold', " Searching for audio files...")])
+        slots = threading.Semaphore(4)
+        threading.Thread(target=self.walk_tree_in_background, args=(full_path, self.tree_generation, slots), daemon=True).start()
+
+    def walk_tree_in_background(self, root, generation, slots):
+        cancelled = lambda: not self.tree_active(generation)
+        for chunk in chunked(walk_audio_files(root, cancelled)):
+            while not slots.acquire(timeout=0.5):
+                if cancelled():
+                    return
+            self.bridge.call(self.append_tree_chunk, generation, root, chunk, slots)
+        self.bridge.call(self.finish_tree, generation)
+
+    def tree_active(self, generation):
+        return generation == self.scan_generation and self.playlist is self.tree_playlist
+
+    def append_tree_chunk(self, generation, root, chunk, slots):
+        slots.release()
+        if not self.tree_active(generation):
+            return
+        prefix_len = len(os.path.join(root, ''))
+        start = len(self.playlist)
+        self.playlist.extend(chunk)
+        names = [path[prefix_len:] for path in chunk]
+        if self.search is not None:
+            self.search['names'].extend(names)
+            self.search['kinds'].extend(b'f' * len(chunk))
+        else:
+            self.file_list.extend(names, b'f' * len(chunk))
+        if start == 0:
+            if self.search is None:
+                self.set_focus(0)
+            if not self.play_available(0):
+                self.await_tree()
+            self.main_loop.draw_screen()
+        elif self.awaiting_tree:
+            self.awaiting_tree = False
+            self.next_track()
+        elif self.gapless and self.playing and self.queued_index is None and self.playlist_index == start - 1:
+            self.preload_next()
+
+    def await_tree(self):
+        self.playlist_index = len(self.playlist) - 1
+        self.awaiting_tree = True
+
+    def finish_tree(self, generation):
+        if not self.tree_active(generation):
+            return
+        self.tree_generation = None
+        if not self.playlist:
+            self.file_list.set_entries(["(empty)"], b'o')
+            self.status_output.set_text("")
+        elif self.awaiting_tree:
+            self.awaiting_tree = False
+            self.next_track()
+
+    def index_library(self):
+        try:
+            if self.library.rescan():
+                self.bridge.call(self.show_message, f"Library indexed: {len(self.library)} files", 2)
+        except OSError:
+            pass
+
+    def library_missing(self):
+        if self.library.relative_paths():
+            return False
+        self.show_message(f"Library is empty: {self.library.root}" if self.library.loaded else "Library index is loading...", 2)
+        return True
+
+    def play_library(self):
+        if self.library_missing():
+            return
+        paths = self.library.relative_paths()
+        if self.playing or self.paused:
+            self.stop_music()
+            self.playing = False
+            self.paused = False
+        self.cancel_scan()
+        self.showing_listing = False
+        self.current_dir = self.library.root
+        self.path_text_inner.set_text([('path_value', self.current_dir)])
+        self.playlist = Playlist(os.path.join(self.current_dir, p) for p in paths)
+        self.playlist_index = 0
+        self.file_list.set_entries(paths, b'f' * len(paths))
+        self.set_focus(0)
+        self.play_media(self.playlist[0])
+
+    def start_search(self):
+        if self.showing_listing:
+            self.cancel_scan()
+        self.search = {
+            'query': '', 'scope': 'dir', 'results': None, 'previous': None,
+            'names': self.file_list.names, 'kinds': bytearray(self.file_list.kinds),
+            'focus': self.focus_position if self.file_list else 0,
+            'showing_listing': self.showing_listing, 'status': self.status_markup(),
+        }
+        self.showing_listing = False
+        self.update_search()
+
+    def search_index(self, scope):
+        names = self.search['names'] if scope == 'dir' else self.library.relative_paths()
+        cached = self.search_indexes.get(scope)
+        if cached is not None and cached.names is names:
+            return cached
+        index = self.search_indexes[scope] = SearchIndex(names)
+        threading.Thread(target=self.build_search_index, args=(index,), daemon=True).start()
+        return index
+
+    def build_search_index(self, index):
+        index.build()
+        self.bridge.call(self.search_index_ready, index)
+
+    def search_index_ready(self, index):
+        if self.search is not None and self.search_indexes.get(self.search['scope']) is index:
+            self.search['previous'] = None
+            self.update_search()
+
+    def update_search(self):
+        search = self.search
+        index = self.search_index(search['scope'])
+        query = search['query']
+        previous = search['previous']
+        if previous is None or previous[0] not in query:
+            previous = (None, None)
+        results = index.search(query, previous[1])
+        search['results'] = results
+        search['previous'] = (query, results) if index.ready else None
+        kinds = IndexedView(search['kinds'], results) if search['scope'] == 'dir' else b'f' * len(results)
+        self.file_list.set_view(IndexedView(index.names, results), kinds)
+        if self.file_list:
+            self.set_focus(0)
+        self.show_search_status()
+        if self.main_loop is not None:
+            self.main_loop.draw_screen()
 
-        title = "STATUS"
-        title_with_symbols = f"┤ {title} ├"
-        title_len = len(title_with_symbols)
-        adjusted_width = box4_width - 2
-        side_len = max(0, (adjusted_width - title_len) // 2)
-        top_line = f'┌{"─" * side_len}{title_with_symbols}{"─" * (adjusted_width - title_len - side_len)}┐'
-        top_text = urwid.Filler(urwid.Text(('pink_frame', top_line), align='left'), valign='top')
+    def show_search_status(self):
+        search = self.search
+        scope = "directory" if search['scope'] == 'dir' else "library"
+        pending = "" if self.search_indexes[search['scope']].ready else " (indexing...)"
+        self.status_output.set_text([('time_separator,bold', f" Search {scope}: "), ('normal', f"{search['query']}_\n"),
+                                     ('path_value', f" {len(search['results'])} matches{pending}")])
 
-        side_borders = urwid.LineBox(self.status_filler, lline='│', rline='│',
-                                     tline='', bline='',
-                                     tlcorner='', trcorner='',
-                                     blcorner='', brcorner='')
+    def cancel_search(self):
+        search = self.search
+        self.search = None
+        self.file_list.set_entries(search['names'], search['kinds'])
+        if self.file_list:
+            self.set_focus(min(search['focus'], len(self.file_list) - 1))
+        self.status_output.set_text(search['status'])
+        self.showing_listing = search['showing_listing']
+        if self.showing_listing:
+            self.scan_focus_target = None
+            self.update_file_list()
 
-        footer_line = f'└{"─" * (len(top_line) - 2)}┘'
-        footer_text = urwid.Filler(urwid.Text(('pink_frame', footer_line), align='left'), valign='top')
+    def play_search_results(self):
+        search = self.search
+        results = search['results']
+        if not results:
+            return
+        position = self.focus_position
+        if search['scope'] == 'dir':
+            kinds = search['kinds']
+            selected = results[position]
+            if kinds[selected] == ord('d'):
+                self.cancel_search()
+                try:
+                    self.keypress_open_directory(os.path.join(self.current_dir, search['names'][selected]))
+                except PermissionError:
+                    self.show_message("Permission denied!")
+                return
+            audio = [i for i in results if kinds[i] == ord('f')]
+            root = self.current_dir
+            start = audio.index(selected) if kinds[selected] == ord('f') else 0
+        else:
+            audio = results
+            root = self.library.root
+            start = position
+        if not audio:
+            return
+        self.search = None
+        if self.playing or self.paused:
+            self.stop_music()
+            self.playing = False
+            self.paused = False
+        names = [self.search_indexes[search['scope']].names[i] for i in audio]
+        self.current_dir = root
+        self.path_text_inner.set_text([('path_value', self.current_dir)])
+        self.playlist = Playlist(os.path.join(root, name) for name in names)
+        self.playlist_index = start
+        self.file_list.set_entries(names, b'f' * len(names))
+        self.set_focus(start)
+        self.play_media(self.playlist[start])
 
-        framed_widget = urwid.Pile([(1, top_text), ('weight', 1, side_borders), (1, footer_text)])
-        box4 = urwid.AttrMap(framed_widget, 'pink_frame')
-        box4_filler = urwid.Filler(box4, height=box_height, valign='middle')
+    def search_keypress(self, size, key):
+        search = self.search
+        if key == 'esc':
+            self.cancel_search()
+        elif key == 'enter':
+            self.play_search_results()
+        elif key == 'tab':
+            if search['scope'] == 'dir' and self.library_missing():
+                return None
+            search['scope'] = 'library' if search['scope'] == 'dir' else 'dir'
+            search['previous'] = None
+            self.update_search()
+        elif key == 'backspace':
+            search['query'] = search['query'][:-1]
+            search['previous'] = None
+            self.update_search()
+        elif key in ('up', 'down', 'page up', 'page down', 'home', 'end'):
+            super().keypress(size, key)
+        elif len(key) == 1 and key.isprintable():
+            search['query'] += key
+            self.update_search()
+        if self.main_loop is not None:
+            self.main_loop.draw_screen()
+        return None
 
-        footer_columns = urwid.Columns([
-            (box1_width, box1_filler),
-            (box2_width, box2_with_test),
-            (box4_width, box4_filler),
-        ], dividechars=1, box_columns=[0, 1, 2])
+    def read_mixer_levels(self):
+        self.bridge.call(self.mixer_levels_read, self.core.read_mixer_levels())
 
-        clone_width = metadata_width
-        clones_pile = urwid.Pile([
-            (3, box02_clone),
-            (3, box02_clone2),
-            (3, box02_clone3),
-        ])
-        clones_filler = urwid.Filler(clones_pile, height=9, valign='middle')
-        footer_with_clones = urwid.Columns([
-            (footer_width, footer_columns),
-            (clone_width, clones_filler),
-        ], dividechars=1, box_columns=[0, 1])
-        footer_widget = urwid.Filler(footer_with_clones, height=box_height, valign='middle')
-        body_widget = urwid.Pile([
-            (columns_height, new_frames_widget),
-            (upper_boxes_height, height_limited_widget),
-            (box_height, footer_widget),
-        ])
-        frame_with_path = urwid.Frame(
-            body=body_widget,
-            header=self.path_widget,
-        )
-        return frame_with_path
+    def mixer_levels_read(self, levels):
+        self.set_volume_level(self.system_volume_bar, levels['master'])
+        self.set_volume_level(self.headphone_left_bar, levels['left'])
+        self.set_volume_level(self.headphone_right_bar, levels['right'])
+        startup_mark("mixer levels read")
 
-    def load_and_play_audio(self, audio_file):
-        full_path = os.path.abspath(audio_file)
-        self.current_dir = os.path.dirname(full_path)
-        file_name = os.path.basename(full_path)
-        self.file_list.clear()
-        padded_text = urwid.Padding(urwid.Text(file_name), left=1, right=1)
-        self.file_list.append(urwid.AttrMap(padded_text, 'normal', 'selected'))
-        self.set_focus(0)
-        self.path_text_inner.set_text([('path_value', self.current_dir)])
-        self.play_media(full_path)
+    def start_music(self, filepath, start=0.0, source=None):
+        self.core.start(filepath, start, source)
+        self.reschedule_ticks()
 
-    def load_and_play_directory(self, directory):
-        full_path = os.path.abspath(directory)
-        self.current_dir = full_path
-        self.path_text_inner.set_text([('path_value', self.current_dir)])
-        AUDIO_EXTENSIONS = {'mp3', 'wav', 'ogg', 'flac', 'aac', 'm4a', 'wma', 'opus'}
-        try:
-            all_files = sorted(os.listdir(self.current_dir))
-            audio_files = [f for f in all_files 
-                          if not f.startswith('.') and 
-                          f.lower().split('.')[-1] in AUDIO_EXTENSIONS]
-            if not audio_files:
-                self.file_list.clear()
-                self.file_list.append(urwid.AttrMap(urwid.Padding(urwid.Text("(empty)"), left=1, right=1), 'normal', 'selected'))
-                return
+    def stop_music(self):
+        self.core.stop()
+        self.reschedule_ticks()
 
-            self.file_list.clear()
-            self.playlist = [os.path.join(self.current_dir, f) for f in audio_files]
-            self.playlist_index = 0
+    def preload_next(self):
+        self.core.preload_next()
+        self.prefetch_queued_waveform()
 
-            for file in audio_files:
-                padded_text = urwid.Padding(urwid.Text(file), left=1, right=1)
-                self.file_list.append(urwid.AttrMap(padded_text, 'audio_file', 'selected'))
+    def prefetch_queued_waveform(self):
+        if self.queued_index is not None:
+            self.waveform_worker.submit(self.build_waveform, self.playlist[self.queued_index])
 
-            self.set_focus(0)
-            self.play_media(self.playlist[self.playlist_index])
-        except PermissionError:
-            self.file_list.clear()
-            self.file_list.append(urwid.AttrMap(urwid.Padding(urwid.Text("(access denied)"), left=1, right=1), 'perm_denied', 'selected'))
+    def track_advanced(self, filepath):
+        if self.search is None and self.playlist_index < len(self.file_list):
+            self.set_focus(self.playlist_index)
+        self.status_output.set_text([('time_separator,bold', " Playing:\n "), ('normal', f"{os.path.basename(filepath)}")])
+        self.metadata_output.set_text(self.get_metadata(filepath))
+        self.prepare_seek_table(filepath)
+        self.prepare_waveform(filepath)
+        self.prefetch_queued_waveform()
+        if self.search is not None:
+            self.show_search_status()
 
-    def check_playback_end(self):
-        if self.main_loop is not None and self.playing and not pygame.mixer.music.get_busy() and not self.paused:
-            self.next_track()
-        if self.main_loop is not None:
-            self.main_loop.set_alarm_in(0.1, lambda loop, data: self.check_playback_end())
+    def play_available(self, start):
+        for index in range(start, len(self.playlist)):
+            filepath = self.playlist[index]
+            if filepath and os.path.isfile(filepath) and os.access(filepath, os.R_OK):
+                self.playlist_index = index
+                if self.search is None and index < len(self.file_list):
+                    self.set_focus(index)
+                if not self.play_media(filepath):
+                    continue
+                if index > start:
+                    self.show_message(f"Skipped {index - start} unplayable files", 2)
+                return True
+        return False
 
     def next_track(self):
-        if self.playlist and self.playlist_index < len(self.playlist) - 1:
-            self.playlist_index += 1
-            self.set_focus(self.playlist_index)
-            self.play_media(self.playlist[self.playlist_index])
+        if self.playlist and self.play_available(self.playlist_index + 1):
+            pass
+        elif self.tree_generation is not None and self.tree_active(self.tree_generation):
+            self.stop_music()
+            self.playing = False
+            self.await_tree()
+            self.status_output.set_text([('time_separator,bold', " Searching for audio files...")])
         else:
-            pygame.mixer.music.stop()
+            self.stop_music()
             self.playing = False
             self.status_output.set_text([('time_separator,bold', " Playlist ended")])
             self.metadata_output.set_text([('path_value', ' No metadata available')])
 
     def update_file_list(self):
-        AUDIO_EXTENSIONS = {'mp3', 'wav', 'ogg', 'flac', 'aac', 'm4a', 'wma', 'opus'}
+        self.scan_generation += 1
+        cached = self.listing_cache.get(self.current_dir)
+        METRICS.count('listing cache miss' if cached is None else 'listing cache hit')
+        if cached is not None:
+            self.show_scan_snapshot(self.scan_generation, *cached)
+            self.finish_scan(self.scan_generation, "(empty)")
+            return
+        threading.Thread(target=self.scan_in_background, args=(self.current_dir, self.scan_generation), daemon=True).start()
+
+    def cancel_scan(self):
+        self.scan_generation += 1
+
+    def scan_in_background(self, path, generation):
+        cancelled = lambda: generation != self.scan_generation
+        entries = []
+        preview = []
+        names, kinds = [], b''
         try:
-            all_files = sorted(os.listdir(self.current_dir))
-            files = [f for f in all_files
-                     if not f.startswith('.') and
-                     (os.path.isdir(os.path.join(self.current_dir, f)) or
-                      f.lower().split('.')[-1] in AUDIO_EXTENSIONS)]
-            if not files:
-                files = ["(empty)"]
+            mtime = os.stat(path).st_mtime_ns
+            for chunk in scan_directory(path, cancelled):
+                entries.extend(chunk)
+                preview = sorted(preview + chunk)[:SCAN_PREVIEW_ROWS]
+                self.bridge.call(self.show_scan_preview, generation, [name for name, kind in preview],
+                                 ''.join(kind for name, kind in preview).encode(), len(entries))
+            entries.sort()
+            names = [name for name, kind in entries]
+            kinds = ''.join(kind for name, kind in entries).encode()
+            if entries and not cancelled():
+                self.bridge.call(self.show_scan_snapshot, generation, names, kinds)
         except PermissionError:
-            files = ["(access denied)"]
+            self.bridge.call(self.finish_scan, generation, "(access denied)")
+            return
+        except OSError:
+            pass
+        else:
+            if not cancelled() and not self.listing_cache.put(path, mtime, names, kinds):
+                self.bridge.call(self.request_live_refresh)
+        self.bridge.call(self.finish_scan, generation, "(empty)")
 
-        file_items = []
-        for file in files:
-            full_path = os.path.join(self.current_dir, file)
-            if os.path.isdir(full_path):
-                attr = 'directory'
-                display_name = file + "/"
-            elif os.path.isfile(full_path):
-                attr = 'audio_file'
-                display_name = file
-            else:
-                attr = 'normal'
-                display_name = file
-            padded_text = urwid.Padding(urwid.Text(display_name), left=1, right=1)
-            file_items.append(urwid.AttrMap(padded_text, attr, 'selected'))
+    def show_scan_snapshot(self, generation, names, kinds):
+        if generation != self.scan_generation:
+            return
+        first_snapshot = not self.file_list
+        focused = self.file_list.name_at(self.focus_position) if self.file_list else None
+        self.file_list.set_entries(names, kinds)
+        if self.scan_focus_target is not None:
+            self.set_focus(min(self.scan_focus_target, len(self.file_list) - 1))
+        elif focused is not None:
+            self.set_focus(min(bisect.bisect_left(names, focused), len(names) - 1))
+        if first_snapshot and self.main_loop is not None:
+            self.main_loop.draw_screen()
+
+    def show_scan_preview(self, generation, names, kinds, count):
+        if generation != self.scan_generation:
+            return
+        self.show_scan_snapshot(generation, names, kinds)
+        self.path_text_inner.set_text([('path_value', self.current_dir), ('normal', f"  (scanning: {count} entries)")])
+
+    def finish_scan(self, generation, placeholder):
+        if generation != self.scan_generation:
+            return
+        self.path_text_inner.set_text([('path_value', self.current_dir)])
+        if not self.file_list:
+            self.file_list.set_entries([placeholder], b'o')
+            self.set_focus(0)
+        self.prefetch_listing(os.path.dirname(self.current_dir))
+        self.prefetch_focused_directory()
+
+    def prefetch_focused_directory(self):
+        if self.showing_listing and self.file_list:
+            position = self.focus_position
+            if self.file_list.kinds[position] == ord('d'):
+                self.prefetch_listing(os.path.join(self.current_dir, self.file_list.name_at(position)))
+
+    def prefetch_listing(self, path):
+        if path in self.prefetch_requests or path in self.listing_cache:
+            return
+        self.prefetch_requests.add(path)
+        self.listing_worker.submit(self.prefetch_in_background, path)
+
+    def prefetch_in_background(self, path):
+        try:
+            if path not in self.listing_cache:
+                self.listing_cache.put(path, *scan_directory_sorted(path))
+        except OSError:
+            pass
+        finally:
+            self.prefetch_requests.discard(path)
+
+    def watch_directories(self):
+        if self.listing_cache.inotify is not None:
+            self.main_loop.watch_file(self.listing_cache.inotify.fd, self.on_directory_events)
 
-        return file_items
+    def on_directory_events(self):
+        changed, overflow = self.listing_cache.read_changed()
+        if overflow or self.current_dir in changed:
+            self.request_live_refresh()
+
+    def request_live_refresh(self):
+        if self.showing_listing and not self.live_refresh_pending and self.main_loop is not None:
+            self.live_refresh_pending = True
+            self.main_loop.set_alarm_in(0.2, self.live_refresh)
+
+    def live_refresh(self, loop=None, data=None):
+        self.live_refresh_pending = False
+        if self.showing_listing:
+            self.scan_focus_target = None
+            self.update_file_list()
 
     def refresh_list(self):
-        old_focus = self.focus_position if self.file_list else 0
-        self.file_list[:] = self.update_file_list()
+        self.scan_focus_target = self.focus_position if self.file_list else 0
+        self.showing_listing = True
+        self.file_list.clear()
         self.path_text_inner.set_text([('path_value', self.current_dir)])
-        if self.file_list:
-            self.set_focus(min(old_focus, len(self.file_list) - 1))
+        self.update_file_list()
 
     def get_widget(self):
         return self.widget
 
     def cleanup(self):
+        self.meter.hide()
+        self.core.close()
         if self.playing:
-            pygame.mixer.music.stop()
+            self.stop_music()
         self.status_output.set_text([('path_value', ' No status available')])
         self.metadata_output.set_text([('path_value', ' No metadata available')])
         self.playing = False
         self.paused = False
 
     def show_message(self, message, duration=1):
+        if self.active_message is None or self.status_output.text != f" {self.active_message}":
+            self.status_before_message = self.status_markup()
+        self.active_message = message
         if "Permission denied" in message:
             self.status_output.set_text([('perm_denied', f" {message}")])
             duration = 0
@@ -688,40 +3416,50 @@ class PlaybackMode(urwid.ListBox):
         self.main_loop.draw_screen()
         if duration > 0:
             def clear_message(loop, data):
-                if self.status_output.text in ([('perm_denied', f" {message}"), ('error', f" {message}"), ('normal', f" {message}")]):
-                    self.status_output.set_text("")
+                if self.status_output.text == f" {message}":
+                    self.status_output.set_text(self.status_before_message)
+                    self.active_message = None
                 self.main_loop.draw_screen()
             self.main_loop.set_alarm_in(duration, clear_message)
 
+    def status_markup(self):
+        text, attributes = self.status_output.get_text()
+        markup = []
+        offset = 0
+        for attr, length in attributes:
+            markup.append((attr, text[offset:offset + length]))
+            offset += length
+        markup.append(text[offset:])
+        return markup
+
     def clear_message(self):
         self.status_output.set_text("")
         self.main_loop.draw_screen()
 
     def get_metadata(self, filepath):
         try:
-            audio = mutagen.File(filepath)
-            if audio is None:
+            info = self.metadata_cache.get(filepath)
+            if info is None:
                 return " No metadata available"
             metadata = []
-            if hasattr(audio, 'info'):
-                metadata.append([('path_value', ' Duration: '), ('normal', f'{audio.info.length:.2f} sec')])
-                metadata.append([('path_value', ' Bitrate: '), ('normal', f'{audio.info.bitrate // 1000} kbps')])
-                metadata.append([('path_value', ' Channels: '), ('normal', f'{audio.info.channels}')])
-                metadata.append([('path_value', ' Sample Rate: '), ('normal', f'{audio.info.sample_rate} Hz')])
-            if audio.tags:
-                for key, value in audio.tags.items():
-                    value_str = str(value)[:50] + "..." if len(str(value)) > 50 else str(value)
-                    metadata.append([('path_value', f' {key}: '), ('normal', value_str)])
-
-                max_lines = 10
-                if len(metadata) > max_lines:
-                    metadata = metadata[:max_lines - 1] + [[('path_value', ' ... (truncated)')]]
-                result = []
-                for i, line in enumerate(metadata):
-                    result.extend(line)
-                    if i < len(metadata) - 1:
-                        result.append(('normal', '\n'))
-                return result if result else [('path_value', ' No metadata available')]
+            if info['duration'] is not None:
+                metadata.append([('path_value', ' Duration: '), ('normal', f'{info["duration"]:.2f} sec')])
+                metadata.append([('path_value', ' Bitrate: '), ('normal', f'{(info["bitrate"] or 0) // 1000} kbps')])
+                metadata.append([('path_value', ' Channels: '), ('normal', f'{info["channels"]}')])
+                metadata.append([('path_value', ' Sample Rate: '), ('normal', f'{info["sample_rate"]} Hz')])
+            for key, value in info['tags']:
+                value_str = value[:50] + "..." if len(value) > 50 else value
+                metadata.append([('path_value', f' {key}: '), ('normal', value_str)])
+
+            max_lines = 10
+            if len(metadata) > max_lines:
+                metadata = metadata[:max_lines - 1] + [[('path_value', ' ... (truncated)')]]
+            result = []
+            for i, line in enumerate(metadata):
+                result.extend(line)
+                if i < len(metadata) - 1:
+                    result.append(('normal', '\n'))
+            return result if result else [('path_value', ' No metadata available')]
 
         except Exception as e:
             return [('path_value', ' Error reading metadata: '), ('normal', str(e))]
@@ -729,36 +3467,275 @@ class PlaybackMode(urwid.ListBox):
     def play_media(self, filepath):
         if not os.path.exists(filepath):
             self.show_message(f"File not found: {filepath}")
-            return
+            return False
         if not os.access(filepath, os.R_OK):
             self.show_message("Permission denied!")
-            return
+            return False
         if self.playing:
-            pygame.mixer.music.stop()
+            self.stop_music()
         try:
-            pygame.mixer.music.load(filepath)
-            pygame.mixer.music.set_volume(self.volume)
-            pygame.mixer.music.play()
-            self.playing = True
-            self.paused = False
+            self.start_music(filepath)
             self.status_output.set_text([('time_separator,bold', " Playing:\n "), ('normal', f"{os.path.basename(filepath)}")]) 
             self.metadata_output.set_text(self.get_metadata(filepath))
-            filled = min(50, int(self.volume * 50))
-            self.volume_bar.set_text([('normal', f" {int(self.volume * 100)}"), ('time_separator', '%'), (None, f" | {'░' * filled + ' ' * (50 - filled)}")]) #self.volume_bar.set_text(f" {int(self.volume * 100)}% | {'░' * filled + ' ' * (50 - filled)}")
-            audio = mutagen.File(filepath)
-            if audio and hasattr(audio, 'info'):
-                self.current_audio_duration = audio.info.length
-            else:
-                sound = pygame.mixer.Sound(filepath)
-                self.current_audio_duration = sound.get_length()
+            self.set_volume_level(self.volume_bar, int(self.volume * 100))
+            self.prepare_seek_table(filepath)
+            self.prepare_waveform(filepath)
+            self.preload_next()
+            if self.search is not None:
+                self.show_search_status()
         except Exception as e:
+            self.stop_music()
             self.show_message(f"Error playing media: {str(e)}")
+            return False
+        return True
 
-    def keypress(self, size, key):
-        current_message = self.status_output.text
-        is_perm_denied = isinstance(current_message, list) and len(current_message) > 0 and "Permission denied" in current_message[0][1]
+    def volume_applied(self, results):
+        if 'errors' in results:
+            self.show_message(f"Error adjusting volume: {'; '.join(results['errors'])}")
+        if 'master' in results:
+            if results['master'] is None:
+                self.show_message("Error adjusting system volume: Master control not available")
+                return
+            self.set_volume_level(self.system_volume_bar, results['master'])
+        if 'headphone' in results:
+            left, right = results['headphone']
+            if left is None and right is None:
+                self.show_message("Error adjusting headphone volume: Headphone control not available")
+                return
+            self.set_volume_level(self.headphone_left_bar, left)
+            self.set_volume_level(self.headphone_right_bar, right)
+
+    def prepare_seek_table(self, filepath):
+        self.seek_table = None
+        if filepath.lower().endswith('.mp3'):
+            self.seek_worker.submit(self.build_seek_table, filepath)
+
+    def build_seek_table(self, filepath):
+        cancelled = lambda: filepath != self.current_file
+        try:
+            table = self.metadata_cache.get_seek_table(filepath)
+            if table is None:
+                coarse = xing_seek_table(filepath)
+                if coarse is not None:
+                    self.bridge.call(self.set_seek_table, filepath, coarse)
+                table = scan_mp3_seek_table(filepath, cancelled=cancelled)
+                if table is None:
+                    return
+                self.metadata_cache.store_seek_table(filepath, table)
+        except (OSError, struct.error):
+            return
+        self.bridge.call(self.set_seek_table, filepath, table)
+
+    def set_seek_table(self, filepath, table):
+        if filepath == self.current_file:
+            self.seek_table = (filepath, table)
+
+    def prepare_waveform(self, filepath):
+        self.waveform = None
+        self.waveform_glyphs = None
+        try:
+            waveform = self.metadata_cache.get_waveform(filepath)
+        except OSError:
+            return
+        if waveform is not None:
+            self.set_waveform(filepath, waveform)
+        else:
+            self.waveform_worker.submit(self.build_waveform, filepath)
+
+    def build_waveform(self, filepath):
+        try:
+            if self.metadata_cache.get_waveform(filepath) is not None:
+                return
+            info = self.metadata_cache.get(filepath)
+            waveform = self.core.analysis_executor().submit(compute_waveform, filepath, info and info['duration']).result()
+        except Exception:
+            return
+        if waveform is None:
+            return
+        self.metadata_cache.store_waveform(filepath, waveform)
+        self.bridge.call(self.set_waveform, filepath, waveform)
+
+    def set_waveform(self, filepath, waveform):
+        if filepath == self.current_file:
+            self.waveform = waveform
+            self.waveform_glyphs = waveform_glyphs(waveform, self.progress_cells)
+
+    def remote_request(self, command, **args):
+        try:
+            response = self.remote.request(command, **args)
+        except (OSError, ValueError):
+            self.remote_disconnected()
+            return
+        self.remote_response(response)
+
+    def poll_remote(self, remote):
+        while self.remote is remote:
+            time.sleep(REMOTE_POLL_INTERVAL)
+            try:
+                response = remote.request('status')
+            except (OSError, ValueError):
+                self.bridge.call(self.remote_disconnected)
+                return
+            self.bridge.call(self.remote_response, response)
+
+    def remote_response(self, response):
+        if self.remote is None:
+            return
+        if not response.get('ok'):
+            self.show_message(f"Daemon: {response.get('error')}")
+            return
+        self.apply_remote_status(response['status'])
+
+    def remote_disconnected(self):
+        if self.remote is None:
+            return
+        self.remote.close()
+        self.remote = None
+        self.playing = False
+        self.paused = False
+        self.position_clock.reset()
+        self.status_output.set_text([('time_separator,bold', " Daemon disconnected")])
+        self.reschedule_ticks()
+
+    def open_decoder(self):
+        if pygame.mixer.get_init():
+            return
+        try:
+            init_decoder()
+        except pygame.error:
+            pass
+
+    def apply_remote_status(self, status):
+        was_paused = self.paused
+        self.playing = status['state'] != 'stopped'
+        self.paused = status['state'] == 'paused'
+        if self.paused and not was_paused:
+            self.status_output.set_text([('time_separator,bold', " Paused")])
+        elif was_paused and self.playing and not self.paused and status['file'] == self.current_file:
+            self.status_output.set_text([('time_separator,bold', " Resumed: "), ('normal', f"{os.path.basename(status['file'])}")])
+        if status['file'] != self.current_file or not self.playing:
+            if self.playing:
+                self.open_decoder()
+                self.status_output.set_text([('time_separator,bold', " Playing:\n "), ('normal', f"{os.path.basename(status['file'])}")])
+                self.metadata_output.set_text(self.get_metadata(status['file']))
+                self.prepare_waveform(status['file'])
+            elif self.current_file is not None:
+                self.status_output.set_text([('time_separator,bold', " Stopped")])
+                self.metadata_output.set_text([('path_value', ' No metadata available')])
+            self.current_file = status['file'] if self.playing else None
+        self.current_audio_duration = status['duration'] or 0
+        self.current_duration_confidence = None
+        if status['volume'] != self.volume:
+            self.volume = status['volume']
+            self.set_volume_level(self.volume_bar, int(self.volume * 100))
+        self.gapless = status['gapless']
+        self.normalization = status['normalization']
+        if status['mixer'] != self.core.mixer_levels:
+            self.core.mixer_levels = status['mixer']
+            self.mixer_levels_read(status['mixer'])
+        if self.playing:
+            self.position_clock.start(status['position'])
+            if self.paused:
+                self.position_clock.pause()
+        else:
+            self.position_clock.reset()
+
+    def remote_keypress(self, size, key):
+        if key == 'enter':
+            if not self.file_list or self.focus.original_widget.original_widget.text.strip() in ["(empty)", "(access denied)"]:
+                return key
+            full_path = os.path.join(self.current_dir, self.focus.original_widget.original_widget.text.rstrip('/'))
+            if os.path.isdir(full_path):
+                self.keypress_open_directory(full_path)
+            else:
+                self.remote_request('play', path=full_path)
+        elif key == ' ':
+            self.remote_request('play', path=self.current_dir)
+        elif key == 'p':
+            self.remote_request('toggle')
+        elif key == 's':
+            self.remote_request('stop')
+        elif key == 'r':
+            self.remote_request('seek', position=0)
+        elif key == 'n':
+            self.remote_request('next')
+        elif key in SEEK_KEYS:
+            self.remote_request('seek', delta=SEEK_KEYS[key])
+        elif key in ('+', '-'):
+            self.remote_request('volume', delta=0.02 if key == '+' else -0.02)
+        elif key in ('i', 'd'):
+            self.remote_request('mixer', master=2 if key == 'i' else -2)
+        elif key in ('a', 'b', 'c', 'g', 'e', 'f'):
+            delta = 2 if key in ('a', 'c', 'e') else -2
+            self.remote_request('mixer', left=delta if key in ('c', 'g', 'e', 'f') else 0,
+                                right=delta if key in ('a', 'b', 'e', 'f') else 0)
+        elif key == 'G':
+            self.remote_request('gapless')
+            self.show_message(f"Gapless playback: {'on' if self.gapless else 'off'}")
+        elif key == 'N':
+            self.remote_request('normalize')
+            self.show_message(f"Loudness normalization: {self.normalization}")
+        else:
+            self.show_message("Not available while attached to the daemon")
+        return key
+
+    def cycle_normalization(self):
+        self.core.set_normalization()
+        self.show_message(f"Loudness normalization: {self.normalization}")
+
+    def meter_source(self):
+        if not self.playing or not self.current_file:
+            return None
+        seek_table = self.seek_table[1] if self.seek_table is not None and self.seek_table[0] == self.current_file else None
+        return self.current_file, self.position_clock.position(), self.current_audio_duration, seek_table
+
+    def toggle_meter(self):
+        if self.meter.visible:
+            self.meter.hide()
+            self.metadata_filler.original_widget = self.metadata_output
+        else:
+            self.meter_text.set_text(meter_markup((0.0, 0.0), (), self.meter.cells, self.meter.rows))
+            self.metadata_filler.original_widget = self.meter_text
+            self.meter.show()
+
+    def show_meter(self, markup):
+        self.meter_text.set_text(markup)
+
+    def seek(self, delta):
+        if not self.playing or self.paused or not self.current_file:
+            return
+        filepath = self.current_file
+        target = max(0.0, self.position_clock.position() + delta)
+        if self.current_audio_duration and target >= self.current_audio_duration:
+            self.next_track()
+            return
+        source = None
+        if self.seek_table is not None and self.seek_table[0] == filepath:
+            offset, landed = seek_table_offset(self.seek_table[1], target)
+            source = open_mp3_at(filepath, offset)
+            if source is not None:
+                target = landed
+        try:
+            self.start_music(filepath, target, source)
+        except pygame.error as e:
+            self.start_music(filepath)
+            self.show_message(f"Seek not supported: {str(e)}")
+        self.preload_next()
+        self.update_progress_bar()
+
+    def keypress_open_directory(self, full_path):
+        self.dir_history.append(self.current_dir)
+        os.chdir(full_path)
+        self.current_dir = os.getcwd()
+        self.refresh_list()
+        self.clear_message()
+        self.main_loop.draw_screen()
 
     def keypress(self, size, key):
+        if self.search is not None:
+            return self.search_keypress(size, key)
+        if self.remote is not None and (key in REMOTE_KEYS or key in SEEK_KEYS):
+            return self.remote_keypress(size, key)
         current_message = self.status_output.text
         is_perm_denied = isinstance(current_message, list) and len(current_message) > 0 and "Permission denied" in current_message[0][1]
 
@@ -769,6 +3746,8 @@ class PlaybackMode(urwid.ListBox):
             ('normal,bold', ' down'), ('path_value', ' - Move focus down in file list.\n'),
             ('normal,bold', ' enter'), ('path_value', ' - Open folder or play file.\n'),
             ('normal,bold', ' space'), ('path_value', ' - Play directory as playlist.\n'),
+            ('normal,bold', ' R'), ('path_value', ' - Play directory tree recursively.\n'),
+            ('normal,bold', ' w'), ('path_value', ' - Save playlist as playlist.m3u8.\n'),
             ('normal,bold', ' + -'), ('path_value', ' - Increase/Decrease volume (pygame).\n'),
             ('normal,bold', ' a'), ('path_value', ' - Increase right headphone volume\n'),
             ('normal,bold', ' b'), ('path_value', ' - Decrease right headphone volume\n'),
@@ -782,6 +3761,14 @@ class PlaybackMode(urwid.ListBox):
             ('normal,bold', ' r'), ('path_value', ' - Restart current track.\n'),
             ('normal,bold', ' i'), ('path_value', ' - Increase system volume.\n'),
             ('normal,bold', ' n'), ('path_value', ' - Next track.\n'),
+            ('normal,bold', ' , .'), ('path_value', ' - Seek back/forward 5 seconds.\n'),
+            ('normal,bold', ' < >'), ('path_value', ' - Seek back/forward 60 seconds.\n'),
+            ('normal,bold', ' G'), ('path_value', ' - Toggle gapless playback.\n'),
+            ('normal,bold', ' v'), ('path_value', ' - Toggle VU/spectrum meter.\n'),
+            ('normal,bold', ' N'), ('path_value', ' - Loudness normalization: off/track/album.\n'),
+            ('normal,bold', ' L'), ('path_value', ' - Play the whole music library.\n'),
+            ('normal,bold', ' /'), ('path_value', ' - Search (Tab: library, Enter: play).\n'),
+            ('normal,bold', ' O'), ('path_value', ' - Toggle performance overlay.\n'),
             ('normal,bold', ' q or Q'), ('path_value', ' - Quit program.\n'),
             ('normal,bold', ' h'), ('path_value', ' - Show help.')
         ]
@@ -823,168 +3810,120 @@ class PlaybackMode(urwid.ListBox):
                 except PermissionError:
                     self.show_message("Permission denied!")
         elif key == 'up' and self.focus_position > 0:
+            self.scan_focus_target = None
             self.set_focus(self.focus_position - 1)
+            self.prefetch_focused_directory()
             if not is_perm_denied:
                 self.clear_message()
         elif key == 'down' and self.focus_position < len(self.file_list) - 1:
+            self.scan_focus_target = None
             self.set_focus(self.focus_position + 1)
+            self.prefetch_focused_directory()
             if not is_perm_denied:
                 self.clear_message()
         elif key == 'enter':
             if not self.file_list or self.focus.original_widget.original_widget.text.strip() in ["(empty)", "(access denied)"]:
                 return
-            selected = self.focus.original_widget.original_widget.text.rstrip('/')
-            full_path = os.path.join(self.current_dir, selected)
+            in_playlist = not self.showing_listing and len(self.file_list) == len(self.playlist)
+            if in_playlist:
+                full_path = self.playlist[self.focus_position]
+                if full_path is None:
+                    self.show_message("Error: unsupported playlist entry")
+                    return
+            else:
+                full_path = os.path.join(self.current_dir, self.focus.original_widget.original_widget.text.rstrip('/'))
             try:
                 if os.path.isdir(full_path):
-                    self.dir_history.append(self.current_dir)
-                    os.chdir(full_path)
-                    self.current_dir = os.getcwd()
-                    self.refresh_list()
-                    self.clear_message()
+                    self.keypress_open_directory(full_path)
+                elif is_playlist_file(full_path):
+                    if self.playing or self.paused:
+                        self.stop_music()
+                        self.playing = False
+                        self.paused = False
+                    self.load_and_play_playlist(full_path)
                     self.main_loop.draw_screen()
                 elif os.path.isfile(full_path):
-                    self.play_media(full_path)
-                    self.playlist = [full_path]
-                    self.playlist_index = 0
+                    if in_playlist:
+                        self.play_available(self.focus_position)
+                    else:
+                        self.playlist = Playlist([full_path])
+                        self.playlist_index = 0
+                        self.play_media(full_path)
+                else:
+                    self.show_message(f"Error: not found: {full_path}")
             except Exception as e:
                 self.show_message(f"Error: {str(e)}")
         elif key == ' ':
             if self.playing or self.paused:
-                pygame.mixer.music.stop()
+                self.stop_music()
                 self.playing = False
                 self.paused = False
             self.file_list.clear()
             self.load_and_play_directory(self.current_dir)
-            self.check_playback_end()
+            self.main_loop.draw_screen()
+        elif key == 'w':
+            self.save_playlist()
+        elif key == 'R':
+            if self.playing or self.paused:
+                self.stop_music()
+                self.playing = False
+                self.paused = False
+            self.load_and_play_tree(self.current_dir)
             self.main_loop.draw_screen()
         elif key == 'p':
             if self.playing:
                 if self.paused:
-                    pygame.mixer.music.unpause()
-                    self.paused = False
-                    filepath = os.path.join(self.current_dir, self.focus.original_widget.original_widget.text.rstrip('/'))
-                    self.status_output.set_text([('time_separator,bold', " Resumed: "), ('normal', f"{os.path.basename(filepath)}")])
+                    self.core.resume()
+                    self.reschedule_ticks()
+                    self.status_output.set_text([('time_separator,bold', " Resumed: "), ('normal', f"{os.path.basename(self.current_file)}")])
                 else:
-                    pygame.mixer.music.pause()
-                    self.paused = True
+                    self.core.pause()
+                    self.reschedule_ticks()
                     self.status_output.set_text([('time_separator,bold', " Paused")])
         elif key == 's':
             if self.playing:
-                pygame.mixer.music.stop()
+                self.stop_music()
                 self.playing = False
                 self.paused = False
                 self.status_output.set_text([('time_separator,bold', " Stopped")])
                 self.metadata_output.set_text([('path_value', ' No metadata available')])
         elif key == 'r':
             if self.playing or self.paused:
-                filepath = os.path.join(self.current_dir, self.focus.original_widget.original_widget.text.rstrip('/'))
-                pygame.mixer.music.stop()
-                pygame.mixer.music.load(filepath)
-                pygame.mixer.music.set_volume(self.volume)
-                pygame.mixer.music.play()
-                self.playing = True
-                self.paused = False
+                filepath = self.current_file
+                self.start_music(filepath)
                 self.status_output.set_text([('time_separator,bold', " Replaying: "), ('normal', f"{os.path.basename(filepath)}")])
                 self.metadata_output.set_text(self.get_metadata(filepath))
-        elif key == '+':
-            self.volume = min(1.0, self.volume + 0.02)
-            if self.playing:
-                pygame.mixer.music.set_volume(self.volume)
-            filled = int(self.volume * 50)
-            self.volume_bar.set_text([('normal', f" {int(self.volume * 100)}"), ('time_separator', '%'), (None, f" | {'░' * filled + ' ' * (50 - filled)}")]) #self.volume_bar.set_text(f" {int(self.volume * 100)}% | {'░' * filled + ' ' * (50 - filled)}")
-            self.main_loop.draw_screen()
-        elif key == '-':
-            self.volume = max(0.0, self.volume - 0.02)
+                self.preload_next()
+        elif key in ('+', '-'):
+            self.volume = min(1.0, max(0.0, self.volume + (0.02 if key == '+' else -0.02)))
+            self.set_volume_level(self.volume_bar, int(self.volume * 100))
             if self.playing:
-                pygame.mixer.music.set_volume(self.volume)
-            filled = int(self.volume * 44)
-            self.volume_bar.set_text([('normal', f" {int(self.volume * 100)}"), ('time_separator', '%'), (None, f" | {'░' * filled + ' ' * (44 - filled)}")]) #self.volume_bar.set_text(f" {int(self.volume * 100)}% | {'░' * filled + ' ' * (44 - filled)}")
-            self.main_loop.draw_screen()
-        elif key == 'i':
-            try:
-                result = subprocess.check_output("amixer set Master 2%+ | grep -o '[0-9]\+%' | head -1", shell=True, text=True).strip()
-                percent = int(result.rstrip('%'))
-                filled = min(50, int(percent / 2))
-                self.system_volume_bar.set_text([('normal', f" {percent}"), ('time_separator', '%'), (None, f" | {'░' * filled + ' ' * (50 - filled)}")]) #self.system_volume_bar.set_text(f" {percent}% | {'░' * filled + ' ' * (50 - filled)}")
-                self.main_loop.draw_screen()
-            except subprocess.CalledProcessError as e:
-                self.show_message(f"Error adjusting system volume: {e}")
-        elif key == 'd':
-            try:
-                result = subprocess.check_output("amixer set Master 2%- | grep -o '[0-9]\+%' | head -1", shell=True, text=True).strip()
-                percent = int(result.rstrip('%'))
-                filled = min(50, int(percent / 2))
-                self.system_volume_bar.set_text([('normal', f" {percent}"), ('time_separator', '%'), (None, f" | {'░' * filled + ' ' * (50 - filled)}")]) #self.system_volume_bar.set_text(f" {percent}% | {'░' * filled + ' ' * (50 - filled)}")
-                self.main_loop.draw_screen()
-            except subprocess.CalledProcessError as e:
-                self.show_message(f"Error adjusting system volume: {e}")
-        elif key == 'a':
-            try:
-                result = subprocess.check_output("amixer sset 'Headphone' frontright 2%+ -q && amixer sget 'Headphone' | grep 'Front Right' | grep -o '[0-9]\+%' | head -1", shell=True, text=True).strip()
-                percent = int(result.rstrip('%'))
-                filled = min(50, int(percent / 2))
-                self.headphone_right_bar.set_text([('normal', f" {percent}"), ('time_separator', '%'), (None, f" | {'░' * filled + ' ' * (50 - filled)}")]) #self.headphone_right_bar.set_text(f" {percent}% | {'░' * filled + ' ' * (50 - filled)}")
-                self.main_loop.draw_screen()
-            except subprocess.CalledProcessError as e:
-                pass
-        elif key == 'b':
-            try:
-                result = subprocess.check_output("amixer sset 'Headphone' frontright 2%- -q && amixer sget 'Headphone' | grep 'Front Right' | grep -o '[0-9]\+%' | head -1", shell=True, text=True).strip()
-                percent = int(result.rstrip('%'))
-                filled = min(50, int(percent / 2))
-                self.headphone_right_bar.set_text([('normal', f" {percent}"), ('time_separator', '%'), (None, f" | {'░' * filled + ' ' * (50 - filled)}")]) #self.headphone_right_bar.set_text(f" {percent}% | {'░' * filled + ' ' * (50 - filled)}")
-                self.main_loop.draw_screen()
-            except subprocess.CalledProcessError as e:
-                self.show_message(f"Error adjusting headphone volume: {e}")
-        elif key == 'c':
-            try:
-                result = subprocess.check_output("amixer sset 'Headphone' frontleft 2%+ -q && amixer sget 'Headphone' | grep 'Front Left' | grep -o '[0-9]\+%' | head -1", shell=True, text=True).strip()
-                percent = int(result.rstrip('%'))
-                filled = min(50, int(percent / 2))
-                self.headphone_left_bar.set_text([('normal', f" {percent}"), ('time_separator', '%'), (None, f" | {'░' * filled + ' ' * (50 - filled)}")]) #self.headphone_left_bar.set_text(f" {percent}% | {'░' * filled + ' ' * (50 - filled)}")
-                self.main_loop.draw_screen()
-            except subprocess.CalledProcessError as e:
-                self.show_message(f"Error adjusting headphone volume: {e}")
-        elif key == 'g':
-            try:
-                result = subprocess.check_output("amixer sset 'Headphone' frontleft 2%- -q && amixer sget 'Headphone' | grep 'Front Left' | grep -o '[0-9]\+%' | head -1", shell=True, text=True).strip()
-                percent = int(result.rstrip('%'))
-                filled = min(50, int(percent / 2))
-                self.headphone_left_bar.set_text([('normal', f" {percent}"), ('time_separator', '%'), (None, f" | {'░' * filled + ' ' * (50 - filled)}")]) #self.headphone_left_bar.set_text(f" {percent}% | {'░' * filled + ' ' * (50 - filled)}")
-                self.main_loop.draw_screen()
-            except subprocess.CalledProcessError as e:
-                self.show_message(f"Error adjusting headphone volume: {e}")
-        elif key == 'e':
-            try:
-                subprocess.check_output("amixer sset 'Headphone' 2%+ -q", shell=True, text=True)
-                left_result = subprocess.check_output("amixer sget 'Headphone' | grep 'Front Left' | grep -o '[0-9]\+%' | head -1", shell=True, text=True).strip()
-                left_percent = int(left_result.rstrip('%'))
-                left_filled = min(50, left_percent // 2)
-                self.headphone_left_bar.set_text([('normal', f" {left_percent}"), ('time_separator', '%'), (None, f" | {'░' * left_filled + ' ' * (50 - left_filled)}")]) #self.headphone_left_bar.set_text(f" {left_percent}% | {'░' * left_filled + ' ' * (50 - left_filled)}")
-                right_result = subprocess.check_output("amixer sget 'Headphone' | grep 'Front Right' | grep -o '[0-9]\+%' | head -1", shell=True, text=True).strip()
-                right_percent = int(right_result.rstrip('%'))
-                right_filled = min(50, right_percent // 2)
-                self.headphone_right_bar.set_text([('normal', f" {right_percent}"), ('time_separator', '%'), (None, f" | {'░' * right_filled + ' ' * (50 - right_filled)}")]) #self.headphone_right_bar.set_text(f" {right_percent}% | {'░' * right_filled + ' ' * (50 - right_filled)}")
-                self.main_loop.draw_screen()
-            except subprocess.CalledProcessError as e:
-                self.show_message(f"Error adjusting headphone volume: {e}")
-        elif key == 'f':
-            try:
-                subprocess.check_output("amixer sset 'Headphone' 2%- -q", shell=True, text=True)
-                left_result = subprocess.check_output("amixer sget 'Headphone' | grep 'Front Left' | grep -o '[0-9]\+%' | head -1", shell=True, text=True).strip()
-                left_percent = int(left_result.rstrip('%'))
-                left_filled = min(50, left_percent // 2)
-                self.headphone_left_bar.set_text([('normal', f" {left_percent}"), ('time_separator', '%'), (None, f" | {'░' * left_filled + ' ' * (50 - left_filled)}")]) #self.headphone_left_bar.set_text(f" {left_percent}% | {'░' * left_filled + ' ' * (50 - left_filled)}")
-                right_result = subprocess.check_output("amixer sget 'Headphone' | grep 'Front Right' | grep -o '[0-9]\+%' | head -1", shell=True, text=True).strip()
-                right_percent = int(right_result.rstrip('%'))
-                right_filled = min(50, right_percent // 2)
-                self.headphone_right_bar.set_text([('normal', f" {right_percent}"), ('time_separator', '%'), (None, f" | {'░' * right_filled + ' ' * (50 - right_filled)}")]) #self.headphone_right_bar.set_text(f" {right_percent}% | {'░' * right_filled + ' ' * (50 - right_filled)}")
-                self.main_loop.draw_screen()
-            except subprocess.CalledProcessError as e:
-                self.show_message(f"Error adjusting headphone volume: {e}")
+                self.volume_controller.set('pygame', self.volume)
+        elif key in ('i', 'd'):
+            self.volume_controller.add('master', 2 if key == 'i' else -2)
+        elif key in ('a', 'b', 'c', 'g', 'e', 'f'):
+            delta = 2 if key in ('a', 'c', 'e') else -2
+            if key in ('c', 'g', 'e', 'f'):
+                self.volume_controller.add('left', delta)
+            if key in ('a', 'b', 'e', 'f'):
+                self.volume_controller.add('right', delta)
         elif key == 'n':
             self.next_track()
+        elif key in SEEK_KEYS:
+            self.seek(SEEK_KEYS[key])
+        elif key == 'G':
+            self.core.set_gapless()
+            self.prefetch_queued_waveform()
+            self.show_message(f"Gapless playback: {'on' if self.gapless else 'off'}")
+        elif key == 'v':
+            self.toggle_meter()
+        elif key == 'N':
+            self.cycle_normalization()
+        elif key == '/':
+            self.start_search()
+        elif key == 'L':
+            self.play_library()
+            self.main_loop.draw_screen()
         elif key in ('q', 'Q'):
             self.cleanup()
             return 'q'
@@ -998,52 +3937,419 @@ class PlaybackMode(urwid.ListBox):
         return None
 
 class FileManager:
-    def __init__(self, input_path=None):
+    def __init__(self, input_path=None, music_root=MUSIC_ROOT, remote=None, metrics_path=None):
         self.main_loop = None
         self.root_dir = os.path.dirname(os.path.abspath(__file__))
-        self.mode = PlaybackMode(None, self.root_dir, input_path)
+        self.mode = PlaybackMode(None, self.root_dir, input_path, music_root, remote)
+        self.scheduler = TickScheduler()
+        self.scheduler.add(self.mode.update_progress_bar, self.mode.progress_interval)
+        self.scheduler.add(self.mode.update_clock, self.mode.clock_interval)
+        self.scheduler.add(self.update_metrics, lambda: 1.0 if self.metrics_visible() else None)
+        self.scheduler.add(self.write_metrics, lambda: METRICS_INTERVAL if self.metrics_file else None)
+        self.mode.scheduler = self.scheduler
         initial_widget = self.wrap_mode_widget(self.mode.get_widget())
         self.frame = urwid.Frame(body=initial_widget)
+        self.metrics_text = urwid.Text("")
+        self.metrics_panel = urwid.AttrMap(urwid.LineBox(urwid.AttrMap(self.metrics_text, 'normal'), title="PERFORMANCE"), 'pink_frame')
+        self.metrics_file = open(metrics_path, 'a', buffering=1) if metrics_path else None
+        self.metrics_due = time.monotonic() + METRICS_INTERVAL
     def wrap_mode_widget(self, widget):
         title = "╡ AUDIO PLAYER TERM PY ╞"
-        term_width = os.get_terminal_size().columns
-        title_len = len(title)
-        side_len = max(1, (term_width - title_len - 2) // 2)
-        top_line = f'╔{"═" * side_len}{title}{"═" * (side_len + term_width % 2)}╗'
-        top_text = urwid.Text(('header', top_line), align='center')
+        layout = self.mode.layout
+        top_text = layout.border_text('header', title, 'columns', attr='header', align='center')
         side_borders = urwid.LineBox(widget, lline='║', rline='║', tline='', bline='', tlcorner='', trcorner='', blcorner='', brcorner='')
         side_borders = urwid.AttrMap(side_borders, 'header')
         framed_widget = urwid.Frame(
             body=side_borders,
             header=top_text,
             focus_part='body',
-            footer=urwid.Text(('header', '╚' + '═' * (len(top_line) - 2) + '╝'))
+            footer=layout.border_text('header_bottom', title, 'columns', attr='header')
         )
         return urwid.AttrMap(framed_widget, 'header')
 
+    def input_filter(self, keys, raw):
+        self.scheduler.resume()
+        if 'window resize' in keys:
+            self.mode.relayout(self.main_loop.screen.get_cols_rows())
+        return keys
+
     def unhandled_input(self, key):
         mode_key = self.mode.handle_input(key)
         if mode_key == 'q':
             self.mode.cleanup()
             raise urwid.ExitMainLoop()
+        if mode_key == 'O' and self.mode.search is None:
+            self.toggle_metrics()
+
+    def metrics_visible(self):
+        return self.main_loop is not None and self.main_loop.widget is not self.frame
+
+    def toggle_metrics(self):
+        if self.metrics_visible():
+            self.main_loop.widget = self.frame
+        else:
+            self.main_loop.widget = MetricsOverlay(self.metrics_panel, self.frame, align='right', width=56,
+                                                   valign='top', height='pack', right=2, top=1)
+            self.update_metrics()
+        self.scheduler.reschedule()
+
+    def update_metrics(self):
+        if not self.metrics_visible():
+            return ()
+        markup = METRICS.overlay_markup()
+        markup[0:0] = [('path_value', f" ticks {self.scheduler.updates} updated, {self.scheduler.skipped} skipped, "
+                                      f"{self.scheduler.wakeups_per_minute()} wakeups/min\n")]
+        return (set_text_if_changed(self.metrics_text, markup),)
+
+    def write_metrics(self, final=False):
+        if self.metrics_file is None or not final and time.monotonic() < self.metrics_due:
+            return ()
+        self.metrics_due = time.monotonic() + METRICS_INTERVAL - 0.5
+        snapshot = METRICS.snapshot()
+        snapshot['ticks'] = {'updated': self.scheduler.updates, 'skipped': self.scheduler.skipped,
+                             'wakeups_per_minute': self.scheduler.wakeups_per_minute()}
+        self.metrics_file.write(json.dumps(snapshot) + '\n')
+        return ()
+
+    def started(self, loop=None, data=None):
+        startup_mark("first frame drawn")
+        self.mode.start()
 
     def run(self):
-        os.system('clear')
-        self.main_loop = urwid.MainLoop(self.frame, palette=palette, unhandled_input=self.unhandled_input)
+        sys.stdout.write("\x1b[H\x1b[2J")
+        sys.stdout.flush()
+        self.main_loop = InstrumentedMainLoop(self.frame, palette=palette, unhandled_input=self.unhandled_input,
+                                              input_filter=self.input_filter)
         self.mode.main_loop = self.main_loop
-        self.mode.start()
-        self.mode.check_playback_end()
-        self.mode.update_clock()
-        self.main_loop.set_alarm_in(0.1, self.mode.update_progress_bar)
+        self.mode.volume_controller.main_loop = self.main_loop
+        self.mode.bridge.attach(self.main_loop)
+        self.mode.watch_directories()
+        self.main_loop.set_alarm_in(0, self.started)
+        self.scheduler.start(self.main_loop)
+        signal.signal(signal.SIGCONT, lambda signum, frame: self.mode.bridge.call(self.scheduler.resume))
         try:
             self.main_loop.run()
         finally:
+            if self.metrics_file is not None:
+                self.write_metrics(final=True)
+                self.metrics_file.close()
             os.system('stty sane')
             os.system('clear')
 
+CONTROL_SOCKET = os.path.join(os.environ.get('XDG_RUNTIME_DIR') or CACHE_DIR, 'audioPlayerTermPy.sock')
+NUMBER = (int, float)
+COMMAND_ARGS = {
+    'play': {'path': str}, 'pause': {}, 'resume': {}, 'toggle': {}, 'stop': {}, 'next': {},
+    'seek': {'delta': NUMBER, 'position': NUMBER}, 'volume': {'delta': NUMBER, 'value': NUMBER},
+    'mixer': {'master': int, 'left': int, 'right': int}, 'gapless': {'enabled': bool},
+    'normalize': {'mode': str}, 'status': {}, 'quit': {},
+}
+
+def command_error(command, args):
+    schema = COMMAND_ARGS.get(command) if isinstance(command, str) else None
+    if schema is None:
+        return f"unknown command: {command!r}"
+    for name, value in args.items():
+        kind = schema.get(name)
+        if kind is None:
+            return f"{command}: unexpected argument {name!r}"
+        if isinstance(value, bool) != (kind is bool) or not isinstance(value, kind):
+            return f"{command}: bad value for {name}: {value!r}"
+        if isinstance(value, float) and not math.isfinite(value):
+            return f"{command}: bad value for {name}: {value!r}"
+    if command == 'normalize' and args.get('mode', NORMALIZATION_MODES[0]) not in NORMALIZATION_MODES:
+        return f"normalize: mode must be one of {', '.join(NORMALIZATION_MODES)}"
+    return None
+
+class ControlServer:
+    def __init__(self, core, bridge, path=CONTROL_SOCKET):
+        self.core = core
+        self.bridge = bridge
+        self.path = path
+        self.selector = selectors.DefaultSelector()
+        self.buffers = {}
+        self.running = False
+        self.commands = {
+            'play': core.load, 'pause': core.pause, 'resume': core.resume, 'toggle': core.toggle,
+            'stop': core.stop, 'next': core.next, 'seek': core.seek, 'volume': core.set_volume,
+            'mixer': core.change_mixer, 'gapless': core.set_gapless, 'normalize': core.set_normalization,
+            'status': lambda: None, 'quit': self.stop,
+        }
+
+    def listen(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        if os.path.exists(self.path):
+            try:
+                ControlClient(self.path).close()
+            except OSError:
+                os.unlink(self.path)
+            else:
+                raise OSError(f"a daemon is already listening on {self.path}")
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.listener.bind(self.path)
+        os.chmod(self.path, 0o600)
+        self.listener.listen()
+        self.selector.register(self.listener, selectors.EVENT_READ, self.accept)
+        self.selector.register(self.bridge.read_fd, selectors.EVENT_READ, lambda fd: self.bridge.drain())
+
+    def serve_forever(self):
+        self.listen()
+        self.running = True
+        try:
+            while self.running:
+                for key, _ in self.selector.select():
+                    key.data(key.fileobj)
+        finally:
+            for conn in list(self.buffers):
+                self.close(conn)
+            self.listener.close()
+            os.unlink(self.path)
+
+    def stop(self):
+        self.running = False
+
+    def accept(self, listener):
+        conn, _ = listener.accept()
+        self.buffers[conn] = b''
+        self.selector.register(conn, selectors.EVENT_READ, self.receive)
+
+    def close(self, conn):
+        self.selector.unregister(conn)
+        del self.buffers[conn]
+        conn.close()
+
+    def receive(self, conn):
+        try:
+            data = conn.recv(65536)
+        except OSError:
+            data = b''
+        if not data:
+            self.close(conn)
+            return
+        *lines, self.buffers[conn] = (self.buffers[conn] + data).split(b'\n')
+        replies = b''.join(json.dumps(self.dispatch(line)).encode() + b'\n' for line in lines if line.strip())
+        try:
+            conn.sendall(replies)
+        except OSError:
+            self.close(conn)
+
+    def dispatch(self, line):
+        try:
+            request = json.loads(line)
+            command = request.pop('cmd')
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return {'ok': False, 'error': "bad request"}
+        error = command_error(command, request)
+        if error is not None:
+            return {'ok': False, 'error': error}
+        handler = self.commands[command]
+        try:
+            handler(**request)
+        except (TypeError, ValueError, OSError, pygame.error) as e:
+            return {'ok': False, 'error': str(e)}
+        return {'ok': True, 'status': self.core.status()}
+
+class ControlClient:
+    timeout = 2.0
+
+    def __init__(self, path=CONTROL_SOCKET):
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.settimeout(self.timeout)
+        try:
+            self.socket.connect(path)
+        except OSError:
+            self.socket.close()
+            raise
+        self.reader = self.socket.makefile('rb')
+        self.lock = threading.Lock()
+
+    def request(self, command, **args):
+        with self.lock:
+            self.socket.sendall(json.dumps(dict(args, cmd=command)).encode() + b'\n')
+            line = self.reader.readline()
+        if not line:
+            raise ConnectionError("the daemon closed the connection")
+        return json.loads(line)
+
+    def close(self):
+        self.reader.close()
+        self.socket.close()
+
+def run_daemon(input_path=None, path=CONTROL_SOCKET):
+    bridge = LoopBridge()
+    core = PlayerCore(bridge)
+    server = ControlServer(core, bridge, path)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    core.read_mixer_levels()
+    if input_path:
+        core.load(input_path)
+    try:
+        server.serve_forever()
+    finally:
+        core.close()
+
+def send_command(words, path=CONTROL_SOCKET):
+    command, argument = words[0], (words[1] if len(words) > 1 else None)
+    args = {}
+    if command == 'play' and argument is not None:
+        args['path'] = os.path.abspath(argument)
+    elif command in ('seek', 'volume') and argument is not None:
+        try:
+            value = float(argument)
+        except ValueError:
+            sys.stderr.write(f"audioPlayerTermPy: usage: --send {command} [+-]NUMBER, got {argument!r}\n")
+            return 2
+        if argument[0] in '+-':
+            args['delta'] = value
+        else:
+            args['position' if command == 'seek' else 'value'] = value
+    elif command == 'mixer':
+        try:
+            control, delta = words[1], int(words[2])
+            controls = {'master': ('master',), 'left': ('left',), 'right': ('right',), 'both': ('left', 'right')}[control]
+        except (IndexError, ValueError, KeyError):
+            sys.stderr.write("audioPlayerTermPy: usage: --send mixer {master,left,right,both} [+-]PERCENT\n")
+            return 2
+        args = {name: delta for name in controls}
+    elif command == 'gapless' and argument is not None:
+        if argument not in ('on', 'off'):
+            sys.stderr.write(f"audioPlayerTermPy: usage: --send gapless [on|off], got {argument!r}\n")
+            return 2
+        args['enabled'] = argument == 'on'
+    elif command == 'normalize' and argument is not None:
+        args['mode'] = argument
+    client = ControlClient(path)
+    try:
+        response = client.request(command, **args)
+    finally:
+        client.close()
+    print(json.dumps(response, ensure_ascii=False))
+    return 0 if response.get('ok') else 1
+
+def scan_file(filepath, deep=False):
+    result = {'path': filepath, 'ok': False}
+    try:
+        st = os.stat(filepath)
+        result['size'] = st.st_size
+        result['key'] = (filepath, st.st_size, st.st_mtime_ns)
+        info = read_metadata(filepath)
+        result['metadata'] = info
+        if info is None:
+            result['error'] = "unrecognized format"
+            return result
+        duration, confidence = probe_duration(filepath)
+        if duration is not None:
+            result['duration'] = duration
+            result['confidence'] = confidence
+            declared = info['duration']
+            if declared and duration < declared * 0.98 - 1:
+                result['error'] = f"truncated: file holds {duration:.1f} of {declared:.1f} seconds declared in the header"
+                return result
+        if deep:
+            decoded = pygame.mixer.Sound(filepath).get_length()
+            expected = info['duration'] or duration
+            if expected and decoded < expected * 0.98 - 1:
+                result['error'] = f"truncated: decoded {decoded:.1f} of {expected:.1f} seconds"
+                return result
+            result['duration'] = decoded
+            result['confidence'] = 'exact'
+        else:
+            pygame.mixer.music.load(filepath)
+            pygame.mixer.music.unload()
+        result['ok'] = True
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    return result
+
+def scan_library(root, deep=False, report=False, jobs=None, out=sys.stdout):
+    cache = MetadataCache()
+    pool = ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context('spawn'),
+                               initializer=init_decoder)
+    window = (jobs or os.cpu_count() or 1) * 8
+    scanned = broken = unsaved = 0
+    pending = set()
+    paths = walk_audio_files(os.path.abspath(root), lambda: False)
+    try:
+        while True:
+            for filepath in islice(paths, window - len(pending)):
+                pending.add(pool.submit(scan_file, filepath, deep))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                key = result.pop('key', None)
+                if 'metadata' in result:
+                    info = result.pop('metadata')
+                    cache.store(key, info, commit=False)
+                    unsaved += 1
+                else:
+                    info = None
+                for name, value in (info or {}).items():
+                    result.setdefault(name, value)
+                scanned += 1
+                if not result['ok']:
+                    broken += 1
+                if not report:
+                    out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                elif not result['ok']:
+                    out.write(f"{result['path']}: {result['error']}\n")
+            if unsaved >= 512:
+                cache.commit()
+                unsaved = 0
+    finally:
+        cache.commit()
+        pool.shutdown(cancel_futures=True)
+    if report:
+        out.write(f"{scanned} files scanned, {broken} broken or unreadable\n")
+    return 1 if broken else 0
+
 if __name__ == "__main__":
-    input_path = None
-    if len(sys.argv) > 1:
-        input_path = sys.argv[1]
-    fm = FileManager(input_path)
-    fm.run()
+    parser = argparse.ArgumentParser(description="Terminal audio player")
+    parser.add_argument('input_path', nargs='?', help="audio file or directory to play")
+    parser.add_argument('--music-root', default=MUSIC_ROOT, help="root of the music library index")
+    parser.add_argument('--scan', metavar='DIR', help="scan DIR without the TUI and print one JSON line per file")
+    parser.add_argument('--report', action='store_true', help="with --scan, print only broken or unreadable files")
+    parser.add_argument('--deep', action='store_true', help="with --scan, decode every file completely")
+    parser.add_argument('--jobs', type=int, help="with --scan, number of worker processes")
+    parser.add_argument('--daemon', action='store_true', help="play without the TUI, controlled over a Unix socket")
+    parser.add_argument('--attach', action='store_true', help="run the TUI as a client of a running daemon")
+    parser.add_argument('--send', nargs='+', metavar='CMD', help="send a command to the daemon: play PATH, pause, resume, "
+                        "toggle, stop, next, seek [+-]SECONDS, volume [+-]LEVEL, mixer {master,left,right,both} [+-]PERCENT, "
+                        "gapless [on|off], normalize [off|track|album], status, quit")
+    parser.add_argument('--socket', default=CONTROL_SOCKET, help="path of the daemon control socket")
+    parser.add_argument('--startup-trace', action='store_true', help="print where startup time went on exit")
+    parser.add_argument('--profile', nargs='?', const='audioPlayerTermPy', metavar='PREFIX',
+                        help="write PREFIX.prof (cProfile) and PREFIX.tracemalloc snapshots on exit")
+    parser.add_argument('--metrics', metavar='FILE', help=f"append a JSON line of latency metrics to FILE every {METRICS_INTERVAL} seconds")
+    args = parser.parse_args()
+    if args.daemon:
+        run_daemon(args.input_path, args.socket)
+        sys.exit(0)
+    if args.send:
+        try:
+            sys.exit(send_command(args.send, args.socket))
+        except OSError as e:
+            sys.exit(f"audioPlayerTermPy: cannot reach the daemon: {e}")
+    if args.scan:
+        try:
+            sys.exit(scan_library(args.scan, args.deep, args.report, args.jobs))
+        except BrokenPipeError:
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            sys.exit(1)
+    remote = None
+    if args.attach:
+        try:
+            remote = ControlClient(args.socket)
+        except OSError as e:
+            sys.exit(f"audioPlayerTermPy: cannot reach the daemon: {e}")
+    profile = start_profile() if args.profile else None
+    profile_prefix = os.path.abspath(args.profile or '')
+    fm = FileManager(args.input_path, args.music_root, remote, args.metrics)
+    try:
+        fm.run()
+    finally:
+        if profile is not None:
+            save_profile(profile, profile_prefix)
+    if args.startup_trace:
+        startup_report()
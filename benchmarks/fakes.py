@@ -0,0 +1,124 @@
+import time
+from types import SimpleNamespace
+
+class NullAudioError(Exception):
+    pass
+
+class NullMusic:
+    def __init__(self):
+        self.loaded = None
+        self.queued = None
+        self.playing = False
+        self.paused = False
+        self.started = 0.0
+        self.volume = 1.0
+        self.calls = 0
+
+    def load(self, source, namehint=""):
+        self.calls += 1
+        self.stop()
+        self.loaded = source
+
+    def unload(self):
+        self.loaded = None
+
+    def play(self, loops=0, start=0.0, fade_ms=0):
+        self.calls += 1
+        if self.loaded is None:
+            raise NullAudioError("music not loaded")
+        self.playing = True
+        self.paused = False
+        self.started = time.monotonic() - start
+
+    def stop(self):
+        self.playing = False
+        self.paused = False
+        self.queued = None
+
+    def pause(self):
+        self.paused = True
+
+    def unpause(self):
+        self.paused = False
+
+    def get_busy(self):
+        return self.playing and not self.paused
+
+    def get_pos(self):
+        return int((time.monotonic() - self.started) * 1000) if self.playing else -1
+
+    def set_volume(self, volume):
+        self.calls += 1
+        self.volume = volume
+
+    def queue(self, source, namehint="", loops=0):
+        self.queued = source
+
+class NullSound:
+    def __init__(self, filepath):
+        self.filepath = filepath
+
+    def get_length(self):
+        import audioPlayerTermPy as app
+        return app.probe_duration(self.filepath)[0] or 0.0
+
+class NullMixer:
+    def __init__(self):
+        self.music = NullMusic()
+        self.Sound = NullSound
+        self.initialized = None
+
+    def init(self, frequency=44100, size=-16, channels=2, buffer=512):
+        self.initialized = (frequency, size, channels)
+
+    def quit(self):
+        self.initialized = None
+
+    def get_init(self):
+        return self.initialized
+
+def null_pygame():
+    return SimpleNamespace(mixer=NullMixer(), error=NullAudioError)
+
+class NullAmixerBackend:
+    errors = (OSError,)
+
+    def __init__(self):
+        self.levels = {'Master': {'Front Left': 50, 'Front Right': 50},
+                       'Headphone': {'Front Left': 50, 'Front Right': 50}}
+        self.calls = 0
+
+    def get(self, control):
+        self.calls += 1
+        return dict(self.levels.get(control, {}))
+
+    def change(self, control, delta, channel=None):
+        self.calls += 1
+        for name, level in self.levels.get(control, {}).items():
+            if channel is None or name == ('Front Left' if channel == 'left' else 'Front Right'):
+                self.levels[control][name] = max(0, min(100, level + delta))
+        return self.get(control)
+
+def install(app):
+    app.pygame = null_pygame()
+    app.MixerControl.BACKENDS = (NullAmixerBackend,)
+    app.PlaybackMode.build_waveform = lambda self, filepath: None
+    return app.pygame
+
+class NullMainLoop:
+    def __init__(self):
+        self.alarms = []
+        self.draws = 0
+
+    def draw_screen(self):
+        self.draws += 1
+
+    def set_alarm_in(self, seconds, callback, user_data=None):
+        self.alarms.append((seconds, callback, user_data))
+        return len(self.alarms)
+
+    def remove_alarm(self, handle):
+        return False
+
+    def watch_file(self, fd, callback):
+        return fd
@@ -0,0 +1,98 @@
+import os
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import urwid
+import audioPlayerTermPy as app
+
+TRACK_SECONDS = 240
+TICK_INTERVAL = 0.5
+CELLS = 83
+
+def format_time(seconds):
+    return str(timedelta(seconds=int(seconds))).zfill(8)
+
+def legacy_clock(hours, mins, secs):
+    time_str = f"{hours:02d}:{mins:02d}:{secs:02d}"
+    chars = [app.get_pseudographic_char(c) for c in time_str]
+    result = []
+    for row in range(3):
+        line = []
+        for i, char in enumerate(chars):
+            style = 'time_separator' if i in [2, 5] else 'normal'
+            line.append((style, char[row].rstrip().ljust(4)))
+        result.append(line)
+    return result
+
+def legacy_active_time(elapsed_str, duration_str):
+    result = [('normal', " ")]
+    for char in elapsed_str:
+        result.append(('normal', char) if char.isdigit() else ('time_separator,bold', char))
+    result.append(('time_separator,bold', " / "))
+    for char in duration_str:
+        result.append(('normal', char) if char.isdigit() else ('time_separator,bold', char))
+    return result
+
+def legacy_tick(widgets, elapsed, clock_second):
+    progress_bar, time_text, clock_text = widgets
+    percent = min(100, int(elapsed / TRACK_SECONDS * 100))
+    filled = min(CELLS, percent * CELLS // 100)
+    progress_bar.set_text([('normal', f"{percent:3d}"), ('time_separator', '%'), (None, f" | {'░' * filled}{' ' * (CELLS - filled)}")])
+    time_text.set_text(legacy_active_time(format_time(elapsed), format_time(TRACK_SECONDS)))
+    if clock_second is not None:
+        clock_text.set_text(legacy_clock(12, 34, clock_second))
+
+def cached_tick(widgets, elapsed, clock_second, state):
+    progress_bar, time_text, clock_text = widgets
+    percent = min(100, int(elapsed / TRACK_SECONDS * 100))
+    app.set_text_if_changed(progress_bar, state.render_cache.progress(percent, CELLS))
+    time_key = (int(elapsed), TRACK_SECONDS, None)
+    if time_key != state.last_time_key:
+        state.last_time_key = time_key
+        markup = app.PlaybackMode.format_active_time(state, format_time(elapsed), format_time(TRACK_SECONDS))
+        app.set_text_if_changed(time_text, markup)
+    if clock_second is not None:
+        app.set_text_if_changed(clock_text, app.print_pseudographic_time(12, 34, clock_second))
+
+def ticks():
+    for step in range(int(TRACK_SECONDS / TICK_INTERVAL)):
+        elapsed = step * TICK_INTERVAL
+        yield elapsed, int(elapsed) % 60 if step % 2 == 0 else None
+
+def measure(tick):
+    widgets = (urwid.Text(""), urwid.Text(""), urwid.Text(""))
+    for elapsed, clock_second in ticks():
+        tick(widgets, elapsed, clock_second)
+    tracemalloc.start()
+    allocated = 0
+    count = 0
+    for elapsed, clock_second in ticks():
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        tick(widgets, elapsed, clock_second)
+        allocated += tracemalloc.get_traced_memory()[1] - before
+        count += 1
+    tracemalloc.stop()
+    started = time.perf_counter()
+    for elapsed, clock_second in ticks():
+        tick(widgets, elapsed, clock_second)
+    return allocated / count, (time.perf_counter() - started) / count * 1e6
+
+def main():
+    state = SimpleNamespace(render_cache=app.RenderCache(), last_time_key=None, current_duration_confidence=None)
+    results = [
+        ("legacy", measure(legacy_tick)),
+        ("render cache", measure(lambda widgets, elapsed, clock_second: cached_tick(widgets, elapsed, clock_second, state))),
+    ]
+    print(f"{'variant':<14}{'bytes/tick':>12}{'us/tick':>10}")
+    for name, (allocated, micros) in results:
+        print(f"{name:<14}{allocated:>12.0f}{micros:>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+import argparse
+import json
+import os
+import select
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+os.environ['XDG_CACHE_HOME'] = tempfile.mkdtemp(prefix='audioPlayerTermPy-bench-')
+os.environ['COLUMNS'], os.environ['LINES'] = '160', '50'
+
+import audioPlayerTermPy as app
+import fakes
+import synthetic
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINES = os.path.join(BENCH_DIR, 'baselines.json')
+SIZE = (160, 50)
+STORM_KEYS = ['down'] * 20 + ['up'] * 20 + ['+', '-'] * 10
+
+def drain(bridge, until, timeout=600.0):
+    deadline = time.monotonic() + timeout
+    while not until():
+        if time.monotonic() > deadline:
+            raise TimeoutError("background work did not finish")
+        select.select([bridge.read_fd], [], [], 0.05)
+        bridge.drain()
+
+def make_player(path):
+    fakes.install(app)
+    os.chdir(path)
+    fm = app.FileManager(music_root=path)
+    fm.main_loop = fakes.NullMainLoop()
+    fm.mode.main_loop = fm.main_loop
+    fm.mode.bridge.attach(fm.main_loop)
+    scanned = []
+    finish_scan = fm.mode.finish_scan
+    def finished(generation, placeholder):
+        finish_scan(generation, placeholder)
+        scanned.append(generation)
+    fm.mode.finish_scan = finished
+    fm.mode.scanned = scanned
+    fm.mode.refresh_list()
+    wait_for_scan(fm.mode)
+    return fm
+
+def wait_for_scan(mode):
+    drain(mode.bridge, lambda: mode.scanned and mode.scanned[-1] == mode.scan_generation)
+
+def scan_cold(fm, path):
+    fm.mode.listing_cache.discard(path)
+    fm.mode.refresh_list()
+    wait_for_scan(fm.mode)
+
+def scan_warm(fm, path):
+    fm.mode.refresh_list()
+    wait_for_scan(fm.mode)
+
+def play_directory(fm, path):
+    fm.mode.load_and_play_directory(path)
+    fm.mode.bridge.drain()
+
+def wav_files(path, limit):
+    names = sorted(name for name in os.listdir(path) if name.endswith('.wav'))[:limit]
+    return [os.path.join(path, name) for name in names]
+
+def metadata_cold(fm, files):
+    cache = app.MetadataCache(os.path.join(tempfile.mkdtemp(dir=os.environ['XDG_CACHE_HOME']), 'metadata.sqlite'))
+    fm.mode.metadata_cache = cache
+    for filepath in files:
+        fm.mode.get_metadata(filepath)
+
+def metadata_warm(fm, files):
+    for filepath in files:
+        fm.mode.get_metadata(filepath)
+
+def progress_tick(fm):
+    mode = fm.mode
+    mode.last_time_key = None
+    mode.update_progress_bar()
+
+def pseudographic_time():
+    for second in range(60):
+        app.print_pseudographic_time(12, 34, second)
+
+def keypress_storm(fm):
+    for key in STORM_KEYS:
+        fm.frame.keypress(SIZE, key)
+        fm.frame.render(SIZE, focus=True)
+    fm.mode.bridge.drain()
+
+def measure(action, rounds, budget, min_sample=0.005):
+    begin = time.perf_counter()
+    action()
+    first = time.perf_counter() - begin
+    if first > budget * 2:
+        return first
+    inner = max(1, int(min_sample / max(first, 1e-7)))
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < rounds or (time.perf_counter() - started < budget and len(samples) < rounds * 10):
+        begin = time.perf_counter()
+        for _ in range(inner):
+            action()
+        samples.append((time.perf_counter() - begin) / inner)
+        if time.perf_counter() - started > budget * 4 and len(samples) >= 3:
+            break
+    return statistics.median(samples)
+
+def scenarios(fm, path, size):
+    files = wav_files(path, 64)
+    mode = fm.mode
+    yield 'update_file_list (cold)', lambda: scan_cold(fm, path), 5
+    yield 'update_file_list (warm)', lambda: scan_warm(fm, path), 20
+    yield 'load_and_play_directory', lambda: play_directory(fm, path), 5
+    yield f'get_metadata x{len(files)} (cold)', lambda: metadata_cold(fm, files), 5
+    yield f'get_metadata x{len(files)} (warm)', lambda: metadata_warm(fm, files), 20
+    if not mode.playing:
+        mode.play_media(files[0])
+    mode.current_audio_duration = 240
+    yield 'update_progress_bar tick', lambda: progress_tick(fm), 200
+    yield 'print_pseudographic_time x60', pseudographic_time, 20
+    mode.refresh_list()
+    wait_for_scan(mode)
+    yield f'keypress storm x{len(STORM_KEYS)}', lambda: keypress_storm(fm), 3
+
+def run(sizes, base, budget):
+    results = {}
+    for size in sizes:
+        path = synthetic.make_library(base, size)
+        fm = make_player(path)
+        for name, action, rounds in scenarios(fm, path, size):
+            results[f"{name} @ {size}"] = measure(action, rounds, budget)
+            print(f"{name:<34}{size:>9}{results[f'{name} @ {size}'] * 1000:>12.3f} ms", flush=True)
+        fm.mode.cleanup()
+    return results
+
+def compare(results, baselines, threshold):
+    regressions = []
+    print(f"\n{'scenario':<46}{'baseline':>12}{'now':>12}{'ratio':>8}")
+    for name, seconds in results.items():
+        baseline = baselines.get(name)
+        if baseline is None:
+            continue
+        ratio = seconds / baseline if baseline else float('inf')
+        flag = "  REGRESSION" if ratio > threshold else ""
+        print(f"{name:<46}{baseline * 1000:>10.3f}ms{seconds * 1000:>10.3f}ms{ratio:>8.2f}{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="audioPlayerTermPy benchmarks on a null audio backend")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 100000],
+                        help="number of files in the synthetic directories (up to 1000000)")
+    parser.add_argument('--data', default=os.path.join(BENCH_DIR, 'data'), help="where synthetic directories are kept")
+    parser.add_argument('--budget', type=float, default=0.5, help="seconds spent per scenario")
+    parser.add_argument('--threshold', type=float, default=2.0, help="slowdown against the baseline counted as a regression")
+    parser.add_argument('--save', action='store_true', help="store the results as the new baselines")
+    args = parser.parse_args()
+    print(f"{'scenario':<34}{'files':>9}{'median':>15}")
+    results = run(args.sizes, os.path.abspath(args.data), args.budget)
+    if args.save:
+        baselines = {}
+        if os.path.exists(BASELINES):
+            with open(BASELINES) as f:
+                baselines = json.load(f)
+        baselines.update(results)
+        with open(BASELINES, 'w') as f:
+            json.dump(baselines, f, indent=1, sort_keys=True)
+            f.write('\n')
+        return 0
+    if not os.path.exists(BASELINES):
+        print("\nno baselines stored, run with --save first")
+        return 0
+    with open(BASELINES) as f:
+        regressions = compare(results, json.load(f), args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regressions above {args.threshold}x")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+import os
+import struct
+import sys
+
+EXTENSIONS = ('wav', 'mp3', 'flac', 'ogg')
+
+def silent_wav(seconds=0.01, rate=8000):
+    frames = int(seconds * rate)
+    data = b'\0' * frames * 2
+    header = struct.pack('<4sI4s4sIHHIIHH4sI', b'RIFF', 36 + len(data), b'WAVE', b'fmt ', 16, 1, 1,
+                         rate, rate * 2, 2, 16, b'data', len(data))
+    return header + data
+
+def silent_mp3_frame(tag=b'', mono=False):
+    # MPEG-1 Layer III, 128 kbit/s, 44100 Hz: 417-byte frames of 1152 samples
+    frame = b'\xff\xfb\x90' + (b'\xc0' if mono else b'\x00') + b'\0' * (17 if mono else 32) + tag
+    return frame + b'\0' * (417 - len(frame))
+
+def silent_mp3(frames, tag=b'', mono=False):
+    return silent_mp3_frame(tag, mono) + silent_mp3_frame(mono=mono) * (frames - 1)
+
+def audio_name(index):
+    return f"track-{index:07d}.{EXTENSIONS[index % len(EXTENSIONS)]}"
+
+def make_directory(path, files, subdirs=None):
+    marker = os.path.join(path, '.synthetic')
+    if os.path.exists(marker):
+        return path
+    os.makedirs(path, exist_ok=True)
+    wav = silent_wav()
+    for index in range(files):
+        with open(os.path.join(path, audio_name(index)), 'wb') as f:
+            if index % len(EXTENSIONS) == 0:
+                f.write(wav)
+    for index in range(subdirs if subdirs is not None else max(1, files // 100)):
+        os.makedirs(os.path.join(path, f"album-{index:05d}"), exist_ok=True)
+    with open(os.path.join(path, 'notes.txt'), 'w') as f:
+        f.write("not audio\n")
+    open(marker, 'w').close()
+    return path
+
+def make_library(base, files):
+    return make_directory(os.path.join(base, f"flat-{files}"), files)
+
+if __name__ == "__main__":
+    base = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+    for count in sys.argv[2:] or ['10', '1000', '100000']:
+        print(make_library(base, int(count)))
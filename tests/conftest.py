@@ -0,0 +1,7 @@
+import os
+import sys
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root)
+sys.path.insert(0, os.path.join(root, 'benchmarks'))
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
@@ -0,0 +1,64 @@
+import os
+import types
+
+import pytest
+
+import audioPlayerTermPy as app
+
+STEREO = """Simple mixer control 'Headphone',0
+  Capabilities: pvolume pswitch
+  Playback channels: Front Left - Front Right
+  Limits: Playback 0 - 87
+  Mono:
+  Front Left: Playback 52 [60%] [-26.25dB] [on]
+  Front Right: Playback 39 [45%] [-35.25dB] [off]
+""".splitlines()
+
+MONO = """Simple mixer control 'Master',0
+  Capabilities: pvolume pvolume-joined pswitch pswitch-joined
+  Playback channels: Mono
+  Limits: Playback 0 - 65536
+  Mono: Playback 39321 [60%] [on]
+""".splitlines()
+
+def test_parse_stereo_levels():
+    assert app.parse_amixer_levels(STEREO) == {'Front Left': 60, 'Front Right': 45}
+
+def test_parse_mono_levels():
+    assert app.parse_amixer_levels(MONO) == {'Mono': 60}
+
+def test_parse_ignores_capture_and_unrelated_lines():
+    lines = ["  Front Left: Capture 10 [12%] [on]", "amixer: Unable to find simple control 'Headphone',0", ""]
+    assert app.parse_amixer_levels(lines) == {}
+
+def test_change_args():
+    assert app.amixer_change_args('Master', 2) == ['Master', '2%+']
+    assert app.amixer_change_args('Master', 0) == ['Master', '0%+']
+    assert app.amixer_change_args('Headphone', -4, 'left') == ['Headphone', 'frontleft', '4%-']
+    assert app.amixer_change_args('Headphone', 6, 'right') == ['Headphone', 'frontright', '6%+']
+
+def coprocess(output, closed=True):
+    read_fd, write_fd = os.pipe()
+    os.write(write_fd, output.encode())
+    if closed:
+        os.close(write_fd)
+    backend = app.AmixerCoprocessBackend.__new__(app.AmixerCoprocessBackend)
+    backend.process = types.SimpleNamespace(stdout=os.fdopen(read_fd, 'rb'))
+    backend.buffer = b''
+    backend.timeout = 0.2
+    return backend
+
+def test_read_block_stops_after_every_channel():
+    backend = coprocess('\n'.join(STEREO + MONO) + '\n')
+    assert backend.read_block() == {'Front Left': 60, 'Front Right': 45}
+    assert backend.read_block() == {'Mono': 60}
+
+def test_read_block_fails_on_exit_mid_block():
+    backend = coprocess('\n'.join(STEREO[:5]) + '\n')
+    with pytest.raises(EOFError):
+        backend.read_block()
+
+def test_read_block_times_out_on_a_stalled_reply():
+    backend = coprocess('\n'.join(STEREO[:5]) + '\n', closed=False)
+    with pytest.raises(TimeoutError):
+        backend.read_block()
@@ -0,0 +1,51 @@
+import os
+
+import pytest
+
+import audioPlayerTermPy as app
+
+def test_m3u_skips_comments_and_blank_lines(tmp_path):
+    path = tmp_path / 'list.m3u'
+    path.write_bytes(b'\xef\xbb\xbf#EXTM3U\r\n#EXTINF:10,Title\r\na.mp3\r\n\r\n  sub/b.wav  \r\n')
+    assert app.read_playlist_entries(str(path)) == ['a.mp3', 'sub/b.wav']
+
+def test_m3u_falls_back_to_latin1(tmp_path):
+    path = tmp_path / 'list.m3u'
+    path.write_bytes('caf\xe9.mp3\n'.encode('latin-1'))
+    assert app.read_playlist_entries(str(path)) == ['caf\xe9.mp3']
+
+def test_pls_orders_by_entry_number(tmp_path):
+    path = tmp_path / 'list.PLS'
+    path.write_text('[playlist]\nFile2=b.mp3\nTitle1=A\nfile1 = a.mp3\nFile10=c.mp3\nNumberOfEntries=3\nVersion=2\n')
+    assert app.read_playlist_entries(str(path)) == ['a.mp3', 'b.mp3', 'c.mp3']
+
+@pytest.mark.parametrize('entry, expected', [
+    ('a.mp3', '/music/list/a.mp3'),
+    ('../other/b.mp3', '/music/other/b.mp3'),
+    ('/abs/c.mp3', '/abs/c.mp3'),
+    ('file:///abs/my%20song.mp3', '/abs/my song.mp3'),
+    ('FILE:///abs/d.mp3', '/abs/d.mp3'),
+    ('http://example.com/stream.mp3', None),
+])
+def test_resolve_playlist_entry(entry, expected):
+    assert app.resolve_playlist_entry('/music/list', entry) == expected
+
+def test_resolve_playlist_entry_expands_home():
+    assert app.resolve_playlist_entry('/music', '~/a.mp3') == os.path.expanduser('~/a.mp3')
+
+@pytest.mark.parametrize('name', ['list.m3u', 'list.pls'])
+def test_write_playlist_round_trip(tmp_path, name):
+    path = str(tmp_path / name)
+    paths = [str(tmp_path / 'a.mp3'), str(tmp_path / 'sub' / 'b.mp3'), '/elsewhere/c.mp3']
+    app.write_playlist(path, paths)
+    assert app.read_playlist_entries(path) == ['a.mp3', 'sub/b.mp3', '/elsewhere/c.mp3']
+    assert [app.resolve_playlist_entry(str(tmp_path), entry) for entry in app.read_playlist_entries(path)] == paths
+    assert os.listdir(tmp_path) == [name]
+
+def test_playlist_resolves_loaded_entries():
+    playlist = app.Playlist(['/music/a.mp3'])
+    playlist.extend_unresolved('/lists', ['b.mp3', 'file:///x/c%231.mp3', 'http://example.com/s'])
+    playlist.append('/music/d.mp3')
+    assert len(playlist) == 5
+    assert list(playlist) == ['/music/a.mp3', '/lists/b.mp3', '/x/c#1.mp3', None, '/music/d.mp3']
+    assert playlist[-2] is None
@@ -0,0 +1,89 @@
+import struct
+
+import pytest
+
+import audioPlayerTermPy as app
+from synthetic import silent_mp3, silent_mp3_frame, silent_wav
+
+FRAME_SECONDS = 1152 / 44100
+
+def id3_tag(size, footer=False):
+    syncsafe = bytes((size >> shift) & 0x7F for shift in (21, 14, 7, 0))
+    return b'ID3\x04\x00' + (b'\x10' if footer else b'\x00') + syncsafe + b'\0' * (size + (10 if footer else 0))
+
+def xing_tag(frames, flags=1, kind=b'Xing'):
+    return kind + struct.pack('>II', flags, frames)
+
+def probe(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return app.probe_duration(str(path))
+
+def test_wav_data_chunk_is_exact(tmp_path):
+    assert probe(tmp_path, 'a.wav', silent_wav(2.0, 8000)) == (2.0, 'exact')
+
+def test_wav_skips_chunks_before_data(tmp_path):
+    data = silent_wav(1.0, 8000)
+    extra = b'LIST' + struct.pack('<I', 5) + b'INFOx\0'
+    assert probe(tmp_path, 'a.wav', data[:36] + extra + data[36:]) == (1.0, 'exact')
+
+@pytest.mark.parametrize('declared', [0, 0xFFFFFFFF, 1 << 20])
+def test_wav_bad_data_size_estimates_from_file_size(tmp_path, declared):
+    data = silent_wav(1.0, 8000)
+    data = data[:40] + struct.pack('<I', declared) + data[44:]
+    assert probe(tmp_path, 'a.wav', data) == (1.0, 'estimate')
+
+def test_wav_without_riff_header(tmp_path):
+    assert probe(tmp_path, 'a.wav', b'\0' * 64) == (None, None)
+
+def test_truncated_wav_header(tmp_path):
+    assert probe(tmp_path, 'a.wav', silent_wav(1.0, 8000)[:20]) == (None, None)
+
+def test_parse_mp3_header():
+    header = app.parse_mp3_header(silent_mp3_frame(), 0)
+    assert header == {'version': 1, 'layer': 3, 'bitrate': 128000, 'sample_rate': 44100,
+                      'samples': 1152, 'length': 417, 'mono': False}
+    assert app.parse_mp3_header(b'\xff\xfb\x92\x00', 0)['length'] == 418
+    assert app.parse_mp3_header(b'\xff\xf3\x90\xc0', 0)['samples'] == 576
+    assert app.parse_mp3_header(b'\xff\xfb\xf0\x00', 0) is None
+    assert app.parse_mp3_header(b'\xff\xfb\x9c\x00', 0) is None
+    assert app.parse_mp3_header(b'\xff\xfb\x90', 0) is None
+
+def test_find_mp3_frame_skips_false_sync():
+    data = b'\0\xff\xfb\x90\x00junk' + silent_mp3(3)
+    pos, header = app.find_mp3_frame(data)
+    assert pos == 9
+    assert header['length'] == 417
+
+def test_id3v2_size():
+    assert app.id3v2_size(id3_tag(300)) == 310
+    assert app.id3v2_size(id3_tag(300, footer=True)) == 320
+    assert app.id3v2_size(b'\xff\xfb\x90\x00' + b'\0' * 6) == 0
+
+def test_cbr_mp3_is_estimated_from_size(tmp_path):
+    data = id3_tag(200) + silent_mp3(100) + b'TAG' + b'\0' * 125
+    duration, confidence = probe(tmp_path, 'a.mp3', data)
+    assert confidence == 'estimate'
+    assert duration == pytest.approx(100 * 417 * 8 / 128000)
+
+@pytest.mark.parametrize('mono', [False, True])
+@pytest.mark.parametrize('kind', [b'Xing', b'Info'])
+def test_xing_frame_count_is_exact(tmp_path, mono, kind):
+    data = id3_tag(50) + silent_mp3(10, xing_tag(1000, kind=kind), mono)
+    assert probe(tmp_path, 'a.mp3', data) == (pytest.approx(1000 * FRAME_SECONDS), 'exact')
+
+def test_xing_without_frame_count_falls_back_to_estimate(tmp_path):
+    assert probe(tmp_path, 'a.mp3', silent_mp3(10, xing_tag(1000, flags=0)))[1] == 'estimate'
+
+def test_vbri_frame_count_is_exact(tmp_path):
+    vbri = b'VBRI' + b'\0' * 10 + struct.pack('>I', 500)
+    assert probe(tmp_path, 'a.mp3', silent_mp3(10, vbri)) == (pytest.approx(500 * FRAME_SECONDS), 'exact')
+
+def test_mp3_without_frames(tmp_path):
+    assert probe(tmp_path, 'a.mp3', id3_tag(100) + b'\0' * 1000) == (None, None)
+
+def test_unknown_extension(tmp_path):
+    assert probe(tmp_path, 'a.xyz', silent_wav()) == (None, None)
+
+def test_missing_file():
+    assert app.probe_duration('/nonexistent/a.mp3') == (None, None)
@@ -0,0 +1,68 @@
+import math
+import struct
+
+import pytest
+
+import audioPlayerTermPy as app
+from synthetic import silent_mp3
+
+FRAME_SECONDS = 1152 / 44100
+ID3 = b'ID3\x04\x00\x00\x00\x00\x00\x40' + b'\0' * 64
+
+def write(tmp_path, data):
+    path = tmp_path / 'a.mp3'
+    path.write_bytes(data)
+    return str(path)
+
+def test_scan_marks_one_frame_per_step(tmp_path):
+    start = len(ID3)
+    step, offsets = app.scan_mp3_seek_table(write(tmp_path, ID3 + silent_mp3(200)), 1.0)
+    assert step == 1.0
+    assert len(offsets) == math.ceil(200 * FRAME_SECONDS)
+    assert offsets[0] == start
+    for second, offset in enumerate(offsets):
+        assert offset == start + math.ceil(second / FRAME_SECONDS) * 417
+
+def test_scan_resyncs_after_junk(tmp_path):
+    data = silent_mp3(50) + b'\xff\x00junk' * 30 + silent_mp3(150)
+    path = write(tmp_path, data)
+    _, offsets = app.scan_mp3_seek_table(path, 1.0)
+    assert len(offsets) == math.ceil(200 * FRAME_SECONDS)
+    for offset in offsets:
+        assert data[offset:offset + 4] == b'\xff\xfb\x90\x00'
+
+def test_scan_crosses_read_chunks(tmp_path):
+    frames = (3 << 20) // 417
+    _, offsets = app.scan_mp3_seek_table(write(tmp_path, silent_mp3(frames)), 10.0)
+    assert len(offsets) == math.ceil(frames * FRAME_SECONDS / 10)
+    assert all(offset % 417 == 0 for offset in offsets)
+
+def test_scan_cancelled(tmp_path):
+    assert app.scan_mp3_seek_table(write(tmp_path, silent_mp3(200)), 1.0, lambda: True) is None
+
+def test_scan_without_frames(tmp_path):
+    assert app.scan_mp3_seek_table(write(tmp_path, b'\0' * 4096), 1.0) is None
+
+def test_xing_table(tmp_path):
+    toc = bytes(range(0, 200, 2))
+    tag = b'Xing' + struct.pack('>III', 7, 1000, 417000) + toc
+    path = write(tmp_path, ID3 + silent_mp3(20, tag))
+    step, offsets = app.xing_seek_table(path)
+    assert step == pytest.approx(1000 * FRAME_SECONDS / 100)
+    assert len(offsets) == 100
+    assert offsets[0] == len(ID3)
+    assert offsets[50] == len(ID3) + 100 * 417000 // 256
+
+@pytest.mark.parametrize('tag', [b'Xing' + struct.pack('>III', 3, 1000, 417000) + bytes(100),
+                                 b'Info' + struct.pack('>III', 7, 1000, 417000) + bytes(100), b''])
+def test_xing_table_requires_toc(tmp_path, tag):
+    assert app.xing_seek_table(write(tmp_path, silent_mp3(20, tag))) is None
+
+def test_seek_table_offset_interpolates():
+    table = (1.0, [100, 200, 400])
+    assert app.seek_table_offset(table, 0.0) == (100, 0.0)
+    assert app.seek_table_offset(table, 0.5) == (150, 0.5)
+    assert app.seek_table_offset(table, 1.25) == (250, 1.25)
+
+def test_seek_table_offset_clamps_to_last_entry():
+    assert app.seek_table_offset((2.0, [100, 200, 400]), 9.0) == (400, 4.0)